@@ -0,0 +1,7 @@
+"""Entry point of `python -m src`: the command line interface of the program (see `cli` module)"""
+
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+from cli import main
+
+sys.exit(main())
@@ -0,0 +1,190 @@
+"""This module is the command line interface of the program: it runs the presets without the interactive `main.py`
+
+    python -m src run axis_orbits --set simulation.time_step=0.005 --export axis_orbits.gif
+    python -m src sweep axis_orbits --grid "simulation.time_step=[0.01, 0.005]" --workers 4
+    python -m src replay runs/axis_orbits --export axis_orbits.mp4
+
+(from the repository directory; or `python path/to/src ...` from any working directory, or `python -m cli ...` from `src`).
+It starts fast: only the modules of the subcommand are imported (the plotting modules and matplotlib only if something
+is shown or exported, yaml only if the user settings are read) and it doesn't clear the terminal.
+The presets are the functions of `utils.init_space` that return a space and its custom settings, selected by name.
+
+Functions:
+- get_presets: return the presets of `utils.init_space` by name
+- parse_settings: return the nested settings dictionary of a list of "dotted.key=value" arguments
+- main: parse the command line arguments and run the subcommand
+"""
+
+import argparse
+import ast
+import typing
+import os, sys
+from time import perf_counter
+from collections.abc import Callable, Sequence
+from typing import Any
+
+# My modules
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+
+def get_presets() -> dict[str, Callable[[], tuple[Any, dict]]]:
+    """Return the presets of `utils.init_space` by name: its functions that return a space and its custom settings."""
+    import utils
+    presets = {}
+    for name, function in vars(utils.init_space).items():
+        if name.startswith("_") or not callable(function) or getattr(function, "__module__", None) != utils.init_space.__name__:
+            continue
+        if typing.get_origin(typing.get_type_hints(function).get("return")) is tuple:
+            presets[name] = function
+    return presets
+
+def parse_settings(arguments: Sequence[str]) -> dict[str, Any]:
+    """Return the nested settings dictionary of a list of "dotted.key=value" arguments (e.g. "simulation.time_step=0.01").
+    The values are Python literals (numbers, booleans, tuples, lists...) or strings if they aren't."""
+    settings: dict[str, Any] = {}
+    for argument in arguments:
+        dotted_key, separator, text = argument.partition("=")
+        if not separator or not dotted_key:
+            raise ValueError(f"Invalid setting: {argument!r} must be `dotted.key=value`")
+        try:
+            value = ast.literal_eval(text)
+        except (ValueError, SyntaxError):
+            value = text
+        *parent_keys, key = dotted_key.strip().split(".")
+        nested_settings = settings
+        for parent_key in parent_keys:
+            nested_settings = nested_settings.setdefault(parent_key, {})
+        nested_settings[key] = value
+    return settings
+
+
+# --- SUBCOMMANDS ---
+
+def _configure(arguments: argparse.Namespace, init_space: Callable[[], tuple[Any, dict]] | None = None) -> Any:
+    """Update the global `CONFIGURATION` with the user settings, the custom settings of the preset `init_space` (if given)
+    and the `--set` ones (in this order, as `main.py`), and return the space of the preset (None without preset)."""
+    from settings import CONFIGURATION
+    if arguments.settings_path:
+        import constants
+        CONFIGURATION.update(constants.open_user_settings(arguments.settings_path))
+    elif not arguments.no_user_settings:
+        import constants
+        CONFIGURATION.update(constants.USER_SETTING_DICT)
+    space = None
+    if init_space is not None:
+        space, custom_settings = init_space()
+        CONFIGURATION.update(custom_settings)
+    CONFIGURATION.update(arguments.overrides)
+    return space
+
+def _get_preset(name: str) -> Callable[[], tuple[Any, dict]]:
+    presets = get_presets()
+    if name not in presets:
+        raise SystemExit(f"Unknown preset {name!r}. The presets are: {', '.join(presets)}")
+    return presets[name]
+
+def _run(arguments: argparse.Namespace) -> None:
+    """Run a preset, optionally streaming it to a store, and export or show its animation."""
+    from settings import CONFIGURATION
+    space = _configure(arguments, _get_preset(arguments.preset))
+
+    start_time = perf_counter()
+    if arguments.store:
+        from physics.trajectory_store import store_simulation
+        store_simulation(space, arguments.store, output_interval=arguments.output_interval)
+    else:
+        space.run_simulation()
+    run_time = perf_counter() - start_time
+    print(f"{arguments.preset}: {CONFIGURATION.simulation.number_of_time_steps} time steps, "
+          f"life time {space.life_time:g} s, run in {run_time:.3f} s")
+
+    if arguments.export:
+        from plotting import rendering
+        if arguments.store:
+            file_paths = rendering.export_animation_by_store(arguments.store, arguments.export, max_workers=arguments.workers)
+        else:
+            file_paths = rendering.export_animation_by_space(space, arguments.export, max_workers=arguments.workers)
+        print(f"Exported {len(file_paths)} file(s): {file_paths[0]}")
+    if arguments.show:
+        import space_plotting
+        if arguments.store:
+            space_plotting.print_animated_simulation_by_store(arguments.store)
+        else:
+            space_plotting.print_animated_simulation_by_space(space)
+
+def _sweep(arguments: argparse.Namespace) -> None:
+    """Run a preset with every combination of the `--grid` settings in a pool of processes and print the result table."""
+    import sweep
+    init_space = _get_preset(arguments.preset)
+    result_table = sweep.run_sweep(init_space, arguments.overrides, max_workers=arguments.workers)
+    for row in result_table:
+        columns = (f"{key}={value:.6g}" if isinstance(value, float) else f"{key}={value}"
+                   for key, value in row.items() if key != "trajectory")
+        print("\t".join(columns))
+
+def _replay(arguments: argparse.Namespace) -> None:
+    """Show or export the animation of a run stored with `physics.trajectory_store` (without simulating it again)."""
+    _configure(arguments)
+    if arguments.export:
+        from plotting import rendering
+        file_paths = rendering.export_animation_by_store(arguments.store, arguments.export, max_workers=arguments.workers)
+        print(f"Exported {len(file_paths)} file(s): {file_paths[0]}")
+    else:
+        import space_plotting
+        space_plotting.print_animated_simulation_by_store(arguments.store)
+
+
+# --- PARSER ---
+
+def _get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src", description="Point particles physics simulator")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    settings_parser = argparse.ArgumentParser(add_help=False)
+    settings_parser.add_argument("--set", dest="settings", action="append", default=[], metavar="KEY=VALUE",
+                                 help="override a setting, e.g. simulation.time_step=0.005 (repeatable)")
+    user_settings_parser = argparse.ArgumentParser(add_help=False)
+    user_settings_parser.add_argument("--settings", dest="settings_path", metavar="PATH",
+                                      help="YAML file of user settings instead of src/settings.yaml")
+    user_settings_parser.add_argument("--no-user-settings", action="store_true", help="don't read the user settings")
+    export_parser = argparse.ArgumentParser(add_help=False)
+    export_parser.add_argument("--workers", type=int, default=None, help="processes (by default one per core)")
+
+    run_parser = subparsers.add_parser("run", parents=[settings_parser, user_settings_parser, export_parser],
+                                       help="run a preset of utils.init_space")
+    run_parser.add_argument("preset", help="name of the preset (function of utils.init_space)")
+    run_parser.add_argument("--store", metavar="DIRECTORY", help="stream the frames to a trajectory store instead of the RAM")
+    run_parser.add_argument("--output-interval", type=int, default=1, help="time steps between two stored frames")
+    run_parser.add_argument("--export", metavar="PATH", help="render the animation to a .png sequence, .gif or .mp4")
+    run_parser.add_argument("--show", action="store_true", help="open a window with the animation")
+    run_parser.set_defaults(function=_run)
+
+    sweep_parser = subparsers.add_parser("sweep", parents=[settings_parser, export_parser],
+                                         help="run a preset with every combination of settings")
+    sweep_parser.add_argument("preset", help="name of the preset (function of utils.init_space)")
+    sweep_parser.add_argument("--grid", action="append", default=[], metavar="KEY=[VALUES]",
+                              help="axis of the grid, e.g. simulation.time_step=[0.01,0.005] (repeatable)")
+    sweep_parser.set_defaults(function=_sweep)
+
+    replay_parser = subparsers.add_parser("replay", parents=[settings_parser, user_settings_parser, export_parser],
+                                          help="show or export a stored run")
+    replay_parser.add_argument("store", help="directory of the trajectory store")
+    replay_parser.add_argument("--export", metavar="PATH", help="render the animation to a .png sequence, .gif or .mp4")
+    replay_parser.set_defaults(function=_replay)
+    return parser
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Parse the command line arguments (`argv`, by default the ones of the program) and run the subcommand."""
+    parser = _get_parser()
+    arguments = parser.parse_args(argv)
+    try:
+        arguments.overrides = parse_settings(arguments.settings + getattr(arguments, "grid", []))
+    except ValueError as error:
+        parser.error(str(error))
+    arguments.function(arguments)
+    return 0
+
+
+# Running the file
+if __name__=="__main__":
+    sys.exit(main())
@@ -1,24 +1,30 @@
 """This module introduces the constants for the program
 
 Constants:
+- USER_SETTING_DICT: the user settings of `settings.yaml` (next to this file). Read the first time they are used,
+  so importing the program doesn't read the file nor import yaml
 
 """
 
 
-import numpy as np
-import math
-from icecream import ic
+import os
 from typing import Any
-import yaml
 
 
 
 # My modules
 
-_SETTING_FILE_PATH: str = r"src\settings.yaml"
+_SETTING_FILE_PATH: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "settings.yaml")
 
-def open_user_settings() -> dict[str, Any]:
-    with open(_SETTING_FILE_PATH) as file:
-        return yaml.safe_load(file)
+def open_user_settings(path: str = _SETTING_FILE_PATH) -> dict[str, Any]:
+    import yaml # Only imported when the settings are read (slow import)
+    with open(path) as file:
+        return yaml.safe_load(file) or {}
 
-USER_SETTING_DICT: dict[str, Any] = open_user_settings()
\ No newline at end of file
+def __getattr__(name: str) -> Any:
+    """Read the user settings the first time `USER_SETTING_DICT` is used (module `__getattr__`, PEP 562)."""
+    if name == "USER_SETTING_DICT":
+        global USER_SETTING_DICT
+        USER_SETTING_DICT = open_user_settings()
+        return USER_SETTING_DICT
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -13,7 +13,7 @@ import utils
 from time import perf_counter
 import physics
 #from plotting import print_animated_poistion_by_array, print_animated_simulation_by_space
-from space_plotting import print_animated_simulation_by_space
+from space_plotting import print_animated_simulation_by_space, print_live_simulation_by_space
 from settings import CONFIGURATION
 from constants import USER_SETTING_DICT
 
@@ -49,14 +49,18 @@ def main():
     pprint(CONFIGURATION.as_dictionary)
     
 
-    space.run_simulation()  
-    
-    print(CONFIGURATION)
-    print_animated_simulation_by_space(space) 
+    is_live = False # If True, the animation is shown while the space is simulated (live mode)
+    if is_live:
+        print_live_simulation_by_space(space)
+    else:
+        space.run_simulation()  
+        
+        print(CONFIGURATION)
+        print_animated_simulation_by_space(space) 
 
-    print(len(space[0].adaptability._value_history))
+    print(space[0].adaptability.number_of_values)
     #ic(space.position_history_array)
-    #ic(space[0].adaptability._value_history)
+    #ic(space[0].adaptability._value_statistics)
 
     angles = np.array((45.0, 0, 0.0))*np.pi/180
     print(utils.arrays_utils.rotation_matrix_sequenced(*angles, sequence="yxz"))
@@ -0,0 +1,41 @@
+"""This is a package where the physics objects are developed.
+
+The package includes:
+- 'Particle' class: contains all the information that a puntual particle must have.
+- 'ParticleSpace' class: defines a collection/space of particles and methods to simulate their dynamics.
+- 'ParticleState' class: structure-of-arrays storage of the particles state (shared by a space and its particles).
+- 'ParticleEnsemble' class: B spaces with the same particles count and forces advanced together as one batch.
+- 'SimulationFrame' class: lightweight snapshot of a space yielded by `ParticleSpace.iter_simulation` (streamed runs).
+- 'TrajectoryBuffer' class: growing (T, N, 3) storage of the particles position histories (shared by a space and its particles).
+- 'block_time_steps' module: individual power-of-two time steps for each particle of a space.
+- 'pair_geometry' module: cache of the geometry of all the pairs of particles, shared by the couple forces in each evaluation.
+- 'checkpoint' module: saving a running space in a file and restarting it later (bit-identically).
+- 'trajectory_store' module: on-disk memory-mapped trajectory of a run (streamed frames), for runs bigger than the RAM and replays.
+- 'recording_policy' module: which steps of a run are stored in the trajectory (bounded memory for long runs).
+- 'physics_constants' module: contains the physical constants used in the simulation.
+- 'dynamics' package: contains physics/dynamic operations which take one or couple particles as arguments and operate on them.
+- 'engines' package: contains the engines that apply the couple forces of a space (python loop, vectorized...).
+- 'integrators' package: contains the schemes that advance the state of a space in each step (leapfrog, Yoshida, RK45...).
+"""
+
+from .adaptability_manager import AdaptabilityManager
+from .particle_state import ParticleState
+from .trajectory_buffer import TrajectoryBuffer
+from .simulation_frame import SimulationFrame
+from .particle import Particle
+from .particle_space import ParticleSpace
+from .particle_ensemble import ParticleEnsemble
+from .physics_constants import *
+from .dynamics import *
+from . import engines
+from . import integrators
+from . import block_time_steps
+from . import pair_geometry
+from . import checkpoint
+from . import trajectory_store
+from . import recording_policy
+
+
+# from . import linearalgebra
+
+__all__ = ["Particle", "ParticleSpace", "ParticleEnsemble", "ParticleState", "TrajectoryBuffer", "SimulationFrame", "physics_constants", "forces", "engines", "integrators", "block_time_steps", "pair_geometry", "checkpoint", "trajectory_store", "recording_policy"]
\ No newline at end of file
@@ -4,23 +4,27 @@ import numpy as np
 from collections.abc import Callable # Allow to use Callable (what means function) for type hints (specifying the input output of the function as argument)
 from typing import Any, TypeVar
 InstanceType = TypeVar('InstanceType') # When decorating a method *within* AdaptabilityManager, InstanceType will be AdaptabilityManager.
-from icecream import ic
 from functools import partial, wraps
-from deprecated import deprecated
+import warnings
 from pprint import pprint
 
 # turn off -ic()-
 #ic.disable()
 
 # My modules
+from physics.streaming_statistics import ValueStatistics
 # Relative imports
 import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from settings.config_subclasses import ConfigAdapt
+from settings.config_subclasses import ConfigAdapt, FrozenConfigAdapt
 from settings import CONFIGURATION
 #from plotting.dot import PlottingDot
 
 
+MIN_TIME_STEP_WARNING = ("The min time step has been reached: the steps aren't divided more even if the adaptability "
+                         "thresholds aren't met") # Also warned by the integrators with adaptive substeps
+
+
 class AdaptabilityManager:
     """
     AdaptabilityManager is a class that manages the adaptability of time steps: Whether or not they should run and how much the should decrease.
@@ -32,7 +36,7 @@ class AdaptabilityManager:
     """
     def __init__(self, 
                  get_value_function: Callable[[float], float],
-                 adaptativility_config: ConfigAdapt = CONFIGURATION.simulation.adaptability,
+                 adaptativility_config: ConfigAdapt | FrozenConfigAdapt = CONFIGURATION.simulation.adaptability,
                  ) -> None:
         """Init a 'AdaptabilityManager' object
 
@@ -40,13 +44,14 @@ class AdaptabilityManager:
         - get_value_function: a function that when called return an absolute (positive) value which decrease proportionally with time_step
           It return the value that `AdaptabilityManager` study 
         - adaptive_config: Optional config instance that defines the adaptability parameters
+          (while its space is running, the frozen snapshot of the running config: `ParticleSpace.run_config`)
 
         """            
-        self.config: ConfigAdapt = adaptativility_config
+        self.config: ConfigAdapt | FrozenConfigAdapt = adaptativility_config
         
         self.get_value: Callable[[float], float] = get_value_function # when called (no arguments) returns a value for storing it in history
             # very prouf of using a function in this way for not having to access the Particle object
-        self._value_history: np.ndarray = np.empty((0), float)
+        self._value_statistics: ValueStatistics | None = None # Built with the first stored value (it reads the config)
         
         self._last_threshold_absolute_value: float = -1. # Only used when `do_last_failed` is false
         self.do_last_failed: bool = False
@@ -60,10 +65,44 @@ class AdaptabilityManager:
             raise AttributeError("You are not allowed to use last_threshold_absolute_value when the last check was ok")
 
 
+    @property
+    def checkpoint_state(self) -> dict[str, Any]:
+        """The values of the manager that change with the steps (for saving it, see `restore_checkpoint_state`)"""
+        statistics = self._value_statistics.as_dictionary if self._value_statistics is not None else None
+        return {"value_statistics": statistics, "last_threshold_absolute_value": self._last_threshold_absolute_value,
+                "do_last_failed": self.do_last_failed, "recommended_division_for_steps": self.recommended_division_for_steps}
+
+    def restore_checkpoint_state(self, checkpoint_state: dict[str, Any]) -> None:
+        """Set the values saved with `checkpoint_state` (the config and `get_value` are kept)."""
+        statistics = checkpoint_state["value_statistics"]
+        self._value_statistics = ValueStatistics.from_dictionary(statistics) if statistics is not None else None
+        self._last_threshold_absolute_value = float(checkpoint_state["last_threshold_absolute_value"])
+        self.do_last_failed = bool(checkpoint_state["do_last_failed"])
+        self.recommended_division_for_steps = int(checkpoint_state["recommended_division_for_steps"])
+
+    @property
+    def number_of_values(self) -> int:
+        """How many values are used for the thresholds (all the stored ones or the last `history_window`)"""
+        return len(self._value_statistics) if self._value_statistics is not None else 0
+
+    @property
+    def _tracked_quantiles(self) -> tuple[float, ...]:
+        """Quantiles of the values used by the config thresholds"""
+        if self.config.max_quantile is None or self.config.max_quantile < 0.:
+            return ()
+        if self.config.max_quantile <= 1.:
+            return (self.config.max_quantile,)
+        ignored_extremes = self.config.quantile_ignored_extremes / 100
+        return (1 - ignored_extremes, ignored_extremes)
+
     def store_value_in_history(self, time_step: float) -> None:
-        """Store the defined value from `get_value` function in the history, for a given time_step."""
+        """Store the defined value from `get_value` function in the history statistics, for a given time_step.
+        The values are not kept, only the statistics used by the thresholds (updated in constant time)."""
         if self.config.is_adaptive:
-            self._value_history = np.append(self._value_history, self.get_value(time_step))
+            if self._value_statistics is None:
+                self._value_statistics = ValueStatistics(self.config.history_window, delay=2)
+            self._value_statistics.track_quantiles(*self._tracked_quantiles)
+            self._value_statistics.add(self.get_value(time_step))
     
     # --- CHECK adaptive METHODS ---
     def is_adaptive_ok_by_threshold(self, threshold_absolute_value: float, time_step: float) -> bool:
@@ -99,24 +138,28 @@ class AdaptabilityManager:
     def _get_value_by_extrapolated_quantile(self, extrapolated_quantile: float) -> float:
         IGNORED_EXTREMES = self.config.quantile_ignored_extremes # In %
             # 2-1 it sweet spot (2 to 0.5)
-        relative_diff = np.percentile(self._value_history, 100-IGNORED_EXTREMES, method="higher") \
-            / np.percentile(self._value_history, IGNORED_EXTREMES, method="lower")
+        statistics: ValueStatistics = self._value_statistics # type: ignore
+        lower_value = statistics.get_quantile(IGNORED_EXTREMES/100, method="lower")
+        if lower_value == 0: # No relative spread of the values (e.g. no forces on the particle)
+            return -1.
+        relative_diff = statistics.get_quantile(1 - IGNORED_EXTREMES/100, method="higher") / lower_value
         relative_diff /= 1 - (2*IGNORED_EXTREMES/100)
-        value_mean = np.mean(self._value_history[:-2])
+        value_mean = statistics.delayed_mean # Without the last 2 values
         value = value_mean * relative_diff * (self.config.max_quantile-0.5) # because mean is ~quantile 0.5
         return float(value)
 
     def get_threshold_by_quantile(self) -> float:
         """Returns the quantile-based threshold value. If quantile > 1 it returns a useful extrapolation"""
         if self.config.max_quantile <= 1.:
-            value = np.quantile(self._value_history, self.config.max_quantile, method='higher')
+            value = self._value_statistics.get_quantile(self.config.max_quantile, method="higher") # type: ignore
         else: # self.config.max_quantile > 1.:
             value = self._get_value_by_extrapolated_quantile(self.config.max_quantile)
         return float(value)
 
     def get_threshold_by_deviation(self) -> float:
         """Returns the deviation-based threshold value."""
-        return float(np.mean(self._value_history) + self.config.max_deviation * np.std(self._value_history))
+        statistics: ValueStatistics = self._value_statistics # type: ignore
+        return float(statistics.mean + self.config.max_deviation * statistics.std)
 
     def get_worst_threshold_value(self) -> float:
         """Returns the worst threshold value. -1 if there is no calculation possible for the threshold, so it is ckecked coorrectly"""
@@ -130,16 +173,38 @@ class AdaptabilityManager:
 
         if self.config.max_quantile is not None \
             and self.config.max_quantile >= 0. \
-            and len(self._value_history) >= 10: # Because quantile of less doesn't make sense
+            and self.number_of_values >= 10: # Because quantile of less doesn't make sense
             worst_threshold_value = max(worst_threshold_value, self.get_threshold_by_quantile())
         
         if self.config.max_deviation is not None \
             and self.config.max_deviation > 0. \
-            and len(self._value_history) >= 2: # Because deviation of less doesn't make sense
+            and self.number_of_values >= 2: # Because deviation of less doesn't make sense
             worst_threshold_value = max(worst_threshold_value, self.get_threshold_by_deviation())
         
         return worst_threshold_value
 
+    def get_time_step_level(self, time_step: float, max_level: int) -> int:
+        """Return the lowest level `k` whose time step (`time_step / 2**k`) is adaptative-ok, at most `max_level`.
+        Used by the block time steps instead of `check_adaptive_ok`.
+        If not even `max_level` is ok, the check is saved as failed (so the acceleration can be limited to the threshold).
+        """
+        if not self.config.is_adaptive:
+            return 0
+        threshold_absolute_value = self.get_worst_threshold_value()
+        actual_absolute_value = self.get_value(time_step)
+        if threshold_absolute_value == -1 or actual_absolute_value < threshold_absolute_value:
+            self._set_last_checked_okay()
+            return 0
+        # The value decreases proportionally with the time step
+        level = max(int(np.ceil(np.log2(actual_absolute_value / threshold_absolute_value))), 1)
+        if actual_absolute_value / 2**level >= threshold_absolute_value:
+            level += 1
+        if level > max_level:
+            self._set_last_checked_fail(threshold_absolute_value, time_step / 2**max_level)
+            return max_level
+        self._set_last_checked_okay()
+        return level
+
     def check_adaptive_ok(self, time_step: float) -> bool:
         """Main class method to check if the time step is acceptable using all the different methods.
         Returns whether the step could run or not (decrease time step if not by `self.recommended_division_for_steps`)
@@ -162,8 +227,7 @@ class AdaptabilityManager:
             self._set_last_checked_okay()
 
         if time_step < self.config.min_time_step:
-            ic("min time step reached", self._last_threshold_absolute_value, self.get_value(time_step))
-            ic.disable()
+            warnings.warn(MIN_TIME_STEP_WARNING, RuntimeWarning, stacklevel=2) # Same text, so shown once by the default filter
             return True
         
         return is_ok
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""`backends` module include the optional compiled kernels of the simulation and the selection of the backend
+
+The backend is selected at runtime with `ConfigSimulation.backend`:
+- "numpy": the vectorized NumPy operations (always available)
+- "numba": fused loops compiled with Numba: no temporary arrays and C-like speed for mid-size spaces.
+  If Numba is not installed it falls back to "numpy"
+- "auto": "numba" if it is installed, "numpy" if not
+
+The compiled kernels are cached on disk (`__pycache__`), so they are only compiled the first run.
+Without Numba the kernels are plain Python functions (correct, but only useful as reference): they are not used.
+
+Kernels:
+- accumulate_inverse_square_accelerations: pair accumulation of an inverse-square law (all the pairs, action-reaction)
+- accumulate_target_inverse_square_accelerations: same, only for the target particles (block time steps)
+- advance_averaged_euler: fused step of the averaged Euler scheme (`ParticleState.advance_time_step`)
+- kick_drift: fused kick and drift of the symplectic schemes
+"""
+
+import numpy as np
+import math
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+NUMBA_AVAILABLE: bool = numba is not None
+BACKENDS: tuple[str, ...] = ("numpy", "numba", "auto")
+
+
+def resolve_backend(name: str) -> str:
+    """Return the backend that will be used ("numpy" or "numba") for the configured one."""
+    if name not in BACKENDS:
+        raise ValueError(f"Invalid backend: {name!r} is not in {BACKENDS}")
+    if name == "numpy":
+        return "numpy"
+    return "numba" if NUMBA_AVAILABLE else "numpy"
+
+def _jit(function):
+    """Compile the function with Numba (cached between runs) if it is installed, or return it as it is."""
+    if numba is None:
+        return function
+    return numba.njit(cache=True, nogil=True)(function)
+
+
+@_jit
+def accumulate_inverse_square_accelerations(positions: np.ndarray, charges: np.ndarray, masses: np.ndarray,
+                                            constant: float, accelerations: np.ndarray) -> None:
+    """Add to `accelerations` (N, 3) the acceleration of the law `constant * charge1 * charge2 * distance_vector / distance**3`
+    between all the pairs of particles (each pair computed once). The pairs at the same position have no force."""
+    number_of_particles = positions.shape[0]
+    for i in range(number_of_particles):
+        x_i, y_i, z_i = positions[i, 0], positions[i, 1], positions[i, 2]
+        charge_i = constant * charges[i]
+        ax_i, ay_i, az_i = 0., 0., 0.
+        for j in range(i + 1, number_of_particles):
+            dx, dy, dz = positions[j, 0] - x_i, positions[j, 1] - y_i, positions[j, 2] - z_i
+            squared_distance = dx*dx + dy*dy + dz*dz
+            if squared_distance == 0.:
+                continue
+            factor = charge_i * charges[j] / (squared_distance * math.sqrt(squared_distance))
+            ax_i += factor * dx
+            ay_i += factor * dy
+            az_i += factor * dz
+            factor_j = factor / masses[j]
+            accelerations[j, 0] -= factor_j * dx
+            accelerations[j, 1] -= factor_j * dy
+            accelerations[j, 2] -= factor_j * dz
+        accelerations[i, 0] += ax_i / masses[i]
+        accelerations[i, 1] += ay_i / masses[i]
+        accelerations[i, 2] += az_i / masses[i]
+
+@_jit
+def accumulate_target_inverse_square_accelerations(positions: np.ndarray, charges: np.ndarray, masses: np.ndarray,
+                                                   constant: float, accelerations: np.ndarray, targets: np.ndarray) -> None:
+    """Same as `accumulate_inverse_square_accelerations` but only the `targets` (indices) are accelerated (by all)."""
+    number_of_particles = positions.shape[0]
+    for i in targets:
+        x_i, y_i, z_i = positions[i, 0], positions[i, 1], positions[i, 2]
+        ax_i, ay_i, az_i = 0., 0., 0.
+        for j in range(number_of_particles):
+            dx, dy, dz = positions[j, 0] - x_i, positions[j, 1] - y_i, positions[j, 2] - z_i
+            squared_distance = dx*dx + dy*dy + dz*dz
+            if squared_distance == 0.:
+                continue
+            factor = charges[j] / (squared_distance * math.sqrt(squared_distance))
+            ax_i += factor * dx
+            ay_i += factor * dy
+            az_i += factor * dz
+        factor_i = constant * charges[i] / masses[i]
+        accelerations[i, 0] += factor_i * ax_i
+        accelerations[i, 1] += factor_i * ay_i
+        accelerations[i, 2] += factor_i * az_i
+
+@_jit
+def advance_averaged_euler(positions: np.ndarray, velocities: np.ndarray, accelerations: np.ndarray,
+                           acceleration_fields: np.ndarray, last_velocities: np.ndarray, last_accelerations: np.ndarray,
+                           life_times: np.ndarray, time_step: float) -> None:
+    """One loop doing `ParticleState.advance_time_step`: accelerate, translate with the averaged velocity and shift."""
+    half_time_step = time_step / 2
+    for i in range(positions.shape[0]):
+        for k in range(3):
+            acceleration = accelerations[i, k]
+            velocity = velocities[i, k] + acceleration * time_step
+            positions[i, k] += (velocity + last_velocities[i, k]) * half_time_step
+            velocities[i, k] = velocity
+            last_velocities[i, k] = velocity
+            last_accelerations[i, k] = acceleration
+            accelerations[i, k] = acceleration_fields[i, k]
+        life_times[i] += time_step
+
+@_jit
+def kick_drift(positions: np.ndarray, velocities: np.ndarray, accelerations: np.ndarray, kick: float, drift: float) -> None:
+    """One loop doing `velocities += accelerations * kick` and then `positions += velocities * drift`."""
+    for i in range(positions.shape[0]):
+        for k in range(3):
+            velocity = velocities[i, k] + accelerations[i, k] * kick
+            velocities[i, k] = velocity
+            positions[i, k] += velocity * drift
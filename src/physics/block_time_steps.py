@@ -0,0 +1,82 @@
+"""`block_time_steps` module include the functions for advancing a space with individual (block) time steps
+
+Each particle advances with its own power-of-two fraction of the time step, its level `k`: `time_step / 2**k`.
+Time is counted in ticks of the smallest step (`time_step / 2**max_level`). In each tick only the particles whose step
+starts (the active ones) get their forces evaluated and only the ones whose step ends are integrated.
+The positions of the others are predicted with the motion of their current step: x0 + v0·τ + a0·τ²/2
+
+The level of a particle is chosen from its adaptability (`AdaptabilityManager.get_time_step_level`) at the start of
+each of its steps. It can always move to a smaller step, but only to a bigger one when the start of its step is aligned
+with it, so every step ends at the end of the whole `time_step`.
+"""
+
+import numpy as np
+import math
+from typing import Any
+
+
+def get_max_level(time_step: float, min_time_step: float) -> int:
+    """Return the highest level whose time step (`time_step / 2**level`) is not smaller than `min_time_step`."""
+    if min_time_step <= 0 or min_time_step >= time_step:
+        return 0
+    return int(math.floor(math.log2(time_step / min_time_step) + 1e-9))
+
+def get_min_aligned_levels(ticks: np.ndarray, max_level: int) -> np.ndarray:
+    """Return the lowest level each tick is aligned with (a step of that level can start in the tick)."""
+    ticks = np.asarray(ticks, np.int64)
+    lowest_bits = ticks & -ticks # Biggest power of two that divides the tick (0 for tick 0)
+    trailing_zeros = np.log2(np.where(ticks != 0, lowest_bits, 1)).astype(int)
+    return np.where(ticks != 0, np.maximum(max_level - trailing_zeros, 0), 0)
+
+
+def advance_block_time_step(space: Any, time_step: float) -> int:
+    """Advance all the particles of the space by `time_step`, each one with its own block time steps.
+    The forces are applied at the start of each particle step, so the caller must not apply them before.
+
+    Uses from the running config of the space (`ParticleSpace.run_config`):
+    adaptability.min_time_step: [s] the smallest block time step (defines the number of levels)
+
+    Returns:
+    How many particle steps (force evaluations of one particle) have been done
+    """
+    state = space.state
+    number_of_particles = len(state)
+    max_level = get_max_level(time_step, space.run_config.adaptability.min_time_step)
+    total_ticks = 2**max_level
+    tick_time_step = time_step / total_ticks
+
+    start_ticks = np.zeros(number_of_particles, np.int64)
+    end_ticks = np.zeros(number_of_particles, np.int64)
+    start_positions = state.positions.copy()
+    number_of_particle_steps = 0
+
+    tick = 0
+    active = np.arange(number_of_particles)
+    while True:
+        # Start the step of the active particles: forces (by all the particles, predicted at this tick) and level
+        space._apply_all_forces_array(active)
+        number_of_particle_steps += len(active)
+        min_level = int(get_min_aligned_levels(np.array([tick]), max_level)[0])
+        for index in active.tolist():
+            particle = space[index]
+            if tick == 0: # The adaptability history stores the values of the whole time step
+                particle.adaptability.store_value_in_history(time_step)
+            level = max(particle.adaptability.get_time_step_level(time_step, max_level), min_level)
+            if particle.adaptability.do_last_failed: # Not even the smallest step is ok: limit the acceleration
+                particle._set_acceleration_from_threshold_value(time_step / 2**level)
+            end_ticks[index] = tick + 2**(max_level - level)
+        start_ticks[active] = tick
+        start_positions[active] = state.positions[active]
+
+        # Next tick: integrate the particles whose step ends and predict the others
+        tick = int(end_ticks.min())
+        is_ending = end_ticks == tick
+        ending = np.flatnonzero(is_ending)
+        state.positions[ending] = start_positions[ending]
+        state.advance_rows_time_steps(ending, (end_ticks[ending] - start_ticks[ending]) * tick_time_step)
+        predicted = np.flatnonzero(~is_ending)
+        state.predict_rows_positions(predicted, (tick - start_ticks[predicted]) * tick_time_step, start_positions[predicted])
+
+        if tick >= total_ticks:
+            return number_of_particle_steps
+        active = ending
@@ -0,0 +1,165 @@
+"""`checkpoint` module include the tools for saving a running `ParticleSpace` and restarting it later
+
+A checkpoint is a single `.npz` file (see `ParticleSpace.save_checkpoint` and `ParticleSpace.load_checkpoint`):
+- The arrays of the space (state rows, stored trajectory, neighbour list and the accelerations kept by the integrator)
+  are saved as they are, so the continuation is bit-identical to a run that wasn't stopped
+- A JSON manifest (saved in the same file as the `manifest` entry) with the simulation config, the identifiers of the
+  forces, the step of the run and the other values of the space (life time, adaptability statistics of each particle,
+  substep of the integrator...)
+
+The forces are saved by their identifier: module and qualified name of the function, the keywords of a `partial` and
+the range of a range limited force (see `get_force_identifier`). Only the forces that can be imported by their name can
+be restored from it (the others must be given again when loading).
+
+Classes:
+- Checkpointer: saves the checkpoints of a run periodically (each some steps or seconds of wall time)
+
+Functions:
+- write_checkpoint, read_checkpoint: write and read the arrays and manifest of a checkpoint file
+- get_force_identifier, resolve_force: from a force to its identifier and back
+"""
+
+import numpy as np
+import json
+import os
+import importlib
+from time import perf_counter
+from functools import partial
+from collections.abc import Callable
+from typing import Any
+
+# My modules
+from physics.dynamics.force_ranges import limit_force_range
+# Relative imports
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from settings.config_subclasses import ConfigCheckpoint
+
+
+CHECKPOINT_FORMAT_VERSION = 1
+MANIFEST_KEY = "manifest" # Entry of the manifest in the `.npz` file
+
+
+class Checkpointer:
+    """
+    Saves the checkpoints of a running space to the same file, each `every_steps` steps and/or each `every_seconds`
+    seconds of wall time (the one that comes first). A run calls `update(space, step)` after each step.
+    """
+    def __init__(self, path: str, every_steps: int = 0, every_seconds: float = 0.) -> None:
+        """Init a 'Checkpointer' object
+
+        Possitional-Keyword arguments:
+        - path: file of the checkpoints (overwritten each time)
+        - every_steps: steps between two checkpoints (0 means it doesn't depend on the steps)
+        - every_seconds: [s] wall time between two checkpoints (0 means it doesn't depend on the time)
+        """
+        self.path: str = path
+        self.every_steps: int = max(int(every_steps), 0)
+        self.every_seconds: float = max(float(every_seconds), 0.)
+        self.number_of_saves: int = 0
+        self._last_save_time: float = perf_counter()
+
+    def __repr__(self) -> str:
+        class_name = self.__class__.__name__
+        return f"{class_name}(path = {self.path!r}, every_steps = {self.every_steps}, every_seconds = {self.every_seconds})"
+
+    @classmethod
+    def from_config(cls, config: ConfigCheckpoint) -> "Checkpointer | None":
+        """Return the checkpointer of the config, or None if the checkpoints are disabled (no path or no period)."""
+        if not config.path or (config.every_steps <= 0 and config.every_seconds <= 0):
+            return None
+        return cls(config.path, config.every_steps, config.every_seconds)
+
+    def is_due(self, step: int) -> bool:
+        """Return whether a checkpoint must be saved after the step `step` of the run."""
+        if self.every_steps > 0 and step % self.every_steps == 0:
+            return True
+        return self.every_seconds > 0 and perf_counter() - self._last_save_time >= self.every_seconds
+
+    def update(self, space: Any, step: int) -> bool:
+        """Save a checkpoint of the space if it is due after the step `step` of the run. Returns whether it was saved."""
+        if not self.is_due(step):
+            return False
+        space.save_checkpoint(self.path, step)
+        self.number_of_saves += 1
+        self._last_save_time = perf_counter()
+        return True
+
+
+# --- FILES ---
+
+def write_checkpoint(path: str, arrays: dict[str, np.ndarray], manifest: dict[str, Any]) -> None:
+    """Write the arrays and the JSON manifest in the `.npz` file `path` (replacing it at once, so an interrupted write
+    doesn't leave a broken checkpoint)."""
+    manifest = {"format_version": CHECKPOINT_FORMAT_VERSION} | manifest
+    manifest_text = json.dumps(manifest, default=_get_json_value)
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as file:
+        np.savez(file, **arrays, **{MANIFEST_KEY: np.array(manifest_text)})
+    os.replace(temporary_path, path)
+
+def read_checkpoint(path: str) -> tuple[dict[str, np.ndarray], dict[str, Any]]:
+    """Return the arrays and the manifest of the checkpoint file `path`."""
+    with np.load(path, allow_pickle=False) as file:
+        arrays = {key: file[key] for key in file.files if key != MANIFEST_KEY}
+        manifest = json.loads(str(file[MANIFEST_KEY]))
+    if manifest.get("format_version") != CHECKPOINT_FORMAT_VERSION:
+        raise ValueError(f"Invalid checkpoint: {path!r} has format version {manifest.get('format_version')!r} "
+                         f"instead of {CHECKPOINT_FORMAT_VERSION}")
+    return arrays, manifest
+
+def _get_json_value(value: Any) -> Any:
+    """Return the JSON serializable version of the numpy values (`default` of `json.dumps`)."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# --- FORCES ---
+
+def get_force_identifier(force_function: Callable[..., Any]) -> dict[str, Any]:
+    """Return the JSON serializable identifier of a force (see `resolve_force`):
+    - function: its module and qualified name
+    - `partial` of a force: the identifier of the force and the keywords (arrays are saved as lists)
+    - range limited force (see `force_ranges`): the identifier of the force and the range
+    """
+    if isinstance(force_function, partial):
+        if force_function.args:
+            raise ValueError(f"Invalid force: the positional arguments of {force_function!r} can't be saved (use keywords)")
+        keywords = {key: _get_keyword_identifier(value) for key, value in force_function.keywords.items()}
+        return {"force": get_force_identifier(force_function.func), "keywords": keywords}
+    force_range = getattr(force_function, "force_range", None)
+    if force_range is not None and hasattr(force_function, "__wrapped__"):
+        return {"force": get_force_identifier(force_function.__wrapped__), "force_range": float(force_range)} # type: ignore
+    return {"module": force_function.__module__, "name": force_function.__qualname__}
+
+def resolve_force(identifier: dict[str, Any]) -> Callable[..., Any]:
+    """Return the force of an identifier returned by `get_force_identifier` (importing its module)."""
+    if "keywords" in identifier:
+        keywords = {key: _resolve_keyword_identifier(value) for key, value in identifier["keywords"].items()}
+        return partial(resolve_force(identifier["force"]), **keywords)
+    if "force_range" in identifier:
+        return limit_force_range(resolve_force(identifier["force"]), identifier["force_range"])
+    module_name, name = identifier["module"], identifier["name"]
+    if "<locals>" in name or "<lambda>" in name:
+        raise ValueError(f"Invalid force identifier: {module_name}.{name} can't be imported (give the forces when loading)")
+    force_function: Any = importlib.import_module(module_name)
+    for attribute in name.split("."):
+        force_function = getattr(force_function, attribute)
+    return force_function
+
+def _get_keyword_identifier(value: Any) -> Any:
+    """Return the JSON serializable version of a keyword of a force (arrays are marked so they are arrays again)."""
+    if isinstance(value, np.ndarray):
+        return {"array": value.tolist(), "dtype": str(value.dtype)}
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+def _resolve_keyword_identifier(value: Any) -> Any:
+    """Inverse of `_get_keyword_identifier`."""
+    if isinstance(value, dict) and set(value) == {"array", "dtype"}:
+        return np.array(value["array"], dtype=value["dtype"])
+    return value
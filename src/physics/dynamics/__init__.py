@@ -2,6 +2,10 @@
 
 #from . import couple_dynamic_operations as couple
 #from . import own_dynamic_operations as own
+from . import batched_forms
+from . import force_laws
+from . import force_ranges
+from . import force_softening
 from . import forces
 
-__all__ = ["forces"]
\ No newline at end of file
+__all__ = ["forces", "batched_forms", "force_laws", "force_ranges", "force_softening"]
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""This module contains the tools for declaring and getting the batched (vectorized) form of a force function
+
+A force function operates with one or a couple of particles. Its batched form does the same operation for many particles
+(or pairs of particles) at once with numpy arrays:
+- Couple forces batched form: `(distance_vectors, distances, masses_1, masses_2, **parameters) -> forces`
+  - distance_vectors: [m] (..., 3) array of `particle2.position - particle1.position`
+  - distances: [m] (...) array with the norm of `distance_vectors`
+  - masses_1, masses_2: [kg] arrays broadcastable to `distances`
+  - Returns [N] (..., 3) forces applied on particle1 by particle2. It must be 0 when the distance is 0
+- Single forces batched form: `(positions, velocities, masses, **parameters) -> forces`
+  - positions: [m] (N, 3) array of the positions of the particles
+  - velocities: [m/s] (N, 3) array of the velocities of the particles
+  - masses: [kg] (N,) array of the masses of the particles
+  - Returns [N] (N, 3) forces applied on each particle
+The forces without batched form are still called once per particle (or pair of particles).
+
+Functions:
+- with_batched_form: decorator for declaring the batched form of a force
+- get_batched_form: return the batched form of a force (respecting `partial` keyword parameters) or None
+"""
+from functools import partial
+from collections.abc import Callable
+from typing import Any
+
+
+def with_batched_form(batched_function: Callable[..., Any]) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Returns a decorator that declares `batched_function` as the batched form of the decorated force."""
+    def with_batched_form_decorator(force_function: Callable[..., Any]) -> Callable[..., Any]:
+        force_function.batched_form = batched_function # type: ignore
+        return force_function
+    return with_batched_form_decorator
+
+def get_batched_form(force_function: Callable[..., Any]) -> Callable[..., Any] | None:
+    """Return the batched form of the force, or None if it doesn't have one.
+
+    If the force is a `partial` the bound keywords are passed to the batched form too.
+    Positional bound arguments cannot be passed (they would be particles) so it returns None for them.
+    """
+    if isinstance(force_function, partial):
+        if force_function.args:
+            return None
+        batched_function = get_batched_form(force_function.func)
+        if batched_function is None:
+            return None
+        return partial(batched_function, **force_function.keywords)
+    return getattr(force_function, "batched_form", None)
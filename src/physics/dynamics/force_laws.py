@@ -0,0 +1,65 @@
+"""This module contains the tools for declaring that a couple force follows a central inverse-square law
+
+Knowing the law of a force (and not only how to compute it) allows approximated solvers (e.g. Barnes–Hut tree) to
+group far particles as a single one:
+    force on particle1 by particle2 = constant * charge1 * charge2 * distance_vector / distance**3
+    Where charge is the mass of the particle (`charge = "mass"`) or 1 for all of them (`charge = "unit"`)
+
+Classes:
+- InverseSquareLaw: the constant and kind of charge of a force law
+
+Functions:
+- with_inverse_square_law: decorator for declaring the law of a force
+- get_inverse_square_law: return the law of a force (respecting `partial` keyword parameters) or None
+  (the law function can return None for some parameters, e.g. a softened force isn't an inverse-square law)
+"""
+import numpy as np
+from dataclasses import dataclass
+from functools import partial
+from collections.abc import Callable
+from typing import Any
+
+
+CHARGE_KINDS: tuple[str, ...] = ("mass", "unit")
+
+@dataclass(frozen=True)
+class InverseSquareLaw:
+    """A central inverse-square force law: `constant * charge1 * charge2 / distance**2`"""
+    constant: float
+    charge: str = "mass"
+
+    def __post_init__(self) -> None:
+        if self.charge not in CHARGE_KINDS:
+            raise ValueError(f"Invalid charge: {self.charge!r} is not in {CHARGE_KINDS}")
+
+    def get_charges(self, masses: np.ndarray) -> np.ndarray:
+        """Return the charges of the particles with the given masses."""
+        return masses if self.charge == "mass" else np.ones_like(masses)
+
+    def get_forces(self, distance_vectors: np.ndarray, distances: np.ndarray, 
+                   masses_1: np.ndarray, masses_2: np.ndarray) -> np.ndarray:
+        """Batched form of the law (see `batched_forms` module): forces on particles 1 by particles 2."""
+        distances = np.where(distances != 0, distances, np.inf) # Force = 0 if same position
+        charges_product = self.get_charges(masses_1) * self.get_charges(masses_2)
+        return (self.constant * charges_product / distances**3)[..., np.newaxis] * distance_vectors
+
+
+def with_inverse_square_law(law_function: Callable[..., InverseSquareLaw]) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Returns a decorator that declares the decorated force follows the law returned by `law_function(**force_parameters)`."""
+    def with_inverse_square_law_decorator(force_function: Callable[..., Any]) -> Callable[..., Any]:
+        force_function.inverse_square_law = law_function # type: ignore
+        return force_function
+    return with_inverse_square_law_decorator
+
+def get_inverse_square_law(force_function: Callable[..., Any]) -> InverseSquareLaw | None:
+    """Return the inverse-square law of the force, or None if it doesn't declare one.
+
+    If the force is a `partial` the bound keywords are passed to the law function.
+    """
+    if isinstance(force_function, partial):
+        if force_function.args:
+            return None
+        law_function = getattr(force_function.func, "inverse_square_law", None)
+        return law_function(**force_function.keywords) if law_function is not None else None
+    law_function = getattr(force_function, "inverse_square_law", None)
+    return law_function() if law_function is not None else None
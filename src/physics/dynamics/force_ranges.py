@@ -0,0 +1,53 @@
+"""This module contains the tools for limiting the range of a couple force
+
+A range limited force is 0 for the pairs of particles at a distance equal or greater than its range, so the engines
+only have to visit the close pairs (found with a neighbour list) instead of all of them.
+
+Functions:
+- limit_force_range: return the force limited to a range (keeping its batched form)
+- get_force_range: return the range of a force (infinite if it isn't limited)
+"""
+import numpy as np
+import math
+from functools import partial, wraps
+from collections.abc import Callable
+from typing import Any
+
+# My modules
+from physics.dynamics.batched_forms import get_batched_form
+
+
+def limit_force_range(force_function: Callable[..., np.ndarray], force_range: float) -> Callable[..., np.ndarray]:
+    """Return a couple force equal to `force_function` for the pairs closer than `force_range` and 0 for the others.
+    If the force has a batched form, the limited force has it too (limited the same way).
+    The limited force doesn't keep the inverse-square law of the force (it isn't one anymore).
+
+    Possitional-Keyword arguments:
+    force_function: couple force `(particle1, particle2, **parameters) -> force`
+    force_range: [m] distance from which the force is 0
+    """
+    if force_range <= 0:
+        raise ValueError(f"Invalid force range: {force_range} must be positive")
+
+    @wraps(force_function, updated=()) # Copy the name and doc, but not the declared forms of the force
+    def range_limited_force(particle1: Any, particle2: Any, *args, **kwargs) -> np.ndarray:
+        if np.linalg.norm(particle2.position - particle1.position) >= force_range:
+            return np.zeros(3)
+        return force_function(particle1, particle2, *args, **kwargs)
+
+    batched_function = get_batched_form(force_function)
+    if batched_function is not None:
+        def range_limited_batched_force(distance_vectors: np.ndarray, distances: np.ndarray,
+                                        masses_1: np.ndarray, masses_2: np.ndarray, **kwargs) -> np.ndarray:
+            forces = batched_function(distance_vectors, distances, masses_1, masses_2, **kwargs)
+            return np.where((distances < force_range)[..., np.newaxis], forces, 0.)
+        range_limited_force.batched_form = range_limited_batched_force # type: ignore
+
+    range_limited_force.force_range = float(force_range) # type: ignore
+    return range_limited_force
+
+def get_force_range(force_function: Callable[..., Any]) -> float:
+    """Return the range of the force, or infinite if it isn't limited."""
+    if isinstance(force_function, partial):
+        force_function = force_function.func
+    return getattr(force_function, "force_range", math.inf)
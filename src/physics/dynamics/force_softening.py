@@ -0,0 +1,50 @@
+"""This module contains the softening kernels of the inverse-square couple forces
+
+An inverse-square force blows up when two particles get close, so a close pass needs tiny time steps. A softened force
+is the same one far away, but it is finite (and goes to 0) when the distance goes to 0, as if the particles were
+small clouds instead of points. The couple forces take it as keyword parameters (so it can be `partial`-bound per force):
+- softening_length: [m] ε, 0 means no softening (the exact inverse-square force)
+- softening_kernel: the shape of the cloud
+  - "plummer": `1 / (d² + ε²)^(3/2)`. Simple, but it changes the force at all the distances
+  - "spline": cubic spline kernel (as in GADGET) of radius `h = 2.8 ε` (same depth of potential as Plummer's ε).
+    It is exactly the inverse-square force from the distance `h`
+
+The force of a softened law is `constant * charge1 * charge2 * f(d) * distance_vector` where `f(d)` is `1/d³` without softening.
+
+Functions:
+- get_softened_inverse_cubes: return `f(d)` for the given distances and softening
+"""
+import numpy as np
+
+
+SOFTENING_KERNELS: tuple[str, ...] = ("plummer", "spline")
+SPLINE_RADIUS_RELATION: float = 2.8 # Spline kernel radius of the Plummer-equivalent softening length
+
+
+def get_softened_inverse_cubes(distances: np.ndarray | np.floating | float, softening_length: float = 0.,
+                               softening_kernel: str = "plummer") -> np.ndarray:
+    """Return the factor `f(d)` of the softened inverse-square forces (see module documentation).
+    It is `1/d³` without softening (0 for the pairs at the same position).
+
+    Arguments:
+    distances: [m] array (or scalar) of the distances of the pairs
+    softening_length: [m] ε of the kernel
+    softening_kernel: one of `SOFTENING_KERNELS`
+    """
+    if softening_kernel not in SOFTENING_KERNELS:
+        raise ValueError(f"Invalid softening kernel: {softening_kernel!r} is not in {SOFTENING_KERNELS}")
+    distances = np.asarray(distances, dtype=float)
+    if softening_length <= 0:
+        safe_distances = np.where(distances != 0, distances, np.inf)
+        return 1 / safe_distances**3
+    if softening_kernel == "plummer":
+        return (distances**2 + softening_length**2)**-1.5
+
+    radius = SPLINE_RADIUS_RELATION * softening_length
+    u = distances / radius
+    safe_u = np.where(u != 0, u, 1.)
+    inner_factors = 10.666666666667 + u**2 * (32. * u - 38.4)
+    outer_factors = 21.333333333333 - 48. * u + 38.4 * u**2 - 10.666666666667 * u**3 - 0.066666666667 / safe_u**3
+    safe_distances = np.where(u >= 1, distances, radius)
+    return np.where(u < 0.5, inner_factors / radius**3,
+                    np.where(u < 1, outer_factors / radius**3, 1 / safe_distances**3))
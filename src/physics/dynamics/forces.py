@@ -0,0 +1,145 @@
+"""This module contains dynamic functions to calculate forces that affect particles
+
+Functions:
+- Fictional forces: forces created for testing and creating interesting simulations
+  - Single forces: only operates whith and over one particle
+    - cinematic_cross_velocity_force: force perpendicular to the field and velocity -> Allows circular motion
+  - Couple forces: operates whith and over couple of particles (symmetrically)
+    - cinematic_atraction_force: force inversily proportional to the square distance
+- Realistic forces: realistic forces
+  - Single forces:
+    - viscosity_force: force depending of the particle velocity
+  - Couple forces:
+    - gravitational_force: Newton gravitational force between two particles
+
+Couple and single forces have a batched form (`*_batched`) that computes the force for many pairs (or particles) at once
+(see `batched_forms` module). Couple forces also declare their inverse-square law (`*_law`) for the approximated solvers
+(see `force_laws` module, only if they aren't softened: see `force_softening` module) and read their pair geometry from the cache of the state when it is current (see `pair_geometry`).
+Any couple force can be limited to a range with `force_ranges.limit_force_range` (then only the close pairs are visited)
+"""
+import numpy as np
+#from typing import Callable, Any # Allow to use Callable (what means function) for type hints (specifying the input output of the function as argument)
+from functools import partial, wraps
+
+# My modules
+
+# Relative imports
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from particle import Particle
+from physics.physics_constants import *
+from physics.dynamics.batched_forms import with_batched_form
+from physics.pair_geometry import get_pair_geometry
+from physics.dynamics.force_laws import InverseSquareLaw, with_inverse_square_law
+from physics.dynamics.force_softening import get_softened_inverse_cubes
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'utils')))
+
+
+
+# --- Fictional forces functions --- 
+
+# Single forces
+
+def cinematic_cross_velocity_force_batched(positions: np.ndarray, velocities: np.ndarray, masses: np.ndarray,
+                                           field_vector: np.ndarray | None = None) -> np.ndarray:
+    """Batched form of `cinematic_cross_velocity_force` for arrays of particles."""
+    field_vector = field_vector if field_vector is not None else np.array([0.0, -1.0, 0.0])  # Default field vector
+    return np.linalg.cross(velocities, field_vector)
+
+@with_batched_form(cinematic_cross_velocity_force_batched)
+def cinematic_cross_velocity_force(particle: Particle, field_vector: np.ndarray | None = None) -> np.ndarray:
+    """Calculate a force perpendicular to the field and velocity -> Allows circular motion."""
+    velocity_vector: np.ndarray = particle.velocity.copy()
+    field_vector = field_vector if field_vector is not None else np.array([0.0, -1.0, 0.0])  # Default field vector
+    force: np.ndarray = np.linalg.cross(velocity_vector, field_vector)
+    return force
+
+# Couple forces
+
+def cinematic_atraction_force_batched(distance_vectors: np.ndarray, distances: np.ndarray, 
+                                      masses_1: np.ndarray, masses_2: np.ndarray, 
+                                      atraction_constant: np.floating|float = 1.0,
+                                      softening_length: float = 0., softening_kernel: str = "plummer") -> np.ndarray:
+    """Batched form of `cinematic_atraction_force` for arrays of pairs of particles."""
+    if softening_length > 0:
+        factors = atraction_constant * get_softened_inverse_cubes(distances, softening_length, softening_kernel)
+        return factors[..., np.newaxis] * distance_vectors
+    distances = np.where(distances != 0, distances, np.inf) # Force = 0 if same position
+    force_modules: np.ndarray = atraction_constant / distances**2
+    force_directions: np.ndarray = distance_vectors / distances[..., np.newaxis]
+    return force_modules[..., np.newaxis] * force_directions
+
+def cinematic_atraction_force_law(atraction_constant: np.floating|float = 1.0,
+                                  softening_length: float = 0., softening_kernel: str = "plummer") -> InverseSquareLaw | None:
+    """Inverse-square law of `cinematic_atraction_force`: it doesn't depend on the masses. None if it is softened."""
+    if softening_length > 0:
+        return None
+    return InverseSquareLaw(float(atraction_constant), charge="unit")
+
+@with_batched_form(cinematic_atraction_force_batched)
+@with_inverse_square_law(cinematic_atraction_force_law)
+def cinematic_atraction_force(particle1: Particle, particle2: Particle, atraction_constant: np.floating|float = 1.0,
+                              softening_length: float = 0., softening_kernel: str = "plummer") -> np.ndarray:
+    """Calculate a unitary force between two particles, inversily proportional to the square distance.
+    It can be softened (see `force_softening` module)."""
+    distance_vector, distance, _ = get_pair_geometry(particle1, particle2)
+    if softening_length > 0:
+        return atraction_constant * get_softened_inverse_cubes(distance, softening_length, softening_kernel) * distance_vector
+    force_module: np.floating = atraction_constant / distance**2
+    force_direction: np.ndarray = distance_vector / distance if distance != 0 else np.zeros(3) # Force = 0 if same position
+    return force_module * force_direction
+
+# --- Realistic forces functions ---
+
+# Single forces
+
+def viscosity_force_batched(positions: np.ndarray, velocities: np.ndarray, masses: np.ndarray,
+                            viscosity_constant: np.floating|float = 1.0) -> np.ndarray:
+    """Batched form of `viscosity_force` for arrays of particles."""
+    velocity_modules: np.ndarray = np.linalg.norm(velocities, axis=-1)
+    force_modules: np.ndarray = viscosity_constant * velocity_modules
+    safe_modules = np.where(velocity_modules != 0, velocity_modules, np.inf) # Direction = 0 if there is no velocity
+    force_directions: np.ndarray = - velocities / safe_modules[..., np.newaxis]
+    return force_modules[..., np.newaxis] * force_directions
+
+@with_batched_form(viscosity_force_batched)
+def viscosity_force(particle: Particle, viscosity_constant: np.floating|float = 1.0) -> np.ndarray:
+    """Calculate a unitary viscosity force depending of the particle velocity."""
+    velocity_vector: np.ndarray = particle.velocity.copy()
+    velocity_module: np.floating = np.linalg.norm(velocity_vector)
+    force_module: np.floating = viscosity_constant * velocity_module
+    force_direction: np.ndarray = - velocity_vector / velocity_module if velocity_module != 0 else np.zeros(3)
+    return force_module * force_direction
+#unitary_viscosity_force = partial(viscosity_force, viscosity_constant=1.0)
+
+# Couple forces
+
+def gravitational_force_batched(distance_vectors: np.ndarray, distances: np.ndarray, 
+                                masses_1: np.ndarray, masses_2: np.ndarray,
+                                softening_length: float = 0., softening_kernel: str = "plummer") -> np.ndarray:
+    """Batched form of `gravitational_force` for arrays of pairs of particles."""
+    if softening_length > 0:
+        factors = GRAVITATIONAL_CONSTANT * (masses_1 * masses_2) * get_softened_inverse_cubes(distances, softening_length, softening_kernel)
+        return factors[..., np.newaxis] * distance_vectors
+    distances = np.where(distances != 0, distances, np.inf) # Force = 0 if same position
+    force_modules: np.ndarray = GRAVITATIONAL_CONSTANT * (masses_1 * masses_2) / distances**2
+    force_directions: np.ndarray = distance_vectors / distances[..., np.newaxis]
+    return force_modules[..., np.newaxis] * force_directions
+
+def gravitational_force_law(softening_length: float = 0., softening_kernel: str = "plummer") -> InverseSquareLaw | None:
+    """Inverse-square law of `gravitational_force`: the charges are the masses. None if it is softened."""
+    if softening_length > 0:
+        return None
+    return InverseSquareLaw(float(GRAVITATIONAL_CONSTANT), charge="mass")
+
+@with_batched_form(gravitational_force_batched)
+@with_inverse_square_law(gravitational_force_law)
+def gravitational_force(particle1: Particle, particle2: Particle,
+                        softening_length: float = 0., softening_kernel: str = "plummer") -> np.ndarray:
+    """Calculate the Newton gravitational force between two particles. It can be softened (see `force_softening` module)."""
+    distance_vector, distance, mass_product = get_pair_geometry(particle1, particle2)
+    if softening_length > 0:
+        return GRAVITATIONAL_CONSTANT * mass_product * get_softened_inverse_cubes(distance, softening_length, softening_kernel) * distance_vector
+    force_module: np.floating = GRAVITATIONAL_CONSTANT * mass_product / distance**2
+    force_direction: np.ndarray = distance_vector / distance if distance != 0 else np.zeros(3) # Force = 0 if same position
+    return force_module * force_direction
\ No newline at end of file
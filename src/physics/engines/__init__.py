@@ -0,0 +1,44 @@
+"""This is a package where the engines that apply the couple forces of a `ParticleSpace` are developed.
+
+Every engine gives the same physics (the space couple forces), but computed in a different way.
+
+The package includes:
+- 'CoupleForcesEngine' class: parent class of all the engines.
+- 'DirectEngine' class: Python loop over every pair of particles. Works with any couple force.
+- 'PairwiseEngine' class: vectorized all-pairs numpy kernel (tiled) for the forces with a batched form.
+- 'ThreadedEngine' class: the pairwise kernel with its tiles computed concurrently in a thread pool.
+- 'SharedMemoryEngine' class: the Python loop over pairs split in persistent worker processes (shared memory state).
+- 'BarnesHutEngine' class: O(N log N) octree approximation for the forces with an inverse-square law.
+- 'ParticleMeshEngine' class: FFT grid solver (optionally P³M) for the forces with an inverse-square law.
+- 'NeighbourList' class: Verlet list (with a skin) for applying the range limited forces only to the close pairs.
+- 'find_pairs_within' function: cell list search of the pairs of particles closer than a cutoff.
+- 'get_couple_forces_engine' function: returns the engine (by its config name)
+"""
+
+from .base import CoupleForcesEngine, split_batched_forces, split_inverse_square_forces, split_ranged_forces, expand_ranges
+from .direct import DirectEngine, apply_scalar_couple_forces, get_geometry_cache
+from .pairwise import PairwiseEngine, accumulate_pairwise_accelerations, accumulate_target_accelerations, apply_pairwise_couple_forces
+from .threaded import ThreadedEngine
+from .shared_memory import SharedMemoryEngine
+from .barnes_hut import BarnesHutEngine, Octree, barnes_hut_accelerations
+from .cell_list import NeighbourList, find_pairs_within, accumulate_pair_accelerations
+from .particle_mesh import ParticleMeshEngine
+
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from settings.config_subclasses import ConfigForceEngine
+
+
+ENGINES: dict[str, type[CoupleForcesEngine]] = {engine.name: engine for engine in (DirectEngine, PairwiseEngine, ThreadedEngine, SharedMemoryEngine,
+                                                                                    BarnesHutEngine, ParticleMeshEngine)}
+
+def get_couple_forces_engine(config: ConfigForceEngine) -> CoupleForcesEngine:
+    """Return a new engine of the class named in `config.name`."""
+    try:
+        engine_class = ENGINES[config.name]
+    except KeyError:
+        raise ValueError(f"Invalid force engine: {config.name!r} is not in {tuple(ENGINES)}")
+    return engine_class(config)
+
+
+__all__ = ["CoupleForcesEngine", "DirectEngine", "PairwiseEngine", "ThreadedEngine", "SharedMemoryEngine", "BarnesHutEngine", "ParticleMeshEngine", "NeighbourList", "get_couple_forces_engine"]
@@ -0,0 +1,303 @@
+"""`barnes_hut` module include the `BarnesHutEngine` class: O(N log N) octree solver for inverse-square couple forces
+
+The tree is a linear octree: the particles are sorted by their Morton key (interleaved bits of their cell coordinates)
+so every node is a contiguous range of the sorted particles. Building and walking it is vectorized with numpy,
+walking all the (target particle, node) pairs of a chunk of targets level by level.
+"""
+
+import numpy as np
+from collections.abc import Callable
+from typing import Any
+
+# My modules
+from physics.engines.base import CoupleForcesEngine, split_inverse_square_forces, expand_ranges
+from physics.engines.pairwise import apply_pairwise_couple_forces, accumulate_pairwise_accelerations
+from physics.dynamics.force_laws import InverseSquareLaw
+
+
+MAX_TREE_DEPTH: int = 21 # Bits per axis of the Morton keys (3*21 = 63 bits fit in a uint64)
+
+
+# --- Morton keys ---
+
+def _spread_bits(values: np.ndarray) -> np.ndarray:
+    """Spread the 21 lower bits of each value, leaving two zero bits between them (for interleaving three axes)."""
+    x = values.astype(np.uint64) & np.uint64(0x1FFFFF)
+    x = (x | (x << np.uint64(32))) & np.uint64(0x1F00000000FFFF)
+    x = (x | (x << np.uint64(16))) & np.uint64(0x1F0000FF0000FF)
+    x = (x | (x << np.uint64(8))) & np.uint64(0x100F00F00F00F00F)
+    x = (x | (x << np.uint64(4))) & np.uint64(0x10C30C30C30C30C3)
+    x = (x | (x << np.uint64(2))) & np.uint64(0x1249249249249249)
+    return x
+
+def _compact_bits(values: np.ndarray) -> np.ndarray:
+    """Inverse of `_spread_bits`: take every third bit."""
+    x = values.astype(np.uint64) & np.uint64(0x1249249249249249)
+    x = (x ^ (x >> np.uint64(2))) & np.uint64(0x10C30C30C30C30C3)
+    x = (x ^ (x >> np.uint64(4))) & np.uint64(0x100F00F00F00F00F)
+    x = (x ^ (x >> np.uint64(8))) & np.uint64(0x1F0000FF0000FF)
+    x = (x ^ (x >> np.uint64(16))) & np.uint64(0x1F00000000FFFF)
+    x = (x ^ (x >> np.uint64(32))) & np.uint64(0x1FFFFF)
+    return x
+
+def morton_keys(positions: np.ndarray, origin: np.ndarray, size: float) -> np.ndarray:
+    """Return the Morton key of each position inside the cube of side `size` with its lower corner in `origin`."""
+    number_of_cells = 2**MAX_TREE_DEPTH
+    cells = np.floor((positions - origin) / size * number_of_cells)
+    cells = np.clip(cells, 0, number_of_cells - 1).astype(np.uint64)
+    return (_spread_bits(cells[:, 0]) << np.uint64(2)) | (_spread_bits(cells[:, 1]) << np.uint64(1)) | _spread_bits(cells[:, 2])
+
+
+# --- Octree ---
+
+class Octree:
+    """
+    Linear octree of a set of positions. Nodes are stored as arrays (one value per node, the root is node 0).
+
+    Node arrays:
+        - starts, counts: range of the node particles in the sorted (by Morton key) order
+        - levels, sizes: depth of the node and side of its cube
+        - geometric_centers: center of the node cube
+        - is_leaf: if the node is not subdivided (it has `leaf_size` or less particles)
+        - first_child, children_counts: range of the node children in the node arrays
+    """
+    def __init__(self, positions: np.ndarray, leaf_size: int = 8) -> None:
+        """Init (build) a 'Octree' object
+
+        Possitional-Keyword arguments:
+        positions: [m] (N, 3) array of the positions of the particles
+        leaf_size: max number of particles in a leaf
+        """
+        self.leaf_size: int = max(int(leaf_size), 1)
+        lower, upper = positions.min(axis=0), positions.max(axis=0)
+        size = float(np.max(upper - lower))
+        self.size: float = size * (1 + 1e-9) if size > 0 else 1.0 # Slightly bigger so the upper positions are inside
+        self.origin: np.ndarray = lower
+
+        keys = morton_keys(positions, self.origin, self.size)
+        self.order: np.ndarray = np.argsort(keys, kind="stable") # sorted index -> original index
+        self.keys: np.ndarray = keys[self.order]
+        self.positions: np.ndarray = positions[self.order]
+        self._build_nodes()
+
+    def __len__(self) -> int:
+        """Number of nodes"""
+        return len(self.starts)
+
+    def _build_nodes(self) -> None:
+        """Build the node arrays level by level, only subdividing the nodes with more than `leaf_size` particles."""
+        starts, counts, levels, is_leaf, parents, prefixes = [], [], [], [], [], []
+        active = np.arange(len(self.keys)) # Sorted index of the particles inside not-leaf nodes
+        previous_prefixes, previous_offset, level_offset = np.empty(0, np.uint64), 0, 0
+
+        for level in range(MAX_TREE_DEPTH + 1):
+            level_prefixes = self.keys[active] >> np.uint64(3*(MAX_TREE_DEPTH - level))
+            is_first = np.ones(len(active), bool)
+            is_first[1:] = level_prefixes[1:] != level_prefixes[:-1]
+            first = np.flatnonzero(is_first)
+            level_counts = np.diff(np.append(first, len(active)))
+            level_prefixes = level_prefixes[first]
+            level_is_leaf = (level_counts <= self.leaf_size) | (level == MAX_TREE_DEPTH)
+            if level == 0:
+                level_parents = np.full(len(first), -1)
+            else:
+                level_parents = previous_offset + np.searchsorted(previous_prefixes, level_prefixes >> np.uint64(3))
+
+            starts.append(active[first])
+            counts.append(level_counts)
+            levels.append(np.full(len(first), level))
+            is_leaf.append(level_is_leaf)
+            parents.append(level_parents)
+            prefixes.append(level_prefixes)
+
+            if level_is_leaf.all():
+                break
+            active = active[np.repeat(~level_is_leaf, level_counts)]
+            previous_prefixes, previous_offset = level_prefixes, level_offset
+            level_offset += len(first)
+
+        self.starts: np.ndarray = np.concatenate(starts)
+        self.counts: np.ndarray = np.concatenate(counts)
+        self.levels: np.ndarray = np.concatenate(levels)
+        self.is_leaf: np.ndarray = np.concatenate(is_leaf)
+        self.sizes: np.ndarray = self.size / 2.0**self.levels
+        parents_array = np.concatenate(parents)
+
+        # Children of a node are contiguous: levels are consecutive and each level is sorted as its parents
+        number_of_nodes = len(self.starts)
+        children = np.flatnonzero(parents_array >= 0)
+        children_parents = parents_array[children]
+        self.children_counts: np.ndarray = np.bincount(children_parents, minlength=number_of_nodes)
+        self.first_child: np.ndarray = np.full(number_of_nodes, -1)
+        is_first_child = np.ones(len(children), bool)
+        is_first_child[1:] = children_parents[1:] != children_parents[:-1]
+        self.first_child[children_parents[is_first_child]] = children[is_first_child]
+
+        # Cube center of each node from its Morton prefix
+        node_prefixes = np.concatenate(prefixes)
+        cells = np.stack([_compact_bits(node_prefixes >> np.uint64(shift)) for shift in (2, 1, 0)], axis=1)
+        self.geometric_centers: np.ndarray = self.origin + (cells + 0.5) * self.sizes[:, np.newaxis]
+
+    def get_moments(self, sorted_charges: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return the total charge and the center of charge of each node (monopole moments).
+        The center is the geometric one for nodes without charge."""
+        values = np.concatenate((sorted_charges[:, np.newaxis], sorted_charges[:, np.newaxis] * self.positions), axis=1)
+        values = np.vstack((values, np.zeros((1, 4)))) # So the node ends can be used as `reduceat` indices
+        indices = np.ravel(np.column_stack((self.starts, self.starts + self.counts)))
+        sums = np.add.reduceat(values, indices, axis=0)[::2] # Only the [start, end) sums
+        node_charges = sums[:, 0]
+        has_charge = node_charges != 0
+        node_centers = self.geometric_centers.copy()
+        node_centers[has_charge] = sums[has_charge, 1:] / node_charges[has_charge, np.newaxis]
+        return node_charges, node_centers
+
+    def compute_fields(self, charges: np.ndarray, theta: float = 0.5, chunk_size: int = 512,
+                       targets: np.ndarray | None = None) -> np.ndarray:
+        """Return the (N, 3) inverse-square field of the charges in each particle: sum(charge_j * distance_vector / distance**3)
+
+        The targets are walked in groups (the particles of each leaf) that share the walk decisions, so the cost
+        of walking the tree is divided by the particles per leaf.
+
+        Arguments:
+        charges: (N,) charges of the particles (in the original order)
+        theta: opening angle. A node is used as a single charge if `size / distance < theta`
+            (the distance is reduced by the offset of its center of charge and the group radius,
+            so a node containing a particle of the group is always opened)
+        chunk_size: number of target particles walked at once (bounds the memory)
+        targets: indices of the particles whose field is needed (None for all). Only the leaves with a target are walked,
+            so the field of the other particles may be 0
+        """
+        number_of_particles = len(self.positions)
+        sorted_charges = charges[self.order]
+        node_charges, node_centers = self.get_moments(sorted_charges)
+        opening_distances = self.sizes / max(float(theta), 1e-12) + np.linalg.norm(node_centers - self.geometric_centers, axis=1)
+
+        # Groups: the leaves in the particles order (they cover all the particles) or only the ones with targets
+        leaves = np.flatnonzero(self.is_leaf)
+        leaves = leaves[np.argsort(self.starts[leaves])]
+        if targets is not None:
+            is_target = np.zeros(number_of_particles, bool)
+            is_target[targets] = True
+            leaves = leaves[np.logical_or.reduceat(is_target[self.order], self.starts[leaves])]
+        group_starts, group_counts = self.starts[leaves], self.counts[leaves]
+        group_ends = group_starts + group_counts
+        group_centers = self.geometric_centers[leaves]
+        particles_group, group_particles = expand_ranges(np.arange(len(leaves)), group_starts, group_counts)
+        group_radii = np.zeros(len(leaves))
+        np.maximum.at(group_radii, particles_group, np.linalg.norm(self.positions[group_particles] - group_centers[particles_group], axis=1))
+
+        sorted_fields = np.zeros((number_of_particles, 3))
+        chunk_size = max(int(chunk_size), 1)
+        first_group = 0
+        while first_group < len(leaves):
+            last_group = max(first_group + 1, int(np.searchsorted(group_ends, group_starts[first_group] + chunk_size, side="right")))
+            chunk_start = group_starts[first_group]
+            chunk_fields = sorted_fields[chunk_start:group_ends[last_group - 1]]
+            groups = np.arange(first_group, last_group)
+            nodes = np.zeros(len(groups), int)
+            first_group = last_group
+
+            while len(groups):
+                distance_vectors = np.take(node_centers, nodes, axis=0) - np.take(group_centers, groups, axis=0)
+                distances = np.sqrt(np.einsum("ij,ij->i", distance_vectors, distance_vectors))
+                is_opened = distances - group_radii[groups] <= opening_distances[nodes]
+
+                is_far = ~is_opened # Far nodes act as a single charge for each particle of the group
+                far_nodes, targets = expand_ranges(nodes[is_far], group_starts[groups[is_far]], group_counts[groups[is_far]])
+                distance_vectors = np.take(node_centers, far_nodes, axis=0) - np.take(self.positions, targets, axis=0)
+                self._accumulate(chunk_fields, targets - chunk_start, np.take(node_charges, far_nodes), distance_vectors)
+
+                is_near_leaf = is_opened & self.is_leaf[nodes] # Near leaves are summed particle by particle
+                leaf_nodes, targets = expand_ranges(nodes[is_near_leaf], group_starts[groups[is_near_leaf]], 
+                                                     group_counts[groups[is_near_leaf]])
+                targets, sources = expand_ranges(targets, self.starts[leaf_nodes], self.counts[leaf_nodes])
+                distance_vectors = np.take(self.positions, sources, axis=0) - np.take(self.positions, targets, axis=0)
+                self._accumulate(chunk_fields, targets - chunk_start, np.take(sorted_charges, sources), distance_vectors)
+
+                is_near_internal = is_opened & ~self.is_leaf[nodes] # Near internal nodes are opened
+                internal_nodes = nodes[is_near_internal]
+                groups, nodes = expand_ranges(groups[is_near_internal],
+                                               self.first_child[internal_nodes], self.children_counts[internal_nodes])
+
+        fields = np.empty_like(sorted_fields)
+        fields[self.order] = sorted_fields
+        return fields
+
+    @staticmethod
+    def _accumulate(fields: np.ndarray, targets: np.ndarray, charges: np.ndarray, distance_vectors: np.ndarray) -> None:
+        """Add `charge * distance_vector / distance**3` to the field of each target (targets can be repeated).
+        Sources in the same position than the target (itself) are ignored."""
+        if len(targets) == 0:
+            return
+        distances2 = np.einsum("ij,ij->i", distance_vectors, distance_vectors)
+        distances2[distances2 == 0] = np.inf # Force = 0 if same position
+        weights = charges / (distances2 * np.sqrt(distances2))
+        for axis in range(3):
+            fields[:, axis] += np.bincount(targets, weights=weights * distance_vectors[:, axis], minlength=len(fields))
+
+
+# --- Engine ---
+
+def barnes_hut_accelerations(positions: np.ndarray, masses: np.ndarray, laws: list[InverseSquareLaw],
+                             theta: float = 0.5, leaf_size: int = 8, chunk_size: int = 512,
+                             targets: np.ndarray | None = None) -> np.ndarray:
+    """Return the (N, 3) accelerations caused by the inverse-square laws, approximated with a Barnes–Hut octree.
+    The tree is built once and walked once per kind of charge.
+    If `targets` (indices) are given, only their accelerations are computed (the others are 0)."""
+    accelerations = np.zeros_like(positions)
+    if len(positions) < 2 or not laws:
+        return accelerations
+    tree = Octree(positions, leaf_size)
+    fields: dict[str, np.ndarray] = {}
+    for law in laws:
+        charges = law.get_charges(masses)
+        if law.charge not in fields:
+            fields[law.charge] = tree.compute_fields(charges, theta, chunk_size, targets)
+        accelerations += law.constant * (charges / masses)[:, np.newaxis] * fields[law.charge]
+    if targets is not None:
+        is_target = np.zeros(len(positions), bool)
+        is_target[targets] = True
+        accelerations[~is_target] = 0.
+    return accelerations
+
+def get_relative_errors(positions: np.ndarray, masses: np.ndarray, laws: list[InverseSquareLaw],
+                        theta: float = 0.5, leaf_size: int = 8, chunk_size: int = 512) -> np.ndarray:
+    """Return the (N,) relative error of the Barnes–Hut accelerations against the direct summation of all the pairs.
+    Useful to choose `theta` and `leaf_size` (accuracy vs. speed)."""
+    approximated = barnes_hut_accelerations(positions, masses, laws, theta, leaf_size, chunk_size)
+    exact = np.zeros_like(positions)
+    accumulate_pairwise_accelerations(positions, masses, [law.get_forces for law in laws], exact, chunk_size)
+    exact_modules = np.linalg.norm(exact, axis=1)
+    exact_modules[exact_modules == 0] = np.inf
+    return np.linalg.norm(approximated - exact, axis=1) / exact_modules
+
+
+class BarnesHutEngine(CoupleForcesEngine):
+    """Engine that approximates the couple forces with an inverse-square law using a Barnes–Hut octree: O(N log N).
+    The other forces are applied as in `PairwiseEngine`.
+
+    Uses from ConfigForceEngine:
+    barnes_hut.theta: opening angle (0 is exact; 0.3~0.7 are usual)
+    barnes_hut.leaf_size: max number of particles in a leaf of the tree
+    tile_size: number of target particles walked at once
+    """
+    name = "barnes_hut"
+
+    def apply_couple_forces(self, space: Any, forces: tuple[Callable[..., np.ndarray], ...] | list[Callable[..., np.ndarray]],
+                            targets: np.ndarray | None = None) -> None:
+        laws, other_forces = split_inverse_square_forces(forces)
+        if laws:
+            state = space.state
+            state.accelerations += barnes_hut_accelerations(state.positions, state.masses, laws,
+                                                            self.config.barnes_hut.theta, self.config.barnes_hut.leaf_size,
+                                                            self.config.tile_size, targets)
+        if other_forces:
+            apply_pairwise_couple_forces(space, other_forces, self.config.tile_size, targets,
+                                         geometry_cache_size=self.config.geometry_cache_size)
+
+    def get_relative_errors(self, space: Any) -> np.ndarray:
+        """Return the relative error of each particle acceleration against the direct summation (for the current positions)."""
+        laws, _ = split_inverse_square_forces(space.couple_forces_array)
+        state = space.state
+        return get_relative_errors(state.positions, state.masses, laws, self.config.barnes_hut.theta,
+                                   self.config.barnes_hut.leaf_size, self.config.tile_size)
@@ -0,0 +1,95 @@
+"""`base` module include the `CoupleForcesEngine` class, parent of all the couple forces engines"""
+
+import numpy as np
+from collections.abc import Callable # Allow to use Callable (what means function) for type hints (specifying the input output of the function as argument)
+from typing import Any
+
+# My modules
+from physics.dynamics.batched_forms import get_batched_form
+from physics.dynamics.force_laws import InverseSquareLaw, get_inverse_square_law
+from physics.dynamics.force_ranges import get_force_range
+# Relative imports
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from settings.config_subclasses import ConfigForceEngine
+
+
+class CoupleForcesEngine:
+    """
+    Parent class of the engines that apply the couple forces of a `ParticleSpace` to its particles.
+
+    Class workings:
+        - `apply_couple_forces(space, forces)` adds the acceleration caused by the couple forces to the space particles
+          (only to the `targets` particles if given, for the block time steps)
+        - It reads its parameters from the config when applying, so updating the config changes its behaviour
+        - `close()` releases its workers (threads or processes), if it has them. They are started again when needed
+    """
+    name: str = "" # Name used for selecting the engine in the config
+
+    def __init__(self, config: ConfigForceEngine) -> None:
+        """Init a 'CoupleForcesEngine' object
+
+        Possitional-Keyword arguments:
+        - config: the force engine config (`ConfigSimulation.force_engine`)
+        """
+        self.config: ConfigForceEngine = config
+
+    def __repr__(self) -> str:
+        class_name = self.__class__.__name__
+        return f"{class_name}(config = {repr(self.config)})"
+
+    def apply_couple_forces(self, space: Any, forces: tuple[Callable[..., np.ndarray], ...] | list[Callable[..., np.ndarray]],
+                            targets: np.ndarray | None = None) -> None:
+        """Apply the couple forces to each pair of particles of the `space`.
+        If `targets` (indices) are given, only those particles are accelerated (by all the particles)."""
+        raise NotImplementedError(f"`{self.__class__.__name__}` must define `apply_couple_forces`")
+
+    def close(self) -> None:
+        """Release the workers of the engine (nothing by default)."""
+        pass
+
+
+def split_batched_forces(forces: tuple[Callable[..., np.ndarray], ...] | list[Callable[..., np.ndarray]]
+                         ) -> tuple[list[Callable[..., np.ndarray]], list[Callable[..., np.ndarray]]]:
+    """Split the forces in two lists: the batched forms of the forces that have one, and the forces without batched form."""
+    batched_forces: list[Callable[..., np.ndarray]] = []
+    scalar_forces: list[Callable[..., np.ndarray]] = []
+    for force in forces:
+        batched_force = get_batched_form(force)
+        if batched_force is not None:
+            batched_forces.append(batched_force)
+        else:
+            scalar_forces.append(force)
+    return batched_forces, scalar_forces
+
+def split_inverse_square_forces(forces: tuple[Callable[..., np.ndarray], ...] | list[Callable[..., np.ndarray]]
+                                ) -> tuple[list[InverseSquareLaw], list[Callable[..., np.ndarray]]]:
+    """Split the forces in two lists: the laws of the forces that declare an inverse-square law, and the other forces."""
+    laws: list[InverseSquareLaw] = []
+    other_forces: list[Callable[..., np.ndarray]] = []
+    for force in forces:
+        law = get_inverse_square_law(force)
+        if law is not None:
+            laws.append(law)
+        else:
+            other_forces.append(force)
+    return laws, other_forces
+
+def split_ranged_forces(forces: tuple[Callable[..., np.ndarray], ...] | list[Callable[..., np.ndarray]]
+                        ) -> tuple[list[Callable[..., np.ndarray]], list[Callable[..., np.ndarray]]]:
+    """Split the forces in two lists: the forces limited to a range (see `force_ranges`), and the other forces."""
+    ranged_forces: list[Callable[..., np.ndarray]] = []
+    other_forces: list[Callable[..., np.ndarray]] = []
+    for force in forces:
+        if get_force_range(force) < np.inf:
+            ranged_forces.append(force)
+        else:
+            other_forces.append(force)
+    return ranged_forces, other_forces
+
+def expand_ranges(owners: np.ndarray, starts: np.ndarray, counts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """For each owner `i` return the pairs (owners[i], starts[i] + k) for k in range(counts[i]), as two flat arrays.
+    Used for vectorizing loops over ranges of sorted particles (tree nodes, cells...)."""
+    total = int(counts.sum())
+    first_pair = np.cumsum(counts) - counts # Index of the first pair of each owner
+    return np.repeat(owners, counts), np.repeat(starts - first_pair, counts) + np.arange(total)
@@ -0,0 +1,181 @@
+"""`cell_list` module include the functions for finding the close pairs of particles with a cell list (spatial hash)
+and the `NeighbourList` class (Verlet list) for applying the range limited couple forces
+
+The space is divided in cubic cells of side >= cutoff, so the particles closer than the cutoff are always in the same
+or in neighbour cells. Each pair of neighbour cells is visited once (half shell of 13 neighbours plus the cell itself).
+"""
+
+import numpy as np
+import itertools
+from collections.abc import Callable
+from typing import Any
+
+# My modules
+from physics.engines.base import expand_ranges, split_batched_forces
+from physics.dynamics.force_ranges import get_force_range
+
+
+MAX_CELLS_PER_AXIS: int = 2**20 # So the linear cell keys fit in an int64
+
+# Offsets of the cell itself and half of its 26 neighbours (the other half is visited from the neighbour)
+HALF_SHELL_OFFSETS: np.ndarray = np.array([offset for offset in itertools.product((-1, 0, 1), repeat=3)
+                                           if offset >= (0, 0, 0)])
+
+
+def find_pairs_within(positions: np.ndarray, cutoff: float) -> tuple[np.ndarray, np.ndarray]:
+    """Return the pairs (i, j) of particles closer than `cutoff` (each pair once, i != j) as two index arrays.
+
+    Arguments:
+    positions: [m] (N, 3) array of the positions of the particles
+    cutoff: [m] max distance of the pairs
+    """
+    number_of_particles = len(positions)
+    if number_of_particles < 2 or cutoff <= 0:
+        return np.empty(0, int), np.empty(0, int)
+    lower = positions.min(axis=0)
+    extent = float(np.max(positions.max(axis=0) - lower))
+    cell_size = max(float(cutoff), extent / (MAX_CELLS_PER_AXIS - 1))
+    cells = np.floor((positions - lower) / cell_size).astype(np.int64)
+    dimensions = cells.max(axis=0) + 1
+    keys = (cells[:, 0] * dimensions[1] + cells[:, 1]) * dimensions[2] + cells[:, 2]
+
+    order = np.argsort(keys, kind="stable") # sorted index -> original index
+    sorted_keys = keys[order]
+    sorted_positions = positions[order]
+    is_first = np.ones(number_of_particles, bool)
+    is_first[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    cell_starts = np.flatnonzero(is_first)
+    cell_counts = np.diff(np.append(cell_starts, number_of_particles))
+    cell_keys = sorted_keys[cell_starts]
+    cell_coordinates = cells[order[cell_starts]]
+    all_cells = np.arange(len(cell_starts))
+
+    pairs_1, pairs_2 = [], []
+    for offset in HALF_SHELL_OFFSETS:
+        neighbour_coordinates = cell_coordinates + offset
+        is_inside = np.all((neighbour_coordinates >= 0) & (neighbour_coordinates < dimensions), axis=1)
+        neighbour_keys = (neighbour_coordinates[:, 0] * dimensions[1] + neighbour_coordinates[:, 1]) * dimensions[2] + neighbour_coordinates[:, 2]
+        neighbour_cells = np.minimum(np.searchsorted(cell_keys, neighbour_keys), len(cell_keys) - 1)
+        is_found = is_inside & (cell_keys[neighbour_cells] == neighbour_keys)
+
+        # Every particle of the cell with every particle of the neighbour cell
+        owner_cells, particles = expand_ranges(all_cells[is_found], cell_starts[is_found], cell_counts[is_found])
+        found_neighbours = neighbour_cells[owner_cells]
+        particles, candidates = expand_ranges(particles, cell_starts[found_neighbours], cell_counts[found_neighbours])
+        if not offset.any(): # Same cell: each pair once
+            is_new = candidates > particles
+            particles, candidates = particles[is_new], candidates[is_new]
+
+        distance_vectors = sorted_positions[candidates] - sorted_positions[particles]
+        is_close = np.einsum("ij,ij->i", distance_vectors, distance_vectors) < cutoff**2
+        pairs_1.append(particles[is_close])
+        pairs_2.append(candidates[is_close])
+
+    return order[np.concatenate(pairs_1)], order[np.concatenate(pairs_2)]
+
+
+class NeighbourList:
+    """
+    Verlet neighbour list: the pairs of particles closer than `cutoff + skin`, found with the cell list.
+
+    While no particle has moved more than `skin / 2` since it was built, every pair closer than `cutoff` is still in it.
+    So it is reused between steps (and between the adaptive substeps, which barely move the particles)
+    and it is only rebuilt when a particle has moved far enough, the number of particles or the cutoff has changed.
+    """
+    def __init__(self) -> None:
+        self.pairs_1: np.ndarray = np.empty(0, int)
+        self.pairs_2: np.ndarray = np.empty(0, int)
+        self.cutoff: float = 0.
+        self.skin: float = 0.
+        self.number_of_builds: int = 0 # For checking how often it is rebuilt
+        self._built_positions: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self.pairs_1)
+
+    def __repr__(self) -> str:
+        class_name = self.__class__.__name__
+        return f"{class_name}(cutoff = {self.cutoff}, skin = {self.skin}, pairs = {len(self)})"
+
+    def needs_rebuild(self, positions: np.ndarray, cutoff: float, skin: float) -> bool:
+        """Return whether the list may miss a pair closer than `cutoff` for the given positions."""
+        built_positions = self._built_positions
+        if built_positions is None or built_positions.shape != positions.shape:
+            return True
+        if cutoff != self.cutoff or skin != self.skin:
+            return True
+        displacements = positions - built_positions
+        max_squared_displacement = np.max(np.einsum("ij,ij->i", displacements, displacements), initial=0.)
+        return max_squared_displacement > (skin / 2)**2
+
+    def get_built_positions(self) -> np.ndarray | None:
+        """Return the positions the list was built with (None if it hasn't been built)."""
+        return self._built_positions
+
+    def restore(self, pairs_1: np.ndarray, pairs_2: np.ndarray, cutoff: float, skin: float, built_positions: np.ndarray) -> None:
+        """Set a list built before (e.g. the one of a checkpoint), so it is rebuilt at the same positions as it was."""
+        self.pairs_1, self.pairs_2 = np.asarray(pairs_1, int), np.asarray(pairs_2, int)
+        self.cutoff, self.skin = float(cutoff), float(skin)
+        self._built_positions = np.array(built_positions, dtype=float)
+
+    def get_pairs(self, positions: np.ndarray, cutoff: float, skin: float) -> tuple[np.ndarray, np.ndarray]:
+        """Return the listed pairs (a superset of the pairs closer than `cutoff`), rebuilding the list if needed."""
+        if self.needs_rebuild(positions, cutoff, skin):
+            self.pairs_1, self.pairs_2 = find_pairs_within(positions, cutoff + skin)
+            self.cutoff, self.skin = cutoff, skin
+            self._built_positions = positions.copy()
+            self.number_of_builds += 1
+        return self.pairs_1, self.pairs_2
+
+    def apply_couple_forces(self, space: Any, forces: tuple[Callable[..., np.ndarray], ...] | list[Callable[..., np.ndarray]],
+                            relative_skin: float = 0.2, targets: np.ndarray | None = None) -> None:
+        """Apply the range limited forces to the listed pairs of particles of the space (see `force_ranges` module):
+        vectorized for the forces with a batched form and with a Python loop over the pairs for the others.
+
+        Arguments:
+        relative_skin: skin of the list relative to the largest range of the forces
+        targets: indices of the only particles that are accelerated (None for all)
+        """
+        state = space.state
+        cutoff = max(get_force_range(force) for force in forces)
+        pairs_1, pairs_2 = self.get_pairs(state.positions, cutoff, relative_skin * cutoff)
+        is_target = np.ones(len(state), bool)
+        if targets is not None:
+            is_target[:] = False
+            is_target[targets] = True
+            is_used = is_target[pairs_1] | is_target[pairs_2]
+            pairs_1, pairs_2 = pairs_1[is_used], pairs_2[is_used]
+        batched_forces, scalar_forces = split_batched_forces(forces)
+        if batched_forces:
+            accumulate_pair_accelerations(state.positions, state.masses, pairs_1, pairs_2, batched_forces, state.accelerations,
+                                          None if targets is None else is_target)
+        if scalar_forces:
+            for index_1, index_2 in zip(pairs_1.tolist(), pairs_2.tolist()):
+                particle1, particle2 = space[index_1], space[index_2]
+                for force in scalar_forces:
+                    force_to_apply: np.ndarray = force(particle1, particle2)
+                    if is_target[index_1]:
+                        particle1.apply_force(force_to_apply)
+                    if is_target[index_2]:
+                        particle2.apply_force(-force_to_apply)
+
+
+def accumulate_pair_accelerations(positions: np.ndarray, masses: np.ndarray, pairs_1: np.ndarray, pairs_2: np.ndarray,
+                                  batched_forces: list[Callable[..., np.ndarray]], accelerations: np.ndarray,
+                                  is_target: np.ndarray | None = None) -> None:
+    """Add to `accelerations` the acceleration caused by the batched couple forces between the given pairs of particles
+    (each pair once: the force is applied to both particles, or only to the ones where `is_target` is True)."""
+    distance_vectors = positions[pairs_2] - positions[pairs_1]
+    distances = np.linalg.norm(distance_vectors, axis=1)
+    masses_1, masses_2 = masses[pairs_1], masses[pairs_2]
+    forces = np.zeros_like(distance_vectors)
+    for batched_force in batched_forces:
+        forces += batched_force(distance_vectors, distances, masses_1, masses_2)
+
+    number_of_particles = len(positions)
+    weights_1, weights_2 = (None, None) if is_target is None else (is_target[pairs_1], is_target[pairs_2])
+    for axis in range(positions.shape[1]):
+        forces_1 = forces[:, axis] if weights_1 is None else forces[:, axis] * weights_1
+        forces_2 = forces[:, axis] if weights_2 is None else forces[:, axis] * weights_2
+        accelerations[:, axis] += (np.bincount(pairs_1, weights=forces_1, minlength=number_of_particles)
+                                   - np.bincount(pairs_2, weights=forces_2, minlength=number_of_particles)) / masses
@@ -0,0 +1,59 @@
+"""`direct` module include the `DirectEngine` class: the Python loop over every pair of particles"""
+
+import numpy as np
+from collections.abc import Callable
+from typing import Any
+
+# My modules
+from physics.engines.base import CoupleForcesEngine
+from physics.pair_geometry import PairGeometry
+
+
+def get_geometry_cache(space: Any, geometry_cache_size: int, targets: np.ndarray | None = None) -> PairGeometry | None:
+    """Return the pairs geometry cache of the space state if it is worth it: all the pairs are evaluated (no `targets`)
+    and the space has at most `geometry_cache_size` particles (it stores (N, N) arrays). None if not."""
+    state = space.state
+    if targets is not None or not 1 < len(state) <= geometry_cache_size:
+        return None
+    return state.geometry
+
+def apply_scalar_couple_forces(particles: list[Any], forces: tuple[Callable[..., np.ndarray], ...] | list[Callable[..., np.ndarray]],
+                               targets: np.ndarray | None = None, geometry: PairGeometry | None = None) -> None:
+    """Apply the forces to each pair of the particles, calling each force once per pair.
+    If `targets` (indices) are given, the forces are only applied to them (by all the other particles).
+    If the `geometry` cache of the particles state is given, it is refreshed once so the forces read their pairs from it."""
+    if geometry is None:
+        _loop_scalar_couple_forces(particles, forces, targets)
+        return
+    geometry.refresh()
+    try:
+        _loop_scalar_couple_forces(particles, forces, targets)
+    finally:
+        geometry.release()
+
+def _loop_scalar_couple_forces(particles: list[Any], forces: tuple[Callable[..., np.ndarray], ...] | list[Callable[..., np.ndarray]],
+                               targets: np.ndarray | None = None) -> None:
+    if targets is not None:
+        for i in targets.tolist():
+            particle1 = particles[i]
+            for j, particle2 in enumerate(particles):
+                if j != i:
+                    for force in forces:
+                        particle1.apply_force(force(particle1, particle2))
+        return
+    for i, particle1 in enumerate(particles):
+        for particle2 in particles[i+1:]:
+            for force in forces:
+                force_to_apply: np.ndarray = force(particle1, particle2)
+                particle1.apply_force(force_to_apply)
+                particle2.apply_force(-force_to_apply)
+
+
+class DirectEngine(CoupleForcesEngine):
+    """Engine that calls every couple force for every pair of particles. Slow, but works with any force.
+    The geometry of the pairs is computed once per evaluation for all the forces (`force_engine.geometry_cache_size`)."""
+    name = "direct"
+
+    def apply_couple_forces(self, space: Any, forces: tuple[Callable[..., np.ndarray], ...] | list[Callable[..., np.ndarray]],
+                            targets: np.ndarray | None = None) -> None:
+        apply_scalar_couple_forces(space, forces, targets, get_geometry_cache(space, self.config.geometry_cache_size, targets))
@@ -0,0 +1,134 @@
+"""`pairwise` module include the `PairwiseEngine` class: vectorized all-pairs numpy kernel"""
+
+import numpy as np
+from collections.abc import Callable
+from typing import Any
+
+# My modules
+from physics.engines.base import CoupleForcesEngine, split_batched_forces, split_inverse_square_forces
+from physics.engines.direct import apply_scalar_couple_forces, get_geometry_cache
+from physics.backends import accumulate_inverse_square_accelerations, accumulate_target_inverse_square_accelerations
+
+
+def get_tile_accelerations(positions: np.ndarray, masses: np.ndarray, batched_forces: list[Callable[..., np.ndarray]],
+                           start_1: int, end_1: int, start_2: int, end_2: int) -> tuple[np.ndarray, np.ndarray | None]:
+    """Return the accelerations caused by the batched couple forces between the particles `start_1:end_1` and `start_2:end_2`
+    (a tile of the pairs): the ones of the first particles, and the ones to subtract to the second particles
+    (None for diagonal tiles, which already contain both (i, j) and (j, i) pairs).
+
+    Arguments: as `accumulate_pairwise_accelerations`, and the ranges of particles of the tile
+    """
+    positions_1, masses_1 = positions[..., start_1:end_1, :], masses[..., start_1:end_1]
+    positions_2, masses_2 = positions[..., start_2:end_2, :], masses[..., start_2:end_2]
+
+    distance_vectors = positions_2[..., np.newaxis, :, :] - positions_1[..., :, np.newaxis, :]
+    distances = np.linalg.norm(distance_vectors, axis=-1)
+    forces = np.zeros_like(distance_vectors)
+    for batched_force in batched_forces:
+        forces += batched_force(distance_vectors, distances, masses_1[..., :, np.newaxis], masses_2[..., np.newaxis, :])
+
+    accelerations_1 = forces.sum(axis=-2) / masses_1[..., np.newaxis]
+    if start_2 == start_1:
+        return accelerations_1, None
+    return accelerations_1, forces.sum(axis=-3) / masses_2[..., np.newaxis]
+
+def get_tiles(number_of_particles: int, tile_size: int = 512) -> list[tuple[int, int, int, int]]:
+    """Return the (start_1, end_1, start_2, end_2) ranges of the tiles of the upper triangle of the pairs, in order."""
+    tile_size = max(int(tile_size), 1)
+    return [(start_1, min(start_1 + tile_size, number_of_particles), start_2, min(start_2 + tile_size, number_of_particles))
+            for start_1 in range(0, number_of_particles, tile_size) 
+            for start_2 in range(start_1, number_of_particles, tile_size)]
+
+def add_tile_accelerations(accelerations: np.ndarray, tile: tuple[int, int, int, int],
+                           tile_accelerations: tuple[np.ndarray, np.ndarray | None]) -> None:
+    """Add the accelerations of a tile (see `get_tile_accelerations`) to the (..., N, 3) `accelerations`."""
+    start_1, end_1, start_2, end_2 = tile
+    accelerations_1, accelerations_2 = tile_accelerations
+    accelerations[..., start_1:end_1, :] += accelerations_1
+    if accelerations_2 is not None:
+        accelerations[..., start_2:end_2, :] -= accelerations_2
+
+def accumulate_pairwise_accelerations(positions: np.ndarray, masses: np.ndarray, 
+                                      batched_forces: list[Callable[..., np.ndarray]],
+                                      accelerations: np.ndarray, 
+                                      tile_size: int = 512) -> None:
+    """Add to `accelerations` the acceleration caused by the batched couple forces between all the pairs of particles.
+
+    The pairs are computed in tiles of (at most) `tile_size` × `tile_size` particles, so the memory is bounded.
+    It only computes the tiles of the upper triangle: the force of each tile is applied to both particles (action-reaction).
+    The arrays can have leading axes (e.g. (B, N, 3) for an ensemble): each group of N particles only interacts within itself.
+
+    Arguments:
+    positions: [m] (..., N, 3) array of the positions of the particles
+    masses: [kg] (..., N) array of the masses of the particles
+    batched_forces: batched forms of the couple forces (see `dynamics.batched_forms`)
+    accelerations: [m/s2] (..., N, 3) array updated in place
+    tile_size: max number of particles per side of each tile
+    """
+    for tile in get_tiles(positions.shape[-2], tile_size):
+        add_tile_accelerations(accelerations, tile, get_tile_accelerations(positions, masses, batched_forces, *tile))
+
+
+def accumulate_target_accelerations(positions: np.ndarray, masses: np.ndarray, 
+                                    batched_forces: list[Callable[..., np.ndarray]],
+                                    accelerations: np.ndarray, targets: np.ndarray,
+                                    tile_size: int = 512) -> None:
+    """Add to `accelerations` of the `targets` (indices) the acceleration caused by the batched couple forces
+    of all the particles. The other particles are not accelerated (no action-reaction), so it costs O(targets × N).
+
+    Arguments: as `accumulate_pairwise_accelerations`
+    """
+    number_of_particles = len(positions)
+    tile_size = max(int(tile_size), 1)
+    for start_1 in range(0, len(targets), tile_size):
+        targets_1 = targets[start_1:start_1 + tile_size]
+        positions_1, masses_1 = positions[targets_1], masses[targets_1]
+        target_forces = np.zeros_like(positions_1)
+        for start_2 in range(0, number_of_particles, tile_size):
+            end_2 = min(start_2 + tile_size, number_of_particles)
+            distance_vectors = positions[np.newaxis, start_2:end_2, :] - positions_1[:, np.newaxis, :]
+            distances = np.linalg.norm(distance_vectors, axis=-1)
+            for batched_force in batched_forces: # The force with itself is 0 (same position)
+                target_forces += batched_force(distance_vectors, distances, masses_1[:, np.newaxis], 
+                                               masses[np.newaxis, start_2:end_2]).sum(axis=1)
+        accelerations[targets_1] += target_forces / masses_1[:, np.newaxis]
+
+
+def apply_pairwise_couple_forces(space: Any, forces: tuple[Callable[..., np.ndarray], ...] | list[Callable[..., np.ndarray]], 
+                                 tile_size: int = 512, targets: np.ndarray | None = None, backend: str = "numpy",
+                                 geometry_cache_size: int = 0) -> None:
+    """Apply the forces to each pair of particles of the space: vectorized for the forces with a batched form 
+    and with the Python loop for the others (with the pairs geometry cache if the space has at most `geometry_cache_size`
+    particles). If `targets` (indices) are given, only they are accelerated.
+    With the "numba" backend the forces with an inverse-square law are applied with the compiled kernels."""
+    if backend == "numba":
+        laws, forces = split_inverse_square_forces(forces)
+        state = space.state
+        for law in laws:
+            charges = law.get_charges(state.masses)
+            if targets is None:
+                accumulate_inverse_square_accelerations(state.positions, charges, state.masses, law.constant, state.accelerations)
+            else:
+                accumulate_target_inverse_square_accelerations(state.positions, charges, state.masses, law.constant, 
+                                                               state.accelerations, targets)
+    batched_forces, scalar_forces = split_batched_forces(forces)
+    if batched_forces:
+        state = space.state
+        if targets is None:
+            accumulate_pairwise_accelerations(state.positions, state.masses, batched_forces, state.accelerations, tile_size)
+        else:
+            accumulate_target_accelerations(state.positions, state.masses, batched_forces, state.accelerations, targets, tile_size)
+    if scalar_forces:
+        apply_scalar_couple_forces(space, scalar_forces, targets, get_geometry_cache(space, geometry_cache_size, targets))
+
+
+class PairwiseEngine(CoupleForcesEngine):
+    """Engine that applies the couple forces with a batched form with one vectorized (tiled) pass for all the pairs.
+    The forces without batched form are applied with the Python loop of `DirectEngine`.
+    With the "numba" backend (`ConfigSimulation.backend`) the inverse-square forces are applied with compiled loops.
+    """
+    name = "pairwise"
+
+    def apply_couple_forces(self, space: Any, forces: tuple[Callable[..., np.ndarray], ...] | list[Callable[..., np.ndarray]],
+                            targets: np.ndarray | None = None) -> None:
+        apply_pairwise_couple_forces(space, forces, self.config.tile_size, targets, space.backend, self.config.geometry_cache_size)
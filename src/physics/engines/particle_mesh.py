@@ -0,0 +1,300 @@
+"""`particle_mesh` module include the `ParticleMeshEngine` class: FFT grid solver for inverse-square couple forces
+
+The charges of the particles are deposited on a regular grid (CIC or TSC assignment), the field is solved on the grid
+with `numpy.fft` and interpolated back to the particles with the same assignment: O(N + M log M) for M grid cells.
+- Isolated space: the grid is zero padded to twice its size and convolved with the (softened) field of a unit charge
+- Periodic space: the Poisson equation is solved in Fourier space for a cubic box of side `box_size`
+
+Optionally (P³M) the mesh only solves the long range part of the force (Gaussian split of scale `rs`) and the
+short range part is summed directly for the pairs closer than `SHORT_RANGE_CUTOFF * rs`.
+"""
+
+import numpy as np
+import math
+import itertools
+from collections.abc import Callable
+from typing import Any
+
+# My modules
+from physics.engines.base import CoupleForcesEngine, split_inverse_square_forces
+from physics.engines.pairwise import apply_pairwise_couple_forces
+from physics.engines.cell_list import find_pairs_within
+from physics.dynamics.force_laws import InverseSquareLaw, CHARGE_KINDS
+
+
+ASSIGNMENTS: tuple[str, ...] = ("cic", "tsc")
+SHORT_RANGE_CUTOFF: float = 4.5 # [rs] beyond it the short range part is neglected (erfc(2.25) ~ 1e-3)
+BOX_MARGIN: int = 2 # [cells] empty cells on each side of the isolated grid (so the assignment never leaves it)
+BOX_SLACK: float = 0.25 # Relative room added to the isolated box so it isn't rebuilt every step
+
+
+# --- Assignment ---
+
+def get_assignment(positions: np.ndarray, origin: np.ndarray, cell_size: float, grid_size: int,
+                   assignment: str = "cic", is_periodic: bool = False) -> tuple[np.ndarray, np.ndarray]:
+    """Return the flat grid indices and weights, (K, N) arrays, of the K cells each particle is assigned to.
+    Cell `i` of an axis is centered in `origin + (i + 0.5) * cell_size`.
+
+    Arguments:
+    assignment: "cic" (cloud in cell, 2×2×2 cells) or "tsc" (triangular shaped cloud, 3×3×3 cells)
+    is_periodic: if the indices are wrapped around the grid
+    """
+    coordinates = (positions - origin) / cell_size - 0.5
+    if assignment == "cic":
+        base = np.floor(coordinates)
+        fraction = coordinates - base
+        offsets = (0, 1)
+        axis_weights = [1. - fraction, fraction]
+    elif assignment == "tsc":
+        base = np.floor(coordinates + 0.5)
+        fraction = coordinates - base # in [-0.5, 0.5)
+        offsets = (-1, 0, 1)
+        axis_weights = [0.5 * (0.5 - fraction)**2, 0.75 - fraction**2, 0.5 * (0.5 + fraction)**2]
+    else:
+        raise ValueError(f"Invalid assignment: {assignment!r} is not in {ASSIGNMENTS}")
+    base = base.astype(np.int64)
+
+    indices, weights = [], []
+    for (offset_x, weights_x), (offset_y, weights_y), (offset_z, weights_z) in itertools.product(
+            zip(offsets, axis_weights), repeat=3):
+        cells = base + (offset_x, offset_y, offset_z)
+        if is_periodic:
+            cells %= grid_size
+        indices.append((cells[:, 0] * grid_size + cells[:, 1]) * grid_size + cells[:, 2])
+        weights.append(weights_x[:, 0] * weights_y[:, 1] * weights_z[:, 2])
+    return np.array(indices), np.array(weights)
+
+def deposit(indices: np.ndarray, weights: np.ndarray, charges: np.ndarray, grid_size: int) -> np.ndarray:
+    """Return the (grid_size, grid_size, grid_size) grid with the charge of each cell."""
+    grid = np.bincount(indices.ravel(), weights=(weights * charges).ravel(), minlength=grid_size**3)
+    return grid.reshape((grid_size,) * 3)
+
+def interpolate(indices: np.ndarray, weights: np.ndarray, field_grids: np.ndarray) -> np.ndarray:
+    """Return the (N, 3) field at the particles from the (3, n, n, n) field grids."""
+    flat_fields = field_grids.reshape(3, -1)
+    return np.einsum("kn,ckn->nc", weights, flat_fields[:, indices])
+
+
+# --- Force split ---
+
+def _erfc(x: np.ndarray) -> np.ndarray:
+    """Complementary error function for x >= 0 (Abramowitz & Stegun 7.1.26, absolute error < 1.5e-7)."""
+    t = 1. / (1. + 0.3275911 * x)
+    polynomial = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    return polynomial * np.exp(-x**2)
+
+def get_long_range_factor(distances: np.ndarray, split_scale: float) -> np.ndarray:
+    """Fraction of the inverse-square force solved by the mesh (Gaussian split of scale `split_scale`)."""
+    if split_scale <= 0:
+        return np.ones_like(distances)
+    x = distances / (2 * split_scale)
+    return 1. - _erfc(x) - 2 * x / math.sqrt(math.pi) * np.exp(-x**2)
+
+def get_short_range_factor(distances: np.ndarray, split_scale: float) -> np.ndarray:
+    """Fraction of the inverse-square force summed directly: `1 - get_long_range_factor`."""
+    x = distances / (2 * split_scale)
+    return _erfc(x) + 2 * x / math.sqrt(math.pi) * np.exp(-x**2)
+
+
+# --- Field solvers ---
+
+def get_isolated_kernel_transforms(grid_size: int, cell_size: float, softening: float = 0.,
+                                   split_scale: float = 0.) -> np.ndarray:
+    """Return the (3, 2n, 2n, n+1) real FFT of the field of a unit charge on the zero padded grid of 2n cells per axis.
+    The field at `d` from the charge is `-d / (|d|² + softening²)^(3/2)` (times the long range factor if `split_scale > 0`).
+    """
+    padded_size = 2 * grid_size
+    axis = np.arange(padded_size)
+    axis = np.where(axis < grid_size, axis, axis - padded_size) * cell_size
+    distance_vectors = np.stack(np.meshgrid(axis, axis, axis, indexing="ij"))
+    squared_distances = np.sum(distance_vectors**2, axis=0)
+    softened_distances = np.sqrt(squared_distances + softening**2)
+    factors = np.divide(get_long_range_factor(np.sqrt(squared_distances), split_scale), softened_distances**3,
+                        out=np.zeros_like(squared_distances), where=softened_distances != 0)
+    return np.fft.rfftn(-distance_vectors * factors, axes=(1, 2, 3))
+
+def solve_isolated_field(charge_grid: np.ndarray, kernel_transforms: np.ndarray) -> np.ndarray:
+    """Return the (3, n, n, n) field of the charge grid convolved (zero padded, not periodic) with the kernel."""
+    grid_size = charge_grid.shape[0]
+    padded_shape = (2 * grid_size,) * 3
+    charge_transform = np.fft.rfftn(charge_grid, s=padded_shape)
+    field_grids = np.fft.irfftn(charge_transform * kernel_transforms, s=padded_shape, axes=(1, 2, 3))
+    return field_grids[:, :grid_size, :grid_size, :grid_size]
+
+def solve_periodic_field(charge_grid: np.ndarray, cell_size: float, softening: float = 0., split_scale: float = 0.,
+                         assignment: str = "cic") -> np.ndarray:
+    """Return the (3, n, n, n) field of the periodic charge grid solving the Poisson equation in Fourier space:
+    `E_k = 4π i k ρ_k / k²`. It is smoothed by a Gaussian of width `softening`, the long range filter `exp(-k² rs²)`
+    and deconvolved by the assignment window (applied twice: deposit and interpolation).
+    """
+    grid_size = charge_grid.shape[0]
+    density_transform = np.fft.rfftn(charge_grid / cell_size**3)
+    k_axis = 2 * np.pi * np.fft.fftfreq(grid_size, d=cell_size)
+    k_last_axis = 2 * np.pi * np.fft.rfftfreq(grid_size, d=cell_size)
+    k_vectors = np.meshgrid(k_axis, k_axis, k_last_axis, indexing="ij", sparse=True)
+    squared_k = k_vectors[0]**2 + k_vectors[1]**2 + k_vectors[2]**2
+
+    window_power = 2 if assignment == "cic" else 3
+    window = np.ones_like(squared_k)
+    for k in k_vectors:
+        window = window * np.sinc(k * cell_size / (2 * np.pi))**window_power # np.sinc(x) = sin(πx)/(πx)
+    filters = np.exp(-squared_k * (softening**2 / 2 + split_scale**2)) / window**2
+    potential_factors = np.divide(4 * np.pi * filters, squared_k, out=np.zeros_like(squared_k), where=squared_k != 0)
+
+    return np.stack([np.fft.irfftn(1j * k * potential_factors * density_transform, s=charge_grid.shape)
+                     for k in k_vectors])
+
+
+# --- Short range ---
+
+def accumulate_short_range_accelerations(positions: np.ndarray, masses: np.ndarray, laws: list[InverseSquareLaw],
+                                         split_scale: float, softening: float, accelerations: np.ndarray,
+                                         box_size: float = 0.) -> None:
+    """Add to `accelerations` the short range part of the laws forces, summed directly for the close pairs.
+    If `box_size > 0` the space is periodic and the pairs are searched with the images of the particles near the faces.
+    """
+    cutoff = SHORT_RANGE_CUTOFF * split_scale
+    number_of_particles = len(positions)
+    owners = np.arange(number_of_particles)
+    if box_size > 0: # Add the images (ghosts) that are closer than the cutoff to the box
+        positions = positions % box_size
+        all_positions, all_owners = [positions], [owners]
+        for shift in itertools.product((-1, 0, 1), repeat=3):
+            if shift == (0, 0, 0):
+                continue
+            shifted_positions = positions + np.array(shift) * box_size
+            is_near = np.all((shifted_positions > -cutoff) & (shifted_positions < box_size + cutoff), axis=1)
+            all_positions.append(shifted_positions[is_near])
+            all_owners.append(owners[is_near])
+        positions, owners = np.concatenate(all_positions), np.concatenate(all_owners)
+
+    pairs_1, pairs_2 = find_pairs_within(positions, cutoff)
+    # The pairs with a ghost are only applied to the real particle (the ghost pair is found from the other side too)
+    is_real_1, is_real_2 = pairs_1 < number_of_particles, pairs_2 < number_of_particles
+    is_kept = is_real_1 | is_real_2
+    pairs_1, pairs_2, is_real_1, is_real_2 = pairs_1[is_kept], pairs_2[is_kept], is_real_1[is_kept], is_real_2[is_kept]
+
+    distance_vectors = positions[pairs_2] - positions[pairs_1]
+    distances = np.linalg.norm(distance_vectors, axis=1)
+    factors = get_short_range_factor(distances, split_scale) / (distances**2 + softening**2)**1.5
+    masses_1, masses_2 = masses[owners[pairs_1]], masses[owners[pairs_2]]
+    forces = np.zeros_like(distance_vectors)
+    for law in laws:
+        forces += (law.constant * law.get_charges(masses_1) * law.get_charges(masses_2) * factors)[:, np.newaxis] * distance_vectors
+
+    number_of_dimensions = positions.shape[1]
+    for axis in range(number_of_dimensions):
+        accelerations[:, axis] += np.bincount(owners[pairs_1[is_real_1]], weights=forces[is_real_1, axis],
+                                              minlength=number_of_particles) / masses
+        accelerations[:, axis] -= np.bincount(owners[pairs_2[is_real_2]], weights=forces[is_real_2, axis],
+                                              minlength=number_of_particles) / masses
+
+
+class ParticleMeshEngine(CoupleForcesEngine):
+    """Engine that solves the couple forces with an inverse-square law on a FFT grid: near-linear cost per step.
+    The other forces are applied as in `PairwiseEngine`.
+
+    The mesh smooths the force at the scale of a cell, so it is meant for dense and roughly uniform spaces.
+    For resolving the close encounters enable `short_range_correction` (P³M).
+
+    Uses from ConfigForceEngine:
+    particle_mesh.grid_size: cells per axis of the grid
+    particle_mesh.assignment: "cic" or "tsc"
+    particle_mesh.softening: [m] softening length of the force
+    particle_mesh.is_periodic, particle_mesh.box_size: periodic cubic box [0, box_size)³ instead of isolated space
+    particle_mesh.short_range_correction, particle_mesh.short_range_scale: P³M and its split scale (in cells)
+    tile_size: for the forces without law
+    """
+    name = "particle_mesh"
+
+    def __init__(self, config: Any) -> None:
+        super().__init__(config)
+        self._origin: np.ndarray | None = None # Isolated box (lower corner and side of the cells)
+        self._cell_size: float = 0.
+        self._kernel_key: tuple[Any, ...] | None = None # Parameters of the cached kernel transforms
+        self._kernel_transforms: np.ndarray | None = None
+
+    # --- PROPERTIES ---
+
+    @property
+    def split_scale(self) -> float:
+        """[m] Scale of the short-long range split (0 if there is no short range correction)"""
+        mesh_config = self.config.particle_mesh
+        if not mesh_config.short_range_correction:
+            return 0.
+        return mesh_config.short_range_scale * self._cell_size
+
+    # --- METHODS ---
+
+    def _update_box(self, positions: np.ndarray) -> None:
+        """Update the cell size and origin of the grid so every particle fits in it.
+        The isolated box is kept while the particles are inside and fill at least half of it."""
+        mesh_config = self.config.particle_mesh
+        grid_size = mesh_config.grid_size
+        if mesh_config.is_periodic:
+            self._origin = np.zeros(positions.shape[1])
+            self._cell_size = mesh_config.box_size / grid_size
+            return
+        lower, upper = positions.min(axis=0), positions.max(axis=0)
+        extent = float(np.max(upper - lower))
+        if self._origin is not None:
+            inner_lower = self._origin + BOX_MARGIN * self._cell_size
+            inner_side = (grid_size - 2 * BOX_MARGIN) * self._cell_size
+            if np.all(lower >= inner_lower) and np.all(upper < inner_lower + inner_side) and extent >= inner_side / 2:
+                return
+        side = extent * (1 + BOX_SLACK) if extent > 0 else 1.
+        self._cell_size = side / (grid_size - 2 * BOX_MARGIN)
+        self._origin = (lower + upper) / 2 - side / 2 - BOX_MARGIN * self._cell_size
+
+    def _get_kernel_transforms(self) -> np.ndarray:
+        """Return the isolated kernel transforms, computing them only if the grid or the softening changed."""
+        mesh_config = self.config.particle_mesh
+        key = (mesh_config.grid_size, self._cell_size, mesh_config.softening, self.split_scale)
+        if self._kernel_key != key or self._kernel_transforms is None:
+            self._kernel_transforms = get_isolated_kernel_transforms(*key)
+            self._kernel_key = key
+        return self._kernel_transforms
+
+    def get_fields(self, positions: np.ndarray, charges: np.ndarray) -> np.ndarray:
+        """Return the (N, 3) long range field at each particle: `sum(charge_j * d_ij / |d_ij|³)` solved on the mesh."""
+        mesh_config = self.config.particle_mesh
+        grid_size = mesh_config.grid_size
+        self._update_box(positions)
+        indices, weights = get_assignment(positions, self._origin, self._cell_size, grid_size,  # type: ignore
+                                          mesh_config.assignment, mesh_config.is_periodic)
+        charge_grid = deposit(indices, weights, charges, grid_size)
+        if mesh_config.is_periodic:
+            field_grids = solve_periodic_field(charge_grid, self._cell_size, mesh_config.softening, self.split_scale,
+                                               mesh_config.assignment)
+        else:
+            field_grids = solve_isolated_field(charge_grid, self._get_kernel_transforms())
+        return interpolate(indices, weights, field_grids)
+
+    def apply_couple_forces(self, space: Any, forces: tuple[Callable[..., np.ndarray], ...] | list[Callable[..., np.ndarray]],
+                            targets: np.ndarray | None = None) -> None:
+        laws, other_forces = split_inverse_square_forces(forces)
+        state = space.state
+        if laws and len(state) > 1:
+            mesh_config = self.config.particle_mesh
+            positions, masses = state.positions, state.masses
+            # The mesh is solved for all the particles, the targets only reduce the accelerations that are added
+            accelerations = np.zeros_like(positions)
+            for charge in CHARGE_KINDS: # One mesh solution for all the laws with the same kind of charge
+                charge_laws = [law for law in laws if law.charge == charge]
+                if not charge_laws:
+                    continue
+                constant = sum(law.constant for law in charge_laws)
+                charges = charge_laws[0].get_charges(masses)
+                fields = self.get_fields(positions, charges)
+                accelerations += (constant * charges / masses)[:, np.newaxis] * fields
+            if mesh_config.short_range_correction:
+                box_size = mesh_config.box_size if mesh_config.is_periodic else 0.
+                accumulate_short_range_accelerations(positions, masses, laws, self.split_scale, mesh_config.softening,
+                                                     accelerations, box_size)
+            if targets is None:
+                state.accelerations += accelerations
+            else:
+                state.accelerations[targets] += accelerations[targets]
+        if other_forces:
+            apply_pairwise_couple_forces(space, other_forces, self.config.tile_size, targets,
+                                         geometry_cache_size=self.config.geometry_cache_size)
@@ -0,0 +1,254 @@
+"""`shared_memory` module include the `SharedMemoryEngine` class: the Python loop over pairs split in worker processes
+
+The forces without a batched form are Python functions of two particles, so they can't be vectorized and the threads
+don't help (GIL). This engine keeps persistent worker processes, each one with its own `Particle` objects that are views
+of `multiprocessing.shared_memory` blocks (positions, velocities and masses of the space). In each evaluation the
+coordinator copies the state into the blocks and only sends a "step k ready" signal to the workers: nothing is pickled.
+Each worker applies the forces to its slice of pairs into its own partial accelerations block, and the coordinator
+adds the partial accelerations in the workers order (deterministic for a given number of workers).
+"""
+
+import numpy as np
+import os
+import gc
+import weakref
+import traceback
+import multiprocessing
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection
+from collections.abc import Callable
+from typing import Any
+
+# My modules
+from physics.engines.base import CoupleForcesEngine, split_batched_forces
+from physics.engines.pairwise import accumulate_pairwise_accelerations, accumulate_target_accelerations
+from physics.particle import Particle
+from physics.particle_state import ParticleState
+from physics.trajectory_buffer import TrajectoryBuffer
+# Relative imports
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from settings.config_subclasses import ConfigForceEngine
+
+
+def split_pair_rows(number_of_particles: int, number_of_parts: int) -> list[tuple[int, int]]:
+    """Return the (start, end) rows of each part, so that the parts have the same number of pairs (i, j > i)."""
+    pairs_per_row = np.arange(number_of_particles - 1, -1, -1)
+    cumulative_pairs = np.concatenate(([0], np.cumsum(pairs_per_row)))
+    boundaries = np.searchsorted(cumulative_pairs, np.linspace(0, cumulative_pairs[-1], number_of_parts + 1))
+    boundaries[0], boundaries[-1] = 0, number_of_particles
+    return [(int(start), int(end)) for start, end in zip(boundaries[:-1], boundaries[1:])]
+
+
+class SharedArrays:
+    """
+    The numpy arrays of a group of `multiprocessing.shared_memory` blocks (created by the coordinator, attached by the workers).
+
+    Arrays:
+        - positions, velocities: (N, 3)
+        - masses: (N,)
+        - targets: (N,) indices of the particles to accelerate (only the first ones are used)
+        - partial_accelerations: (W, N, 3) the accelerations computed by each worker
+    """
+    def __init__(self, number_of_particles: int, number_of_workers: int, block_names: dict[str, str] | None = None) -> None:
+        """Create the blocks, or attach to the existing ones if their `block_names` are given."""
+        shapes: dict[str, tuple[tuple[int, ...], type]] = {
+            "positions": ((number_of_particles, 3), np.float64),
+            "velocities": ((number_of_particles, 3), np.float64),
+            "masses": ((number_of_particles,), np.float64),
+            "targets": ((number_of_particles,), np.int64),
+            "partial_accelerations": ((number_of_workers, number_of_particles, 3), np.float64),
+        }
+        self.blocks: dict[str, shared_memory.SharedMemory] = {}
+        for name, (shape, dtype) in shapes.items():
+            size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+            if block_names is None:
+                block = shared_memory.SharedMemory(create=True, size=size)
+            else:
+                block = shared_memory.SharedMemory(name=block_names[name])
+            self.blocks[name] = block
+            setattr(self, name, np.ndarray(shape, dtype, buffer=block.buf))
+        self.is_owner: bool = block_names is None
+
+    @property
+    def block_names(self) -> dict[str, str]:
+        return {name: block.name for name, block in self.blocks.items()}
+
+    def close(self) -> None:
+        """Release the arrays and the blocks (and remove them if they were created here)."""
+        for name in self.blocks:
+            setattr(self, name, None)
+        for block in self.blocks.values():
+            block.close()
+            if self.is_owner:
+                block.unlink()
+        self.blocks = {}
+
+
+def _run_worker(connection: Connection, block_names: dict[str, str], number_of_particles: int, number_of_workers: int,
+                worker_index: int, rows: tuple[int, int], forces: list[Callable[..., np.ndarray]]) -> None:
+    """Process of a worker: attach to the shared blocks and serve the steps until it is stopped."""
+    arrays = SharedArrays(number_of_particles, number_of_workers, block_names)
+    try:
+        _serve_steps(connection, arrays, number_of_particles, number_of_workers, worker_index, rows, forces)
+    finally:
+        gc.collect() # The particles (views of the blocks) must be released before closing the blocks
+        arrays.close()
+        connection.close()
+
+def _serve_steps(connection: Connection, arrays: SharedArrays, number_of_particles: int, number_of_workers: int,
+                 worker_index: int, rows: tuple[int, int], forces: list[Callable[..., np.ndarray]]) -> None:
+    """Loop of a worker: wait for a step signal, apply the forces to its pairs and signal it is done.
+
+    The signals are `(step, number_of_targets)` (-1 means all the pairs, None stops the worker)
+    and the answers `(step, error)` (error is None or the traceback of the exception).
+    """
+    # The particles are views of the shared blocks. The partial accelerations of this worker are their accelerations
+    state = ParticleState(number_of_particles)
+    state.positions, state.velocities, state.masses = arrays.positions, arrays.velocities, arrays.masses # type: ignore
+    state.accelerations = arrays.partial_accelerations[worker_index] # type: ignore
+    trajectory = TrajectoryBuffer(number_of_particles, 1)
+    particles: list[Particle] = []
+    for index in range(number_of_particles):
+        particle = Particle(1.)
+        particle._bind_state(state, trajectory, index)
+        particles.append(particle)
+    while True:
+        step, number_of_targets = connection.recv()
+        if number_of_targets is None:
+            return
+        try:
+            state.accelerations[:] = 0.
+            if number_of_targets < 0:
+                for i in range(*rows):
+                    particle1 = particles[i]
+                    for particle2 in particles[i+1:]:
+                        for force in forces:
+                            force_to_apply: np.ndarray = force(particle1, particle2)
+                            particle1.apply_force(force_to_apply)
+                            particle2.apply_force(-force_to_apply)
+            else:
+                targets_per_worker = -(-number_of_targets // number_of_workers)
+                start = worker_index * targets_per_worker
+                for i in arrays.targets[start:min(start + targets_per_worker, number_of_targets)].tolist(): # type: ignore
+                    particle1 = particles[i]
+                    for j, particle2 in enumerate(particles):
+                        if j != i:
+                            for force in forces:
+                                particle1.apply_force(force(particle1, particle2))
+            connection.send((step, None))
+        except Exception:
+            connection.send((step, traceback.format_exc()))
+
+
+class WorkerPool:
+    """Persistent worker processes that apply a group of forces to the pairs of N particles (see `_run_worker`)."""
+    def __init__(self, number_of_particles: int, number_of_workers: int, forces: list[Callable[..., np.ndarray]]) -> None:
+        """Start the workers. The forces are sent (pickled) only once, so they must be importable functions (or partials)."""
+        self.number_of_particles: int = number_of_particles
+        self.number_of_workers: int = number_of_workers
+        self.forces: tuple[Callable[..., np.ndarray], ...] = tuple(forces)
+        self.arrays: SharedArrays = SharedArrays(number_of_particles, number_of_workers)
+        self.step: int = 0
+        self._connections: list[Connection] = []
+        self._processes: list[multiprocessing.Process] = []
+        for worker_index, rows in enumerate(split_pair_rows(number_of_particles, number_of_workers)):
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_run_worker, daemon=True, name=f"force_engine_{worker_index}",
+                args=(worker_connection, self.arrays.block_names, number_of_particles, number_of_workers, worker_index, rows, forces))
+            process.start()
+            worker_connection.close()
+            self._connections.append(connection)
+            self._processes.append(process)
+        self._finalizer = weakref.finalize(self, WorkerPool._stop, self._connections, self._processes, self.arrays)
+
+    def is_compatible(self, number_of_particles: int, number_of_workers: int, forces: list[Callable[..., np.ndarray]]) -> bool:
+        """Return whether the pool can be used for these particles, workers and forces (if not, a new one is needed)."""
+        return (self.number_of_particles == number_of_particles and self.number_of_workers == number_of_workers
+                and len(self.forces) == len(forces) and all(a is b for a, b in zip(self.forces, forces)))
+
+    def apply_forces(self, positions: np.ndarray, velocities: np.ndarray, masses: np.ndarray,
+                     accelerations: np.ndarray, targets: np.ndarray | None = None) -> None:
+        """Copy the state into the shared blocks, signal the workers and add their partial accelerations to `accelerations`."""
+        arrays = self.arrays
+        np.copyto(arrays.positions, positions) # type: ignore
+        np.copyto(arrays.velocities, velocities) # type: ignore
+        np.copyto(arrays.masses, masses) # type: ignore
+        number_of_targets = -1
+        if targets is not None:
+            number_of_targets = len(targets)
+            arrays.targets[:number_of_targets] = targets # type: ignore
+        self.step += 1
+        for connection in self._connections:
+            connection.send((self.step, number_of_targets))
+        errors = [error for _, error in (connection.recv() for connection in self._connections) if error is not None]
+        if errors:
+            raise RuntimeError(f"A force engine worker failed:\n{errors[0]}")
+        accelerations += arrays.partial_accelerations.sum(axis=0) # type: ignore
+
+    def close(self) -> None:
+        """Stop the workers and release the shared blocks."""
+        self._finalizer()
+
+    @staticmethod
+    def _stop(connections: list[Connection], processes: list[multiprocessing.Process], arrays: SharedArrays) -> None:
+        for connection in connections:
+            try:
+                connection.send((0, None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for connection in connections:
+            connection.close()
+        arrays.close()
+
+
+class SharedMemoryEngine(CoupleForcesEngine):
+    """Engine that applies the couple forces without batched form (Python functions) in persistent worker processes
+    (`force_engine.number_of_processes`, 0 means one per core), each one with a slice of the pairs, sharing the state
+    with `multiprocessing.shared_memory`. The forces with a batched form are applied with the pairwise kernel.
+
+    The forces are sent to the workers when they start, so they must be importable (not lambdas or local functions).
+    The workers are restarted if the number of particles, of processes or the forces change. `close()` stops them.
+    """
+    name = "shared_memory"
+
+    def __init__(self, config: ConfigForceEngine) -> None:
+        super().__init__(config)
+        self._pool: WorkerPool | None = None
+
+    @property
+    def number_of_processes(self) -> int:
+        """Worker processes used: the configured ones, or one per core if it is 0"""
+        return self.config.number_of_processes if self.config.number_of_processes > 0 else (os.cpu_count() or 1)
+
+    def _get_pool(self, number_of_particles: int, forces: list[Callable[..., np.ndarray]]) -> WorkerPool:
+        number_of_workers = max(min(self.number_of_processes, number_of_particles), 1)
+        if self._pool is None or not self._pool.is_compatible(number_of_particles, number_of_workers, forces):
+            self.close()
+            self._pool = WorkerPool(number_of_particles, number_of_workers, forces)
+        return self._pool
+
+    def close(self) -> None:
+        """Stop the worker processes (they are started again when needed)."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+    def apply_couple_forces(self, space: Any, forces: tuple[Callable[..., np.ndarray], ...] | list[Callable[..., np.ndarray]],
+                            targets: np.ndarray | None = None) -> None:
+        batched_forces, scalar_forces = split_batched_forces(forces)
+        state = space.state
+        if batched_forces:
+            if targets is None:
+                accumulate_pairwise_accelerations(state.positions, state.masses, batched_forces, state.accelerations,
+                                                  self.config.tile_size)
+            else:
+                accumulate_target_accelerations(state.positions, state.masses, batched_forces, state.accelerations,
+                                                targets, self.config.tile_size)
+        if scalar_forces and len(state) > 1:
+            pool = self._get_pool(len(state), scalar_forces)
+            pool.apply_forces(state.positions, state.velocities, state.masses, state.accelerations, targets)
@@ -0,0 +1,114 @@
+"""`threaded` module include the `ThreadedEngine` class: the pairwise kernel with its tiles computed in a thread pool"""
+
+import numpy as np
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from collections.abc import Callable
+from typing import Any
+
+# My modules
+from physics.engines.base import CoupleForcesEngine, split_batched_forces
+from physics.engines.direct import apply_scalar_couple_forces, get_geometry_cache
+from physics.engines.pairwise import (get_tiles, get_tile_accelerations, add_tile_accelerations,
+                                      accumulate_pairwise_accelerations, accumulate_target_accelerations)
+# Relative imports
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from settings.config_subclasses import ConfigForceEngine
+
+
+PENDING_TILES_PER_THREAD = 4 # Tiles computed ahead of the reduction by each thread (bounds the memory of the results)
+
+
+def accumulate_threaded_pairwise_accelerations(positions: np.ndarray, masses: np.ndarray,
+                                               batched_forces: list[Callable[..., np.ndarray]],
+                                               accelerations: np.ndarray, executor: ThreadPoolExecutor,
+                                               number_of_threads: int, tile_size: int = 512) -> None:
+    """Same as `accumulate_pairwise_accelerations`, but the tiles are computed concurrently in the `executor` threads
+    (NumPy releases the GIL inside the array operations).
+
+    Each tile returns its own accelerations and they are added in the order of the tiles, the same as the one thread
+    kernel, so the result is deterministic and equal to it whatever the number of threads.
+    """
+    tiles = get_tiles(positions.shape[-2], tile_size)
+    max_pending_tiles = max(number_of_threads * PENDING_TILES_PER_THREAD, 1)
+    pending_tiles: deque[tuple[tuple[int, int, int, int], Future]] = deque()
+    for tile in tiles:
+        pending_tiles.append((tile, executor.submit(get_tile_accelerations, positions, masses, batched_forces, *tile)))
+        if len(pending_tiles) >= max_pending_tiles:
+            done_tile, future = pending_tiles.popleft()
+            add_tile_accelerations(accelerations, done_tile, future.result())
+    while pending_tiles:
+        done_tile, future = pending_tiles.popleft()
+        add_tile_accelerations(accelerations, done_tile, future.result())
+
+def accumulate_threaded_target_accelerations(positions: np.ndarray, masses: np.ndarray,
+                                             batched_forces: list[Callable[..., np.ndarray]],
+                                             accelerations: np.ndarray, targets: np.ndarray,
+                                             executor: ThreadPoolExecutor, tile_size: int = 512) -> None:
+    """Same as `accumulate_target_accelerations`, but each chunk of `tile_size` targets is computed in a thread.
+    The chunks write different rows, so they don't need to be reduced."""
+    tile_size = max(int(tile_size), 1)
+    futures = [executor.submit(accumulate_target_accelerations, positions, masses, batched_forces, accelerations,
+                               targets[start:start + tile_size], tile_size)
+               for start in range(0, len(targets), tile_size)]
+    for future in futures:
+        future.result()
+
+
+class ThreadedEngine(CoupleForcesEngine):
+    """Engine that applies the couple forces with a batched form with the tiled pairwise kernel, computing the tiles
+    concurrently in a pool of `force_engine.number_of_threads` threads (0 means one per core).
+    The result is the same as the one of `PairwiseEngine` (deterministic). The forces without batched form are applied
+    with the Python loop of `DirectEngine`. `close()` shuts the pool down (it is started again when needed).
+    """
+    name = "threaded"
+
+    def __init__(self, config: ConfigForceEngine) -> None:
+        super().__init__(config)
+        self._executor: ThreadPoolExecutor | None = None # Built when needed, rebuilt if the number of threads changes
+        self._executor_threads: int = 0
+
+    @property
+    def number_of_threads(self) -> int:
+        """Threads used: the configured ones, or one per core if it is 0"""
+        return self.config.number_of_threads if self.config.number_of_threads > 0 else (os.cpu_count() or 1)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        number_of_threads = self.number_of_threads
+        if self._executor is None or self._executor_threads != number_of_threads:
+            if self._executor is not None:
+                self._executor.shutdown()
+            self._executor = ThreadPoolExecutor(max_workers=number_of_threads, thread_name_prefix="force_engine")
+            self._executor_threads = number_of_threads
+        return self._executor
+
+    def close(self) -> None:
+        """Shut the thread pool down, waiting for its threads (it is started again when needed)."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+            self._executor_threads = 0
+
+    def apply_couple_forces(self, space: Any, forces: tuple[Callable[..., np.ndarray], ...] | list[Callable[..., np.ndarray]],
+                            targets: np.ndarray | None = None) -> None:
+        batched_forces, scalar_forces = split_batched_forces(forces)
+        if batched_forces:
+            state = space.state
+            tile_size = self.config.tile_size
+            if self.number_of_threads == 1: # Without the pool overhead
+                if targets is None:
+                    accumulate_pairwise_accelerations(state.positions, state.masses, batched_forces, state.accelerations, tile_size)
+                else:
+                    accumulate_target_accelerations(state.positions, state.masses, batched_forces, state.accelerations,
+                                                    targets, tile_size)
+            elif targets is None:
+                accumulate_threaded_pairwise_accelerations(state.positions, state.masses, batched_forces, state.accelerations,
+                                                           self._get_executor(), self.number_of_threads, tile_size)
+            else:
+                accumulate_threaded_target_accelerations(state.positions, state.masses, batched_forces, state.accelerations,
+                                                         targets, self._get_executor(), tile_size)
+        if scalar_forces:
+            apply_scalar_couple_forces(space, scalar_forces, targets,
+                                       get_geometry_cache(space, self.config.geometry_cache_size, targets))
@@ -0,0 +1,38 @@
+"""This is a package where the integrators that advance the state of a `ParticleSpace` in each time step are developed.
+
+Every integrator advances all the particles of the space at once (vectorized in its `ParticleState`).
+
+The package includes:
+- 'Integrator' class: parent class of all the integrators.
+- 'AveragedEulerIntegrator' class: the original scheme (accelerate and translate with the averaged velocity).
+- 'LeapfrogIntegrator' class: kick-drift-kick leapfrog (2nd order symplectic).
+- 'VelocityVerletIntegrator' class: velocity Verlet (2nd order symplectic).
+- 'YoshidaIntegrator' class: Yoshida composition of leapfrogs (4th order symplectic).
+- 'DormandPrinceIntegrator' class: embedded Runge–Kutta 5(4) pair with error controlled substeps.
+- 'get_integrator' function: returns the integrator (by its config name)
+"""
+
+from .base import Integrator, evaluate_accelerations
+from .averaged_euler import AveragedEulerIntegrator
+from .symplectic import SymplecticComposition, LeapfrogIntegrator, VelocityVerletIntegrator, YoshidaIntegrator
+from .runge_kutta import DormandPrinceIntegrator
+
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from settings.config_subclasses import ConfigIntegrator
+
+
+INTEGRATORS: dict[str, type[Integrator]] = {integrator.name: integrator for integrator in (
+    AveragedEulerIntegrator, LeapfrogIntegrator, VelocityVerletIntegrator, YoshidaIntegrator, DormandPrinceIntegrator)}
+
+def get_integrator(config: ConfigIntegrator) -> Integrator:
+    """Return a new integrator of the class named in `config.name`."""
+    try:
+        integrator_class = INTEGRATORS[config.name]
+    except KeyError:
+        raise ValueError(f"Invalid integrator: {config.name!r} is not in {tuple(INTEGRATORS)}")
+    return integrator_class(config)
+
+
+__all__ = ["Integrator", "AveragedEulerIntegrator", "LeapfrogIntegrator", "VelocityVerletIntegrator", "YoshidaIntegrator",
+           "DormandPrinceIntegrator", "get_integrator"]
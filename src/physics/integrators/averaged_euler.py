@@ -0,0 +1,28 @@
+"""`averaged_euler` module include the `AveragedEulerIntegrator` class: the original scheme of the simulator"""
+
+from typing import Any
+
+# My modules
+from .base import Integrator
+from physics.backends import advance_averaged_euler
+
+
+class AveragedEulerIntegrator(Integrator):
+    """
+    Original scheme of the simulator (`Particle.advance_time_step`): accelerate and translate with the averaged velocity.
+        v += a·dt
+        x += (v + last_v)/2 · dt
+
+    One force evaluation per step. Its velocities are first order and it is not symplectic (the energy drifts).
+    """
+    name = "averaged_euler"
+    order = 1
+    force_evaluations = 1
+
+    def advance_time_step(self, space: Any, time_step: float) -> None:
+        state = space.state
+        if space.backend == "numba":
+            advance_averaged_euler(state.positions, state.velocities, state.accelerations, state.acceleration_fields,
+                                   state.last_velocities, state.last_accelerations, state.life_times, time_step)
+            return
+        state.advance_time_step(time_step)
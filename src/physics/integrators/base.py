@@ -0,0 +1,97 @@
+"""`base` module include the `Integrator` class, parent of all the time integration schemes"""
+
+import numpy as np
+from typing import Any
+
+# Relative imports
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from settings.config_subclasses import ConfigIntegrator
+
+
+class Integrator:
+    """
+    Parent class of the schemes that advance the whole state of a `ParticleSpace` by a time step.
+
+    Class workings:
+        - `advance_time_step(space, time_step)` is called with the forces of the start of the step already applied
+          (`state.accelerations`). It can evaluate the forces again inside the step (`evaluate_accelerations`)
+        - After the step the state is shifted as `ParticleState.advance_time_step` does: `last_velocities` are the new
+          velocities, `last_accelerations` the ones of the start of the step and `accelerations` are reset to the fields
+        - The schemes that evaluate the forces at the end of the step keep them, so the space doesn't apply them again
+          at the start of the next one (`restore_accelerations`), unless the positions have changed meanwhile
+        - It reads its parameters from the config when advancing, so updating the config changes its behaviour
+        - The values that change with the steps are saved in the checkpoints (`checkpoint_state`), so a restarted run
+          continues bit-identical
+    """
+    name: str = "" # Name used for selecting the integrator in the config
+    order: int = 0 # Order of the global error of the positions
+    force_evaluations: int = 1 # Force evaluations per step (with the forces kept from the last step)
+
+    def __init__(self, config: ConfigIntegrator) -> None:
+        """Init an 'Integrator' object
+
+        Possitional-Keyword arguments:
+        - config: the integrator config (`ConfigSimulation.integrator`)
+        """
+        self.config: ConfigIntegrator = config
+        self._kept_state: Any = None # State, positions and accelerations of the end of the last step
+        self._kept_positions: np.ndarray | None = None
+        self._kept_accelerations: np.ndarray | None = None
+
+    def __repr__(self) -> str:
+        class_name = self.__class__.__name__
+        return f"{class_name}(config = {repr(self.config)})"
+
+    def advance_time_step(self, space: Any, time_step: float) -> None:
+        """Advance all the particles of the `space` state by `time_step`. The forces of the start must be applied."""
+        raise NotImplementedError(f"`{self.__class__.__name__}` must define `advance_time_step`")
+
+    def restore_accelerations(self, state: Any) -> bool:
+        """Set the accelerations kept from the end of the last step if the state is still there (same positions).
+
+        Returns:
+        True if they have been restored (the forces must not be applied), False if the forces must be applied
+        """
+        if self._kept_state is not state or not np.array_equal(self._kept_positions, state.positions): # type: ignore
+            return False
+        np.copyto(state.accelerations, self._kept_accelerations) # type: ignore
+        return True
+
+    def get_kept_accelerations(self, state: Any) -> np.ndarray | None:
+        """Return the accelerations kept from the end of the last step if the state is still there (None if not)."""
+        if self._kept_state is not state or not np.array_equal(self._kept_positions, state.positions): # type: ignore
+            return None
+        return self._kept_accelerations
+
+    @property
+    def checkpoint_state(self) -> dict[str, Any]:
+        """The values of the integrator that change with the steps, besides the kept accelerations (for saving it, see
+        `restore_checkpoint_state`). The schemes with such values extend it"""
+        return {}
+
+    def restore_checkpoint_state(self, checkpoint_state: dict[str, Any]) -> None:
+        """Set the values saved with `checkpoint_state` (the config is kept)."""
+        pass
+
+    def _keep_accelerations(self, state: Any, accelerations: np.ndarray) -> None:
+        """Keep the accelerations of the end of the step (at the current positions) for the next step."""
+        self._kept_state = state
+        self._kept_positions = state.positions.copy()
+        self._kept_accelerations = accelerations.copy()
+
+    @staticmethod
+    def _finish_time_step(state: Any, time_step: float, start_accelerations: np.ndarray) -> None:
+        """Shift the state properties at the end of the step (as `ParticleState.shift_cinematic_properties`)."""
+        np.copyto(state.last_velocities, state.velocities)
+        np.copyto(state.last_accelerations, start_accelerations)
+        state.reset_accelerations()
+        state.life_times += time_step
+
+
+def evaluate_accelerations(space: Any) -> np.ndarray:
+    """Apply all the forces of the space at the current state and return the accelerations (the state array, not a copy)."""
+    state = space.state
+    state.reset_accelerations()
+    space._apply_all_forces_array()
+    return state.accelerations
@@ -0,0 +1,138 @@
+"""`runge_kutta` module include the `DormandPrinceIntegrator` class: embedded Runge–Kutta 5(4) pair"""
+
+import numpy as np
+import warnings
+from typing import Any
+
+# My modules
+from .base import Integrator, evaluate_accelerations
+from physics.adaptability_manager import MIN_TIME_STEP_WARNING
+
+
+# Dormand–Prince 5(4) Butcher tableau (the last row of A are the 5th order weights)
+A: tuple[tuple[float, ...], ...] = (
+    (),
+    (1/5,),
+    (3/40, 9/40),
+    (44/45, -56/15, 32/9),
+    (19372/6561, -25360/2187, 64448/6561, -212/729),
+    (9017/3168, -355/33, 46732/5247, 49/176, -5103/18656),
+    (35/384, 0., 500/1113, 125/192, -2187/6784, 11/84),
+)
+# Difference between the 5th and the 4th order weights (estimation of the error of the substep)
+ERROR_WEIGHTS: tuple[float, ...] = (71/57600, 0., -71/16695, 71/1920, -17253/339200, 22/525, -1/40)
+
+SAFETY_FACTOR = 0.9 # Of the next substep estimation
+MIN_SUBSTEP_FACTOR = 0.2 # Limits of the change of the substep between two substeps
+MAX_SUBSTEP_FACTOR = 5.
+MIN_RELATIVE_SUBSTEP = 2.**-40 # Smallest substep relative to the time step (if `adaptability.min_time_step` is smaller)
+
+
+class DormandPrinceIntegrator(Integrator):
+    """
+    Embedded Runge–Kutta 5(4) pair (Dormand–Prince, "RK45") for positions and velocities: y' = (v, a(x, v)).
+
+    Each time step is advanced in substeps whose size is controlled with the error estimation of the pair,
+    keeping it under `config.tolerance` (relative to the largest position and velocity of the space).
+    The size of the last substep is kept as the first try of the next time step. The substeps aren't smaller than
+    `adaptability.min_time_step`: there they are accepted whatever the error (with a warning, as the adaptability does),
+    so a close encounter doesn't stall the run. A non-finite error (NaN or infinite) raises a `RuntimeError`.
+    Six force evaluations per accepted substep (the last stage is the first of the next one). Not symplectic, but
+    it works with any force (velocity dependent ones too).
+
+    Attributes:
+        - number_of_substeps: accepted substeps done
+        - number_of_rejections: rejected substeps (repeated smaller)
+    """
+    name = "rk45"
+    order = 5
+    force_evaluations = 6
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._substep: float = 0. # Size of the last accepted substep (0 means the time step)
+        self.number_of_substeps: int = 0
+        self.number_of_rejections: int = 0
+
+    @property
+    def checkpoint_state(self) -> dict[str, Any]:
+        return super().checkpoint_state | {"substep": self._substep, "number_of_substeps": self.number_of_substeps,
+                                           "number_of_rejections": self.number_of_rejections}
+
+    def restore_checkpoint_state(self, checkpoint_state: dict[str, Any]) -> None:
+        super().restore_checkpoint_state(checkpoint_state)
+        self._substep = float(checkpoint_state["substep"])
+        self.number_of_substeps = int(checkpoint_state["number_of_substeps"])
+        self.number_of_rejections = int(checkpoint_state["number_of_rejections"])
+
+    def advance_time_step(self, space: Any, time_step: float) -> None:
+        state = space.state
+        start_accelerations = state.accelerations.copy()
+        accelerations = start_accelerations
+        elapsed_time = 0.
+        min_substep = min(max(space.run_config.adaptability.min_time_step, MIN_RELATIVE_SUBSTEP * time_step), time_step)
+        substep = min(self._substep, time_step) if self._substep > 0 else time_step
+        while time_step - elapsed_time > 1e-12 * time_step:
+            substep = min(substep, time_step - elapsed_time)
+            is_min_substep = substep <= min_substep
+            error, accelerations = self._try_substep(space, substep, accelerations, is_min_substep)
+            if not np.isfinite(error):
+                raise RuntimeError(f"The error of the RK45 substep ({substep:g} s) is {error}: the state isn't finite "
+                                   f"or the forces diverge at life time {space.life_time:g} s")
+            if error <= 1. or is_min_substep:
+                if error > 1.:
+                    warnings.warn(MIN_TIME_STEP_WARNING, RuntimeWarning, stacklevel=2)
+                elapsed_time += substep
+                self.number_of_substeps += 1
+            else:
+                self.number_of_rejections += 1
+            factor = SAFETY_FACTOR * error**-0.2 if error > 0 else MAX_SUBSTEP_FACTOR
+            new_substep = max(substep * min(MAX_SUBSTEP_FACTOR, max(MIN_SUBSTEP_FACTOR, factor)), min_substep)
+            if error <= 1. and time_step - elapsed_time > 1e-12 * time_step:
+                self._substep = new_substep # Not the clipped last one
+            substep = new_substep
+        self._keep_accelerations(state, accelerations)
+        self._finish_time_step(state, time_step, start_accelerations)
+
+    def _try_substep(self, space: Any, substep: float, start_accelerations: np.ndarray,
+                     is_forced: bool = False) -> tuple[float, np.ndarray]:
+        """Try to advance the state by `substep` from the current positions and velocities (with their `start_accelerations`).
+        If the error is accepted (or `is_forced`) the state is left at the end of the substep, if not it is left at the start.
+
+        Returns:
+        The error relative to the tolerance (accepted if not greater than 1), and the accelerations of the state left
+        """
+        state = space.state
+        start_positions = state.positions.copy()
+        start_velocities = state.velocities.copy()
+        velocity_slopes = [start_velocities] # Slopes of the positions in each stage
+        acceleration_slopes = [start_accelerations] # Slopes of the velocities in each stage
+        for coefficients in A[1:]:
+            np.copyto(state.positions, start_positions)
+            np.copyto(state.velocities, start_velocities)
+            for coefficient, velocity, acceleration in zip(coefficients, velocity_slopes, acceleration_slopes):
+                if coefficient:
+                    state.positions += (coefficient * substep) * velocity
+                    state.velocities += (coefficient * substep) * acceleration
+            velocity_slopes.append(state.velocities.copy())
+            acceleration_slopes.append(evaluate_accelerations(space).copy())
+        # The state is at the end of the substep (5th order), estimate the error with the 4th order solution
+        position_error = sum(weight * velocity for weight, velocity in zip(ERROR_WEIGHTS, velocity_slopes) if weight) * substep
+        velocity_error = sum(weight * acceleration for weight, acceleration in zip(ERROR_WEIGHTS, acceleration_slopes) if weight) * substep
+        tolerance = self.config.tolerance
+        position_scale = tolerance * max(np.abs(start_positions).max(initial=0.), np.abs(state.positions).max(initial=0.))
+        velocity_scale = tolerance * max(np.abs(start_velocities).max(initial=0.), np.abs(state.velocities).max(initial=0.))
+        error = max(_get_relative_error(position_error, position_scale), _get_relative_error(velocity_error, velocity_scale))
+        if error <= 1. or is_forced:
+            return error, acceleration_slopes[-1]
+        np.copyto(state.positions, start_positions)
+        np.copyto(state.velocities, start_velocities)
+        return error, start_accelerations
+
+
+def _get_relative_error(error: np.ndarray, scale: float) -> float:
+    """Return the largest error relative to the scale (0 if there is no error, infinite if there is error without scale)."""
+    max_error = float(np.abs(error).max(initial=0.))
+    if max_error == 0.:
+        return 0.
+    return max_error / scale if scale > 0 else np.inf
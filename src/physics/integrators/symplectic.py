@@ -0,0 +1,97 @@
+"""`symplectic` module include the symplectic integrators: leapfrog, velocity Verlet and Yoshida
+
+The symplectic schemes keep the energy error bounded (it oscillates instead of drifting) for the forces that only
+depend on the positions, so orbits can be run with much bigger time steps than with the averaged Euler scheme.
+All of them keep the forces of the end of the step for the start of the next one.
+"""
+
+import numpy as np
+from typing import Any
+
+# My modules
+from .base import Integrator, evaluate_accelerations
+from physics.backends import kick_drift
+
+
+class SymplecticComposition(Integrator):
+    """
+    Composition of kick-drift-kick leapfrog substeps with the given `weights` (fractions of the time step):
+        v += a·h/2 ; x += v·h ; a = a(x) ; v += a·h/2    (h = weight·dt, for each weight)
+
+    One force evaluation per substep, since the last kick of a substep and the first of the next one use the same forces.
+    """
+    weights: tuple[float, ...] = (1.,)
+
+    def advance_time_step(self, space: Any, time_step: float) -> None:
+        state = space.state
+        buffer = state._buffer
+        start_accelerations = state.accelerations.copy()
+        accelerations = start_accelerations
+        is_compiled = space.backend == "numba"
+        for weight in self.weights:
+            substep = weight * time_step
+            if is_compiled:
+                kick_drift(state.positions, state.velocities, accelerations, substep / 2, substep)
+            else:
+                # kick
+                np.multiply(accelerations, substep / 2, out=buffer)
+                state.velocities += buffer
+                # drift
+                np.multiply(state.velocities, substep, out=buffer)
+                state.positions += buffer
+            # forces at the new positions (with the half kicked velocities) and kick
+            accelerations = evaluate_accelerations(space)
+            np.multiply(accelerations, substep / 2, out=buffer)
+            state.velocities += buffer
+        self._keep_accelerations(state, accelerations)
+        self._finish_time_step(state, time_step, start_accelerations)
+
+
+class LeapfrogIntegrator(SymplecticComposition):
+    """Kick-drift-kick leapfrog: second order, symplectic and time reversible. One force evaluation per step."""
+    name = "leapfrog"
+    order = 2
+    force_evaluations = 1
+    weights = (1.,)
+
+
+class YoshidaIntegrator(SymplecticComposition):
+    """Fourth order symplectic composition of three leapfrog substeps (Yoshida, 1990): w1, w0, w1 with
+    w1 = 1/(2 - 2^(1/3)) and w0 = 1 - 2·w1 (a negative substep). Three force evaluations per step."""
+    name = "yoshida4"
+    order = 4
+    force_evaluations = 3
+    weights = (1 / (2 - 2**(1/3)), 1 - 2 / (2 - 2**(1/3)), 1 / (2 - 2**(1/3)))
+
+
+class VelocityVerletIntegrator(Integrator):
+    """
+    Velocity Verlet: second order and symplectic.
+        x += v·dt + a·dt²/2 ; a' = a(x) ; v += (a + a')/2 · dt
+
+    It gives the same steps as the leapfrog for the forces that only depend on the positions. With velocity dependent
+    forces the new forces are evaluated with the velocity predicted for the end of the step (v + a·dt) instead of the
+    half kicked one. One force evaluation per step.
+    """
+    name = "velocity_verlet"
+    order = 2
+    force_evaluations = 1
+
+    def advance_time_step(self, space: Any, time_step: float) -> None:
+        state = space.state
+        buffer = state._buffer
+        start_accelerations = state.accelerations.copy()
+        # x += v·dt + a·dt²/2
+        np.multiply(start_accelerations, time_step / 2, out=buffer)
+        buffer += state.velocities
+        buffer *= time_step
+        state.positions += buffer
+        # predicted velocity v + a·dt, then corrected to v + (a + a')/2 · dt
+        np.multiply(start_accelerations, time_step, out=buffer)
+        state.velocities += buffer
+        accelerations = evaluate_accelerations(space)
+        np.subtract(accelerations, start_accelerations, out=buffer)
+        buffer *= time_step / 2
+        state.velocities += buffer
+        self._keep_accelerations(state, accelerations)
+        self._finish_time_step(state, time_step, start_accelerations)
@@ -0,0 +1,81 @@
+"""`pair_geometry` module include the `PairGeometry` class: the geometry of all the pairs of particles of a state
+
+When several couple forces are applied with the Python loop over the pairs (forces without batched form or the "direct"
+engine), each one computed again `particle2.position - particle1.position` and its norm for the same pair.
+The geometry of all the pairs is computed once per force evaluation instead, and the forces read their pair from it.
+
+Functions:
+- get_pair_geometry: return the distance vector, distance and mass product of a pair (from the cache if it is current)
+"""
+
+import numpy as np
+from typing import Any
+
+
+class PairGeometry:
+    """
+    Cache of the geometry of all the pairs (i, j) of particles of a `ParticleState`.
+
+    Arrays (the pair (i, j) is particle1 = i, particle2 = j):
+        - distance_vectors: [m] (N, N, 3) `positions[j] - positions[i]`
+        - distances: [m] (N, N) norms of the distance vectors
+        - inverse_distances: [1/m] (N, N) inverse of the distances (0 for the pairs at the same position)
+        - mass_products: [kg2] (N, N) `masses[i] * masses[j]`
+
+    Class workings:
+        - `refresh()` is called at the start of a force evaluation: the separations are only recomputed if the positions
+          have changed since the last one (checked in O(N)), and the mass products only if the masses have changed
+          (so they are kept between steps)
+        - It is current from `refresh()` to `release()`: meanwhile the forces get their pair with `get_pair_geometry`.
+          Out of a force evaluation the positions can change at any moment, so the pairs are computed directly
+    """
+    def __init__(self, state: Any) -> None:
+        """Init a 'PairGeometry' object
+
+        Possitional-Keyword arguments:
+        - state: the `ParticleState` whose pairs are cached
+        """
+        self.state = state
+        self.distance_vectors: np.ndarray = np.zeros((0, 0, 3))
+        self.distances: np.ndarray = np.zeros((0, 0))
+        self.inverse_distances: np.ndarray = np.zeros((0, 0))
+        self.mass_products: np.ndarray = np.zeros((0, 0))
+        self.is_current: bool = False
+        self._positions: np.ndarray | None = None # Positions of the cached separations
+        self._masses: np.ndarray | None = None # Masses of the cached mass products
+
+    def __repr__(self) -> str:
+        class_name = self.__class__.__name__
+        return f"{class_name}(number_of_particles = {len(self.distances)}, is_current = {self.is_current})"
+
+    def refresh(self) -> None:
+        """Make the cache current for the positions and masses of the state (recomputing only what has changed)."""
+        positions, masses = self.state.positions, self.state.masses
+        if self._positions is None or not np.array_equal(self._positions, positions):
+            self.distance_vectors = positions[np.newaxis, :, :] - positions[:, np.newaxis, :]
+            self.distances = np.linalg.norm(self.distance_vectors, axis=-1)
+            self.inverse_distances = np.divide(1., self.distances, out=np.zeros_like(self.distances), where=self.distances != 0)
+            self._positions = positions.copy()
+        if self._masses is None or not np.array_equal(self._masses, masses):
+            self.mass_products = masses[:, np.newaxis] * masses[np.newaxis, :]
+            self._masses = masses.copy()
+        self.is_current = True
+
+    def release(self) -> None:
+        """End the force evaluation: the forces compute their pairs again until the next `refresh()`."""
+        self.is_current = False
+
+    def get_pair(self, index1: int, index2: int) -> tuple[np.ndarray, np.floating, np.floating]:
+        """Return the distance vector (from particle `index1` to `index2`), the distance and the mass product of the pair."""
+        return self.distance_vectors[index1, index2], self.distances[index1, index2], self.mass_products[index1, index2]
+
+
+def get_pair_geometry(particle1: Any, particle2: Any) -> tuple[np.ndarray, np.floating, np.floating]:
+    """Return the distance vector `particle2.position - particle1.position`, its norm and the product of the masses.
+    They are read from the geometry of the state of the particles if it is current (during a force evaluation)."""
+    state = particle1._state
+    geometry = state._geometry
+    if geometry is not None and geometry.is_current and particle2._state is state:
+        return geometry.get_pair(particle1._index, particle2._index)
+    distance_vector: np.ndarray = particle2.position - particle1.position
+    return distance_vector, np.linalg.norm(distance_vector), particle1.mass * particle2.mass
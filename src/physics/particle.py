@@ -1,7 +1,6 @@
 """`particle` module include the `Particle` class"""
 
 import numpy as np
-from icecream import ic
 from functools import wraps
 from typing import Any, Callable, TypeVar, ParamSpec
 P = ParamSpec('P')  # For type hinting *args, **kwargs
@@ -11,6 +10,8 @@ InstanceType = TypeVar('InstanceType') # When decorating a method *within* Adapt
 
 # My modules
 from physics.adaptability_manager import AdaptabilityManager
+from physics.particle_state import ParticleState
+from physics.trajectory_buffer import TrajectoryBuffer
 from utils.functions_utils import run_if_condition
 
 # relative imports
@@ -41,39 +42,88 @@ class Particle:
         acceleration_field: [m/s2] a 3D numpy array for a constant acceleration that will be always applied when updating
             to the next step. In x, y, z. Default: (0, 0, 0)
         """
+        # The cinematic state lives in a row of a `ParticleState`. Its own one until a `ParticleSpace` binds it to the space state
+        self._state: ParticleState = ParticleState(1)
+        self._trajectory: TrajectoryBuffer = TrajectoryBuffer(1) # Same for the position history
+        self._index: int = 0
+
         self.mass = mass
-        # np.ndarray is mutable, so initializing with None and then setting to np.zeros(3) is needed
+        # The state properties copy the values into the state row, so the given arrays are not shared
         self.position = initial_position if initial_position is not None else np.zeros(3)
         self.velocity = initial_velocity if initial_velocity is not None else np.zeros(3)
         self.acceleration_field = acceleration_field if acceleration_field is not None else np.zeros(3)
         self.reset_acceleration() # Add the acceleration field to the initial acceleration
         
-        self._last_velocity = np.zeros(3)
-        self._last_acceleration = np.zeros(3)
-        self._position_history = np.empty((0, 3), float)
         self._velocity_diff_history = np.empty((0), float) # For adaptive
-        self._life_time = 0.0
         self._is_being_adaptive: bool = False
         self._is_first_substep: bool = True
 
         self.adaptability = AdaptabilityManager(self._velocity_differential)
 
+    # --- STATE PROPERTIES ---
+    # Views of the particle row in its `ParticleState`. Setters write in the row (never rebind it)
+
+    @property
+    def mass(self) -> float:
+        """[kg] the mass of the particle"""
+        return self._state.masses[self._index]
+
+    @mass.setter
+    def mass(self, value: float) -> None:
+        self._state.masses[self._index] = value
+
+    @property
+    def position(self) -> np.ndarray:
+        """[m] view of the position of the particle"""
+        return self._state.positions[self._index]
+
+    @position.setter
+    def position(self, value: np.ndarray) -> None:
+        self._state.positions[self._index] = value
+
+    @property
+    def velocity(self) -> np.ndarray:
+        """[m/s] view of the velocity of the particle"""
+        return self._state.velocities[self._index]
+
+    @velocity.setter
+    def velocity(self, value: np.ndarray) -> None:
+        self._state.velocities[self._index] = value
+
+    @property
+    def acceleration(self) -> np.ndarray:
+        """[m/s2] view of the acceleration of the particle"""
+        return self._state.accelerations[self._index]
+
+    @acceleration.setter
+    def acceleration(self, value: np.ndarray) -> None:
+        self._state.accelerations[self._index] = value
+
+    @property
+    def acceleration_field(self) -> np.ndarray:
+        """[m/s2] view of the constant acceleration always applied to the particle"""
+        return self._state.acceleration_fields[self._index]
+
+    @acceleration_field.setter
+    def acceleration_field(self, value: np.ndarray) -> None:
+        self._state.acceleration_fields[self._index] = value
+
     # --- PROPERTIES ---
 
     @property
     def last_velocity(self) -> np.ndarray:
         """Read-only access to the last step velocity of the particle."""
-        return self._last_velocity.copy()
+        return self._state.last_velocities[self._index].copy()
 
     @property
     def last_acceleration(self) -> np.ndarray:
         """Read-only access to the last step acceleration of the particle."""
-        return self._last_acceleration.copy()
+        return self._state.last_accelerations[self._index].copy()
 
     @property
     def velocity_to_apply(self) -> np.ndarray:
         """Returns the velocity of the particle that should have when translating the particle positions"""
-        return (self.velocity + self.last_velocity) / 2
+        return (self.velocity + self._state.last_velocities[self._index]) / 2
     
     @property
     def acceleration_to_apply(self) -> np.ndarray:
@@ -82,13 +132,13 @@ class Particle:
 
     @property
     def position_history(self) -> np.ndarray:
-        """Read-only access to the position history."""
-        return self._position_history.copy()
+        """Read-only view of the position history (it doesn't change when more positions are stored)."""
+        return self._trajectory.get_history(self._index)
     
     @property
     def life_time(self) -> float:
         """Read-only access to the life the particle have lived."""
-        return self._life_time
+        return float(self._state.life_times[self._index])
     
     @property
     def is_being_adaptive(self) -> bool:
@@ -116,16 +166,29 @@ class Particle:
                 pass
     
     # --- METHODS ---        
+
+    def _bind_state(self, state: ParticleState, trajectory: TrajectoryBuffer, index: int) -> None:
+        """Make the particle a view of the row `index` of `state` and `trajectory` (the rows must already contain the particle values)."""
+        self._state = state
+        self._trajectory = trajectory
+        self._index = index
     
     # --- RETURNING METHODS ---
+
+    @property
+    def _attributes(self) -> dict[str, Any]:
+        """Attributes to show when printing: the state and trajectory rows instead of the whole (maybe shared) ones"""
+        attributes = {key: value for key, value in self.__dict__.items() if key not in ("_state", "_trajectory", "_index")}
+        return self._state.get_row(self._index) | {"position_history": self.position_history} | attributes
+
     def __str__(self) -> str:
         class_name = self.__class__.__name__
-        attributes = '\n'.join(f"  {key}: {value}" for key, value in self.__dict__.items())
+        attributes = '\n'.join(f"  {key}: {value}" for key, value in self._attributes.items())
         return f"<{class_name} object at {hex(id(self))}>\n{attributes}"
 
     def __repr__(self) -> str:
         class_name = self.__class__.__name__
-        attributes = ', '.join(f"{key} = {repr(value)}" for key, value in self.__dict__.items())
+        attributes = ', '.join(f"{key} = {repr(value)}" for key, value in self._attributes.items())
         return f"{class_name}({attributes})"
     
     # --- adaptive METHODS ---
@@ -178,7 +241,7 @@ class Particle:
     @run_if_condition(lambda self: not self._is_being_adaptive) # Only run if is not being adaptive
     def _store_position_in_history(self) -> None:
         """Stores the current position in the position history."""
-        self._position_history = np.vstack((self.position_history, [self.position]))
+        self._trajectory.store_position(self._index, self.position)
 
     @run_if_condition(lambda self: self._is_first_substep) # Only run if is not being adaptive
     def _store_adaptability_value_in_history(self, time_step: float) -> None:
@@ -187,13 +250,13 @@ class Particle:
 
     def reset_acceleration(self) -> None:
         """Reset the acceleration, making it equal to the acceleration field."""
-        self.acceleration = self.acceleration_field.copy()
+        self.acceleration = self.acceleration_field # The setter copies the values in the state row
 
     def _shift_cinematic_properties(self) -> None:
         """Shift velocity, accelearation properties to `last` and reset acceleration."""
-        self._last_velocity = self.velocity.copy() # .copy() because ndarray is mutable
+        self._state.last_velocities[self._index] = self.velocity
         # velocity is preserved (conservation of momentum)
-        self._last_acceleration = self.acceleration.copy() # .copy() because ndarray is mutable
+        self._state.last_accelerations[self._index] = self.acceleration
         self.reset_acceleration()
 
     def store_current_state(self) -> None:
@@ -208,15 +271,21 @@ class Particle:
         time_step: [s] for how much time do the acceleration occurs. Default: (0, 0, 0)
         """
         #ic(self._is_first_substep)
-        self._store_adaptability_value_in_history(time_step)
-        if time_step < self.adaptability.config.min_time_step:
-            self._set_acceleration_from_threshold_value(time_step)
+        self._prepare_adaptive_time_step(time_step)
         self._do_accelerate(time_step)
         self._do_translate(time_step)
         self.store_current_state()
-        self._life_time += time_step
-        
-        # last thing to do in step
+        self._state.life_times[self._index] += time_step
+        self._finish_time_step()
+
+    def _prepare_adaptive_time_step(self, time_step: float) -> None:
+        """Adaptive bookkeeping that must be done before accelerating the particle in a step."""
+        self._store_adaptability_value_in_history(time_step)
+        if time_step < self.adaptability.config.min_time_step:
+            self._set_acceleration_from_threshold_value(time_step)
+
+    def _finish_time_step(self) -> None:
+        """Last thing to do in a step."""
         if self._is_being_adaptive and self._is_first_substep == True:
             self._is_first_substep = False
 
@@ -0,0 +1,274 @@
+"""`particle_ensemble` module include the `ParticleEnsemble` class"""
+
+import numpy as np
+from functools import partial
+from collections.abc import Callable, Sequence
+from typing import Any
+
+# My modules
+from physics.particle_space import ParticleSpace
+from physics.particle_state import ParticleState
+from physics.trajectory_buffer import TrajectoryBuffer
+from physics.recording_policy import RecordingPolicy
+from physics.engines import split_batched_forces, accumulate_pairwise_accelerations, apply_scalar_couple_forces
+from physics.integrators import Integrator, get_integrator
+from physics.backends import resolve_backend
+# Relative imports
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from settings.config_subclasses import ConfigSimulation
+from utils import print_run_time
+
+
+class ParticleEnsemble:
+    """
+    A group of B independent spaces (members) with the same number of particles N and the same couple forces,
+    advanced together as one batch: the Python cost of each step is paid once for all the members.
+
+    Class workings:
+        - While the members are gathered, the particles of all of them are views of the rows of one (B·N)
+          `ParticleState` (member `b` owns the rows `b·N` to `(b+1)·N`) and their histories share one `TrajectoryBuffer`
+          (`positions` and `get_trajectory_array` return them as (B, N, 3) and (T, B, N, 3) views)
+        - The couple forces with a batched form are applied with one vectorized pass of the pairwise kernel for all the
+          members (the members don't interact), and the single forces with a batched form to the rows of each member
+          (all the rows at once if the members have the same ones). The other forces are applied member by member
+        - The steps are done by the `integrator` of the config, with fixed time steps (no adaptability)
+        - `scatter()` slices each member out into its own state and history (`run_simulation` does it at the end).
+          The members must not be advanced by themselves while they are gathered
+    """
+    def __init__(self, spaces: Sequence[ParticleSpace], simulation_config: ConfigSimulation | None = None) -> None:
+        """Init a 'ParticleEnsemble' object
+
+        Possitional-Keyword arguments:
+        - spaces: the members. All of them must have the same number of particles and the same couple forces
+        - simulation_config: the config of the ensemble (by default the one of the first member)
+        """
+        spaces = list(spaces)
+        if not spaces:
+            raise ValueError("An ensemble needs at least one space")
+        first_space = spaces[0]
+        for space in spaces[1:]:
+            if len(space) != len(first_space):
+                raise ValueError(f"All the spaces of an ensemble must have the same number of particles: {len(space)} != {len(first_space)}")
+            if not _are_same_forces(space.couple_forces_array, first_space.couple_forces_array):
+                raise ValueError("All the spaces of an ensemble must have the same couple forces")
+        self._members: list[ParticleSpace] = spaces
+        self._config: ConfigSimulation = simulation_config if simulation_config is not None else first_space._config
+        self._state: ParticleState | None = None # Built when needed from the members particles
+        self._trajectory: TrajectoryBuffer | None = None # Built with the state
+        self._integrator: Integrator | None = None # Built when needed from the config
+        self._life_time = 0.0
+
+    # --- INITIALASING METHODS ---
+
+    @classmethod
+    def from_preset(cls, init_space: Callable[[], tuple[ParticleSpace, dict]], number_of_members: int,
+                    position_noise: float = 0., velocity_noise: float = 0., seed: int | None = None
+                    ) -> tuple["ParticleEnsemble", dict]:
+        """Return an ensemble of `number_of_members` spaces made with an `init_space` preset (`utils.init_space`),
+        with their initial positions and velocities perturbed by a normal noise, and the custom settings of the preset.
+
+        Possitional-Keyword arguments:
+        - init_space: the preset. Returns a new space and its custom settings each time it is called
+        - number_of_members: B, how many spaces the ensemble has
+        - position_noise: [m] standard deviation of the noise added to each position coordinate
+        - velocity_noise: [m/s] standard deviation of the noise added to each velocity coordinate
+        - seed: of the random generator of the noise
+        """
+        random_generator = np.random.default_rng(seed)
+        spaces: list[ParticleSpace] = []
+        custom_settings: dict = {}
+        for _ in range(number_of_members):
+            space, custom_settings = init_space()
+            state = space.state
+            state.positions += random_generator.normal(0., position_noise, state.positions.shape)
+            state.velocities += random_generator.normal(0., velocity_noise, state.velocities.shape)
+            spaces.append(space)
+        return cls(spaces), custom_settings
+
+    def _gather(self) -> None:
+        """Copy the members particles state and histories into the ensemble `ParticleState` and `TrajectoryBuffer`
+        and bind each particle to its row."""
+        particles = [particle for space in self._members for particle in space]
+        state = ParticleState.from_particles(particles)
+        trajectory = TrajectoryBuffer.from_particles(particles)
+        for index, particle in enumerate(particles):
+            particle._bind_state(state, trajectory, index)
+        for space in self._members:
+            space._outdate_state()
+        self._state = state
+        self._trajectory = trajectory
+
+    # --- PROPERTIES ---
+
+    @property
+    def members(self) -> list[ParticleSpace]:
+        """The spaces of the ensemble"""
+        return self._members
+
+    @property
+    def number_of_members(self) -> int:
+        return len(self._members)
+
+    @property
+    def number_of_particles(self) -> int:
+        """Number of particles of each member"""
+        return len(self._members[0])
+
+    @property
+    def state(self) -> ParticleState:
+        """The (B·N) state shared by all the particles of the members. Gather them if they aren't."""
+        if self._state is None:
+            self._gather()
+        return self._state # type: ignore
+
+    @property
+    def trajectory(self) -> TrajectoryBuffer:
+        """The (T, B·N, 3) position histories of all the particles of the members. Gather them if they aren't."""
+        if self._state is None:
+            self._gather()
+        return self._trajectory # type: ignore
+
+    @property
+    def positions(self) -> np.ndarray:
+        """(B, N, 3) view of the positions of the particles of each member"""
+        return self.state.positions.reshape(self.number_of_members, self.number_of_particles, 3)
+
+    @property
+    def velocities(self) -> np.ndarray:
+        """(B, N, 3) view of the velocities of the particles of each member"""
+        return self.state.velocities.reshape(self.number_of_members, self.number_of_particles, 3)
+
+    @property
+    def integrator(self) -> Integrator:
+        """The integrator that advances the members in each step. It is (re)built if the `integrator` config has changed."""
+        integrator_config = self._config.integrator
+        integrator = self._integrator
+        if integrator is None or integrator.config is not integrator_config or integrator.name != integrator_config.name:
+            integrator = get_integrator(integrator_config)
+            self._integrator = integrator
+        return integrator
+
+    @property
+    def backend(self) -> str:
+        """The backend used for the inner loops of the integrator ("numpy" or "numba"), resolved from the `backend` config."""
+        return resolve_backend(self._config.backend)
+
+    @property
+    def life_time(self) -> float:
+        """Read-only access to the time the ensemble has been advanced."""
+        return self._life_time
+
+    @property
+    def config(self) -> ConfigSimulation:
+        return self._config.copy
+
+    # --- RETURNING METHODS ---
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __getitem__(self, index: int) -> ParticleSpace:
+        return self._members[index]
+
+    def __repr__(self) -> str:
+        class_name = self.__class__.__name__
+        return f"{class_name}(number_of_members = {self.number_of_members}, number_of_particles = {self.number_of_particles})"
+
+    def get_trajectory_array(self, steps_relation: int = 1) -> np.ndarray:
+        """Return a read-only (T, B, N, 3) view of the position histories of all the members (`steps_relation` times smaller)."""
+        trajectory_array = self.trajectory.get_array(steps_relation)
+        return trajectory_array.reshape(len(trajectory_array), self.number_of_members, self.number_of_particles, 3)
+
+    # --- OPERATING METHODS ---
+
+    def _apply_single_forces_array(self) -> None:
+        """Apply the single forces of each member to its particles: the ones with a batched form to the rows of the
+        member (to all the rows at once if every member has the same single forces), the others particle by particle."""
+        state = self.state
+        first_forces = self._members[0].single_forces_array
+        have_same_forces = all(_are_same_forces(space.single_forces_array, first_forces) for space in self._members[1:])
+        if have_same_forces:
+            batched_forces, _ = split_batched_forces(first_forces)
+            if batched_forces:
+                state.apply_batched_single_forces(batched_forces)
+        for index, space in enumerate(self._members):
+            batched_forces, scalar_forces = split_batched_forces(space.single_forces_array)
+            if batched_forces and not have_same_forces:
+                rows = slice(index * self.number_of_particles, (index + 1) * self.number_of_particles)
+                state.apply_batched_single_forces(batched_forces, rows)
+            for particle in space:
+                for force in scalar_forces:
+                    particle.apply_force(force(particle))
+
+    def _apply_couple_forces_array(self) -> None:
+        """Apply the couple forces to each pair of particles of each member: the ones with a batched form for all the
+        members at once, the others member by member."""
+        batched_forces, scalar_forces = split_batched_forces(self._members[0].couple_forces_array)
+        if batched_forces:
+            state = self.state
+            shape = (self.number_of_members, self.number_of_particles)
+            accumulate_pairwise_accelerations(state.positions.reshape(shape + (3,)), state.masses.reshape(shape), batched_forces,
+                                              state.accelerations.reshape(shape + (3,)), self._config.force_engine.tile_size)
+        if scalar_forces:
+            for space in self._members:
+                apply_scalar_couple_forces(space, scalar_forces)
+
+    def _apply_all_forces_array(self) -> None:
+        """Group the application of all the forces"""
+        self._apply_single_forces_array()
+        self._apply_couple_forces_array()
+
+    def iterate_time_step(self, time_step: float = 1.) -> None:
+        """Advance all the members applying the forces for the given step. No adaptability."""
+        state = self.state
+        if not self.integrator.restore_accelerations(state):
+            self._apply_all_forces_array()
+        self.integrator.advance_time_step(self, time_step)
+        self._trajectory.store_positions(state.positions) # type: ignore
+        self._life_time += time_step
+        for space in self._members:
+            space._life_time += time_step
+
+    def scatter(self) -> None:
+        """Slice each member out of the ensemble: copy its rows and histories into its own state and trajectory."""
+        if self._state is None:
+            return
+        for space in self._members:
+            space._build_state()
+        self._state = None
+        self._trajectory = None
+
+    @print_run_time
+    def run_simulation(self) -> None:
+        """Iterates all the members for the given steps and slice them out at the end (`scatter`).
+
+        Uses from ConfigSimulation:
+        numer_of_time_steps: [s] the number of time steps to advance each member.
+        time_step: [s] the time step to advance each member.
+        recording: which steps are stored in the trajectory (see `recording_policy` module)
+        """
+        if self._config.could_crass:
+            raise Exception("Too many time steps could crash")
+
+        number_of_time_steps = self._config.number_of_time_steps
+        recording_policy = RecordingPolicy(self._config.recording, number_of_time_steps, self._config.time_step)
+        for step in range(1, number_of_time_steps + 1):
+            with recording_policy.recording_step(self.trajectory, step):
+                self.iterate_time_step(self._config.time_step)
+        self.scatter()
+
+
+def _are_same_forces(forces_1: Sequence[Callable[..., Any]], forces_2: Sequence[Callable[..., Any]]) -> bool:
+    """Return whether both groups of forces are the same (the same functions, with the same arguments if they are partials)."""
+    if len(forces_1) != len(forces_2):
+        return False
+    for force_1, force_2 in zip(forces_1, forces_2):
+        if force_1 is force_2:
+            continue
+        if not (isinstance(force_1, partial) and isinstance(force_2, partial)):
+            return False
+        if force_1.func is not force_2.func or repr(force_1.args) != repr(force_2.args) \
+                or repr(force_1.keywords) != repr(force_2.keywords):
+            return False
+    return True
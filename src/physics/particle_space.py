@@ -0,0 +1,671 @@
+"""`particle_space` module include the `ParticleSpace` class"""
+
+import numpy as np
+from collections.abc import Callable, Iterator # Allow to use Callable (what means function) for type hints (specifying the input output of the function as argument)
+from typing import Any
+from contextlib import contextmanager
+
+
+# My modules
+from physics.particle import Particle, AdaptabilityManager
+from physics.particle_state import ParticleState
+from physics.trajectory_buffer import TrajectoryBuffer, _read_only
+from physics.simulation_frame import SimulationFrame
+from physics.block_time_steps import advance_block_time_step
+from physics.engines import (CoupleForcesEngine, NeighbourList, get_couple_forces_engine, split_ranged_forces, split_batched_forces,
+                             split_inverse_square_forces)
+from physics.integrators import Integrator, get_integrator
+from physics.backends import resolve_backend
+from physics.regularization import EncounterPairs, find_encounter_pairs
+from physics.recording_policy import RecordingPolicy
+from physics.checkpoint import Checkpointer, write_checkpoint, read_checkpoint, get_force_identifier, resolve_force
+# Relative imports
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from settings.config_subclasses import ConfigSimulation, FrozenConfigSimulation
+from settings.nestedhash import NestedHash
+from settings import Config, CONFIGURATION
+from utils import print_run_time
+
+
+
+
+
+class ParticleSpace(list):
+    """A class for managing a space containing multiple particles. Inherits from list.
+    
+    The cinematic state of all the particles is stored in a `ParticleState` (contiguous (N, 3) arrays) and each particle
+    is a view of its row, so the space can advance them with vectorized operations.
+    The position histories are stored the same way in a shared (T, N, 3) `TrajectoryBuffer`.
+    The state is rebuilt (lazily) when the list of particles changes.
+    The close encounters of pairs can be regularized in each step (see `regularization` module).
+    A running space can be saved between two steps and restarted later (see `checkpoint` module).
+    The steps read an immutable snapshot of the config compiled when the run starts (`run_config`), not the config.
+    """
+    def __init__(self, 
+                 *particles: tuple[Particle], 
+                 single_forces_array: tuple[Callable[[Particle], np.ndarray], ...] | None = None,
+                 simulation_config: ConfigSimulation = CONFIGURATION.simulation,
+                 couple_forces_array: tuple[Callable[[Particle, Particle], np.ndarray], ...] | None = None,
+                 ) -> None:
+        super().__init__(particles)
+        self._state: ParticleState | None = None # Built when needed from the particles
+        self._trajectory: TrajectoryBuffer | None = None # Built with the state
+        self._single_forces_array = single_forces_array if single_forces_array is not None else ()
+        self._couple_forces_array = couple_forces_array if couple_forces_array is not None else ()
+        self._couple_forces_engine: CoupleForcesEngine | None = None # Built when needed from the config
+        self._neighbour_list = NeighbourList() # For the range limited couple forces. Rebuilt by itself when needed
+        self._integrator: Integrator | None = None # Built when needed from the config
+        self._encounter_pairs: EncounterPairs | None = None # Close pairs regularized in the current step
+        self._recording_policy: RecordingPolicy | None = None # Of the last run (kept for continuing it)
+        self._run_config: FrozenConfigSimulation | None = None # Snapshot of the config while running
+        self._frozen_config: tuple[ConfigSimulation, int, FrozenConfigSimulation] | None = None # Last compiled snapshot
+        self.config = simulation_config
+        
+        self._life_time = 0.0
+        
+        self._is_being_adaptive = False
+
+    # --- PROPERTIES ---
+
+    @property
+    def state(self) -> ParticleState:
+        """The state (structure of arrays) shared by all the particles in the space. Build it if it is outdated."""
+        if self._state is None:
+            self._build_state()
+        return self._state # type: ignore
+
+    @property
+    def trajectory(self) -> TrajectoryBuffer:
+        """The position histories (T, N, 3) shared by all the particles in the space. Build it if it is outdated."""
+        if self._state is None:
+            self._build_state()
+        return self._trajectory # type: ignore
+    
+    @property
+    def single_forces_array(self) -> tuple[Callable[[Particle], np.ndarray], ...]:
+        """Get the tuple of forces fucntions that are applied on individual particles."""
+        return self._single_forces_array
+
+    @property
+    def couple_forces_array(self) -> tuple[Callable[[Particle, Particle], np.ndarray], ...]:
+        """Get the tuple of forces fucntions that are applied on pairs of particles."""
+        return self._couple_forces_array
+    
+    def set_forces_to_apply(self, /, 
+                            single_forces_array: tuple[Callable[[Particle], np.ndarray], ...] | None = None,
+                            couple_forces_array: tuple[Callable[[Particle, Particle], np.ndarray], ...] | None = None
+                            ) -> None:
+        """Set the tuple of functions that operate on individual particles.
+        
+        Keyword Arguments:
+        single_forces_array: A tuple of functions that will be applied to each particle in the space individually.
+        couple_forces_array: A tuple of functions that will be applied to each pair of particles in the space.
+        """
+        if single_forces_array is not None:
+            # If single_forces_array is not None, set it. Otherwise, keep the existing value
+            self._single_forces_array = single_forces_array
+        if couple_forces_array is not None:
+            # If couple_forces_array is not None, set it. Otherwise, keep the existing value
+            self._couple_forces_array = couple_forces_array
+
+    @property
+    def couple_forces_engine(self) -> CoupleForcesEngine:
+        """The engine that applies the couple forces. It is (re)built if the `force_engine` config has changed (closing
+        the replaced one, so its workers are released)."""
+        engine = self._couple_forces_engine
+        if engine is not None and self._run_config is not None: # The config isn't read while running
+            return engine
+        engine_config = self._config.force_engine
+        if engine is None or engine.config is not engine_config or engine.name != engine_config.name:
+            if engine is not None:
+                engine.close()
+            engine = get_couple_forces_engine(engine_config)
+            self._couple_forces_engine = engine
+        return engine
+
+    @property
+    def integrator(self) -> Integrator:
+        """The integrator that advances the particles in each step. It is (re)built if the `integrator` config has changed."""
+        integrator = self._integrator
+        if integrator is not None and self._run_config is not None: # The config isn't read while running
+            return integrator
+        integrator_config = self._config.integrator
+        if integrator is None or integrator.config is not integrator_config or integrator.name != integrator_config.name:
+            integrator = get_integrator(integrator_config)
+            self._integrator = integrator
+        return integrator
+
+    @property
+    def backend(self) -> str:
+        """The backend used for the inner loops ("numpy" or "numba"), resolved from the `backend` config."""
+        return resolve_backend(self.run_config.backend)
+
+    @property
+    def neighbour_list(self) -> NeighbourList:
+        """The Verlet neighbour list used for the range limited couple forces (see `dynamics.force_ranges`)."""
+        return self._neighbour_list
+
+    @property
+    def position_history_array(self) -> tuple[np.ndarray, ...]:
+        """Return a tuple of position history arrays (read-only views) for each particle in the space."""
+        trajectory = self.trajectory
+        return tuple(trajectory.get_history(index) for index in range(len(self)))
+
+    @property
+    def recommended_division_for_steps(self) -> int:
+        return_value = int(max(particle.adaptability.recommended_division_for_steps for particle in self))
+        return return_value
+    
+    @property
+    def life_time(self) -> float:
+        """Read-only access to the life the particle have lived."""
+        return self._life_time
+    
+    @property
+    def is_being_adaptive(self) -> bool:
+        return self._is_being_adaptive
+
+    @is_being_adaptive.setter
+    def is_being_adaptive(self, state: bool) -> None:
+        state = bool(state)
+        if state != self._is_being_adaptive:    # Only works if it alternate it state
+            self._is_being_adaptive = state
+            for particle in self:
+                particle.is_being_adaptive = state
+            
+            if state == True:
+                pass
+            else:
+                pass
+
+    @property
+    def config(self) -> ConfigSimulation:
+        return self._config.copy
+    
+    @config.setter
+    def config(self, new_simulation_config: ConfigSimulation) -> None:
+        self._config = new_simulation_config
+        for particle in self:
+            particle.adaptability.config = new_simulation_config.adaptability
+
+    @property
+    def run_config(self) -> FrozenConfigSimulation:
+        """The frozen snapshot of the config read by the steps of the current run (the current one if it isn't running)."""
+        return self._run_config if self._run_config is not None else self._get_frozen_config()
+
+    def _get_frozen_config(self) -> FrozenConfigSimulation:
+        """Return the frozen snapshot of the config. It is only compiled again if a config has been changed since the
+        last one (see `NestedHash.modification_count`), so reading it outside the runs is cheap."""
+        modification_count = NestedHash.modification_count
+        if self._frozen_config is not None:
+            config, last_modification_count, frozen_config = self._frozen_config
+            if config is self._config and last_modification_count == modification_count:
+                return frozen_config
+        frozen_config = self._config.frozen
+        self._frozen_config = (self._config, modification_count, frozen_config)
+        return frozen_config
+            
+    # --- INITIALASING METHODS ---
+
+    def _build_state(self) -> None:
+        """Copy the particles state and histories into a new space `ParticleState` and `TrajectoryBuffer` 
+        and bind each particle to its row."""
+        state = ParticleState.from_particles(self)
+        trajectory = TrajectoryBuffer.from_particles(self)
+        for index, particle in enumerate(self):
+            particle._bind_state(state, trajectory, index)
+        self._state = state
+        self._trajectory = trajectory
+
+    def _outdate_state(self) -> None:
+        """Mark the state as outdated, so it is rebuilt the next time is needed."""
+        self._state = None
+
+    # --- METHODS ---
+    
+    def add_particle(self, particle: Particle) -> None:
+        """Append/add a particle to the space."""
+        self.append(particle)
+
+    # list methods that change the particles of the space (so the state must be rebuilt)
+
+    def append(self, particle: Particle) -> None:
+        super().append(particle)
+        self._outdate_state()
+
+    def extend(self, particles: Any) -> None:
+        super().extend(particles)
+        self._outdate_state()
+
+    def insert(self, index: Any, particle: Particle) -> None:
+        super().insert(index, particle)
+        self._outdate_state()
+
+    def pop(self, index: Any = -1) -> Particle:
+        particle = super().pop(index)
+        self._outdate_state()
+        return particle
+
+    def remove(self, particle: Particle) -> None:
+        super().remove(particle)
+        self._outdate_state()
+
+    def clear(self) -> None:
+        super().clear()
+        self._outdate_state()
+
+    def sort(self, *args, **kwargs) -> None:
+        super().sort(*args, **kwargs)
+        self._outdate_state()
+
+    def reverse(self) -> None:
+        super().reverse()
+        self._outdate_state()
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        super().__setitem__(index, value)
+        self._outdate_state()
+
+    def __delitem__(self, index: Any) -> None:
+        super().__delitem__(index)
+        self._outdate_state()
+
+    def __iadd__(self, particles: Any) -> "ParticleSpace":
+        self.extend(particles)
+        return self
+
+
+    # --- RETURNING METHODS ---
+
+    def __str__(self) -> str:
+        class_name = self.__class__.__name__
+        attributes = '\n'.join(f"  {i}: {value}" for i, value in enumerate(self))
+        return f"<{class_name} object at {hex(id(self))}>\n{attributes}"
+
+    def __repr__(self) -> str:
+        class_name = self.__class__.__name__
+        attributes = ', '.join(repr(p) for p in self)
+        return f"{class_name}([{attributes}])"
+
+    def get_particle_property_array(self, property_name: str) -> tuple[np.ndarray, ...]:
+        """Return a tuple of arrays for the given property of each particle in the space."""
+        return tuple(getattr(particle, property_name) for particle in self)
+    
+    def get_particle_property_list(self, property_name: str) -> list[Any]:
+        """Return a list of arrays for the given property of each particle in the space."""
+        return [getattr(particle, property_name) for particle in self]
+
+    def get_reduced_position_history_array(self, steps_relation: int = 1) -> tuple[np.ndarray, ...]:
+        """Return a tuple of reduced position history (`steps_relation` times smaller) arrays for each particle in the space."""
+        trajectory = self.trajectory
+        return tuple(trajectory.get_history(index, steps_relation) for index in range(len(self)))
+
+    def get_reduced_trajectory_array(self, steps_relation: int = 1) -> np.ndarray:
+        """Return a read-only (T, N, 3) view of the position histories of all the particles (`steps_relation` times smaller)."""
+        return self.trajectory.get_array(steps_relation)
+    
+    def _check_adaptive_ok(self, time_step: float) -> bool:
+        """Return wheter if the given time step is okay (adaptatibely correct) forall the particles in the space.
+        -> Go to AdaptabilityManager.check_adaptive_ok documentation
+
+        Returns:
+        True if the step size is okay, False if it should be shorter
+        """
+        #assert np.linalg.norm(self[0].acceleration) != 0
+        particles = self
+        if self._encounter_pairs is not None: # The regularized particles without other forces have nothing to check
+            encounter_rows = set(self._encounter_pairs.rows.tolist())
+            particles = [particle for index, particle in enumerate(self)
+                         if index not in encounter_rows or particle.adaptability.get_value(1.) != 0]
+        return all(particle.adaptability.check_adaptive_ok(time_step) for particle in particles)
+
+
+
+    # --- OPERATING METHODS ---
+
+    def _advance_particles_time_step(self, time_step: float= 1.) -> None:
+        """Advance all particles in the space by a given time step.
+        Same as `Particle.advance_time_step` for each particle but the cinematic update is vectorized in the space state
+        and done by the `integrator`."""
+        state = self.state
+        adaptability_config = self.run_config.adaptability
+        if adaptability_config.is_adaptive or time_step < adaptability_config.min_time_step:
+            for particle in self:
+                particle._prepare_adaptive_time_step(time_step)
+        self.integrator.advance_time_step(self, time_step)
+        if not self._is_being_adaptive:
+            self.trajectory.store_positions(state.positions)
+        for particle in self:
+            particle._finish_time_step()
+
+    def _apply_single_forces_array(self, targets: np.ndarray | None = None) -> None:
+        """Apply the forces (in self) to each particle in the space individually (or only to the `targets` indices).
+        The forces with a batched form are applied to all the particles at once, the others particle by particle."""
+        batched_forces, scalar_forces = split_batched_forces(self._single_forces_array)
+        if batched_forces:
+            self.state.apply_batched_single_forces(batched_forces, targets)
+        if scalar_forces:
+            particles = self if targets is None else [self[index] for index in targets.tolist()]
+            for particle in particles:
+                for force in scalar_forces:
+                    particle.apply_force(force(particle))
+    
+    def _apply_couple_forces_array(self, targets: np.ndarray | None = None) -> None:
+        """Apply the forces (in self) to each pair of particles in the space (accelerating only the `targets` indices if given).
+        The range limited forces are applied only to the close pairs with the `neighbour_list`, the others with the `couple_forces_engine`."""
+        ranged_forces, forces = split_ranged_forces(self._couple_forces_array)
+        if ranged_forces:
+            self._neighbour_list.apply_couple_forces(self, ranged_forces, self.run_config.force_engine.neighbour_skin, targets)
+        if forces:
+            self.couple_forces_engine.apply_couple_forces(self, forces, targets)
+
+    def _apply_all_forces_array(self, targets: np.ndarray | None = None) -> None:
+        """Group the application of all the forces (without the mutual ones of the regularized pairs)"""
+        self._apply_single_forces_array(targets)
+        self._apply_couple_forces_array(targets)
+        if self._encounter_pairs is not None:
+            self._encounter_pairs.remove_accelerations(self.state, targets)
+
+    def _start_encounters(self, time_step: float) -> None:
+        """Find the close pairs to regularize in this step and advance their relative motion half step.
+        -> Go to `regularization` module documentation
+
+        Uses from ConfigSimulation:
+        regularization.is_enabled: [bool] if the close pairs are regularized
+        regularization.encounter_distance: [m] the pairs closer than it are regularized
+        regularization.substeps_per_orbit: the substeps of the relative motion of a pair in each orbit
+        """
+        regularization_config = self.run_config.regularization
+        if not regularization_config.is_enabled:
+            return
+        state = self.state
+        laws, _ = split_inverse_square_forces(self._couple_forces_array)
+        self._encounter_pairs = find_encounter_pairs(state.positions, state.masses, laws, regularization_config.encounter_distance)
+        if self._encounter_pairs is not None:
+            self._encounter_pairs.advance(state, time_step / 2, regularization_config.substeps_per_orbit)
+            self._encounter_pairs.hold_relative_motion(state)
+
+    def _finish_encounters(self, time_step: float) -> None:
+        """Advance the relative motion of the regularized pairs the second half step (and its stored positions)."""
+        encounter_pairs = self._encounter_pairs
+        if encounter_pairs is None:
+            return
+        self._encounter_pairs = None
+        state = self.state
+        encounter_pairs.release_relative_motion(state)
+        encounter_pairs.advance(state, time_step / 2, self.run_config.regularization.substeps_per_orbit)
+        rows = encounter_pairs.rows
+        self.trajectory.replace_last_positions(rows, state.positions[rows])
+
+    def _apply_start_forces_array(self) -> None:
+        """Apply all the forces at the start of a step, unless the integrator has kept them from the end of the last one."""
+        if not self.integrator.restore_accelerations(self.state):
+            self._apply_all_forces_array()
+
+    def _adapatative_recursive_iteration(self, time_step: float) -> None:
+        """Check if the time step is okay. Advance step if okay, or recursevilly reduce the time step if not.
+        """
+        # I cannot use `self.apply_all_forces_array` here because if it recursevilly rerun, it would apply it twice before advancing step
+        
+        # assert np.linalg.norm(self[0].acceleration) != 0   # If not applied acceleration before
+        if self._check_adaptive_ok(time_step):
+            self._advance_particles_time_step(time_step)
+        else:
+            self.is_being_adaptive = True
+            time_steps_division:int = self.recommended_division_for_steps
+            lower_time_step = time_step/time_steps_division
+            assert not time_steps_division ==1 # Because if not, it could cause a loop (recursion error)
+            self._adapatative_recursive_iteration(lower_time_step)
+            for _ in range(time_steps_division-1):
+                self._apply_start_forces_array()
+                self._adapatative_recursive_iteration(lower_time_step)
+
+    def iterate_adapatative_time_step(self, time_step: float) -> None:
+        """Advance all particles in the space applying the forces adapting the given step into an scale that fulfil the "adaptability check".
+        """
+        with self._running_config():
+            self._iterate_adapatative_time_step(time_step)
+
+    def _iterate_adapatative_time_step(self, time_step: float) -> None:
+        self._start_encounters(time_step)
+        self._apply_start_forces_array()
+        self._adapatative_recursive_iteration(time_step)
+        self._life_time += time_step
+        self.is_being_adaptive = False
+        self._finish_encounters(time_step)
+
+    def iterate_block_time_step(self, time_step: float) -> int:
+        """Advance all particles in the space by the given step, each one with its own power-of-two fraction of it
+        (block time steps): only the particles that need small steps take them. -> Go to `block_time_steps` module documentation
+
+        Returns:
+        How many particle steps have been done (the work, compared to `len(self)` for a not adaptive step)
+        """
+        with self._running_config():
+            return self._iterate_block_time_step(time_step)
+
+    def _iterate_block_time_step(self, time_step: float) -> int:
+        self._start_encounters(time_step)
+        number_of_particle_steps = advance_block_time_step(self, time_step)
+        self.trajectory.store_positions(self.state.positions)
+        self._life_time += time_step
+        self._finish_encounters(time_step)
+        return number_of_particle_steps
+
+    def iterate_time_step(self, time_step: float = 1.) -> None:
+        """Advance all particles in the space applying the forces for the given step. No adaptability.
+        """
+        with self._running_config():
+            self._iterate_time_step(time_step)
+
+    def _iterate_time_step(self, time_step: float = 1.) -> None:
+        self._start_encounters(time_step)
+        self._apply_start_forces_array()
+        self._advance_particles_time_step(time_step)
+        self._life_time += time_step
+        self._finish_encounters(time_step)
+
+    @print_run_time
+    def run_simulation(self, start_step: int = 0) -> None:
+        """Iterates all particles in the space for the given steps applying them the given function/operations.
+        
+        Possitional-Keyword arguments:
+        start_step: time steps already done (e.g. the step of a loaded checkpoint), so only the remaining ones are done
+
+        Uses from ConfigSimulation:
+        numer_of_time_steps: [s] the number of time steps to advance each particle.
+        time_step: [s] the time step to advance each particle.
+        adaptability.is_adaptive: [bool] if I want to run an adaptative simulation
+        adaptability.block_time_steps: [bool] if the adaptative simulation uses individual (block) time steps
+        checkpoint: where and how often the space is saved while running (see `checkpoint` module)
+        recording: which steps are stored in the trajectory (see `recording_policy` module)
+        The config is compiled once into a frozen snapshot (`run_config`): changing it while running has no effect
+        """
+        if self._config.could_crass:    
+            raise Exception("Too many time steps could crash")
+        
+        recording_policy = self._get_recording_policy(self._config.number_of_time_steps, start_step)
+        checkpointer = Checkpointer.from_config(self._config.checkpoint)
+        with self._running_config() as run_config:
+            trajectory = self.trajectory
+            for step in range(start_step + 1, run_config.number_of_time_steps + 1):
+                with recording_policy.recording_step(trajectory, step):
+                    self._iterate_configured_time_step(run_config.time_step)
+                if checkpointer is not None:
+                    checkpointer.update(self, step)
+
+    @contextmanager
+    def _running_config(self) -> Iterator[FrozenConfigSimulation]:
+        """Context of a run: the config is compiled into a frozen snapshot (`run_config`) that the steps and the
+        adaptability managers of the particles read instead of it. An inner run keeps the snapshot of the outer one.
+        If the config has been changed while running a warning is printed (the change only applies to the next run)."""
+        if self._run_config is not None:
+            yield self._run_config
+            return
+        run_config = self._get_frozen_config()
+        self.couple_forces_engine, self.integrator # (Re)built from the config before the run, they are kept while running
+        self._run_config = run_config
+        for particle in self:
+            particle.adaptability.config = run_config.adaptability
+        try:
+            yield run_config
+        finally:
+            self._run_config = None
+            for particle in self:
+                particle.adaptability.config = self._config.adaptability
+        if self._get_frozen_config() != run_config:
+            print("WARNING: The simulation config was changed while running. The run used the config it had when it started")
+
+    def _get_recording_policy(self, number_of_time_steps: int, start_step: int = 0) -> RecordingPolicy:
+        """Return the recording policy of a run from the config. If the run is continued (`start_step` > 0) it keeps the
+        sampling of the last one (it may have been coarsened)."""
+        steps_relation = self._recording_policy.steps_relation if start_step > 0 and self._recording_policy is not None else None
+        self._recording_policy = RecordingPolicy(self._config.recording, number_of_time_steps, self._config.time_step, steps_relation)
+        return self._recording_policy
+
+    def _iterate_configured_time_step(self, time_step: float) -> None:
+        """Advance all particles in the space by the given step, in the way selected by the `adaptability` config
+        (of the snapshot of the running config)."""
+        adaptability_config = self._run_config.adaptability # type: ignore
+        if not adaptability_config.is_adaptive:
+            self._iterate_time_step(time_step)
+        elif adaptability_config.block_time_steps:
+            self._iterate_block_time_step(time_step)
+        else:
+            self._iterate_adapatative_time_step(time_step)
+
+    def get_frame(self, step: int = 0, include_velocities: bool = False) -> SimulationFrame:
+        """Return a snapshot of the space now (read-only views of its state) -> Go to `SimulationFrame` documentation"""
+        state = self.state
+        velocities = _read_only(state.velocities) if include_velocities else None
+        return SimulationFrame(step, self._life_time, _read_only(state.positions), velocities)
+
+    def iter_simulation(self, number_of_time_steps: int | None = None, output_interval: int = 1,
+                        include_velocities: bool = False, is_recording: bool = False,
+                        start_step: int = 0) -> Iterator[SimulationFrame]:
+        """Generator that advances the space step by step (as `run_simulation`) and yields a frame (see `SimulationFrame`)
+        of the initial state and then one each `output_interval` steps (and of the last step).
+        The frames are views of the state: a consumer that keeps them must copy them.
+
+        Possitional-Keyword arguments:
+        - number_of_time_steps: steps to advance (by default the ones of the config)
+        - output_interval: steps between two yielded frames
+        - include_velocities: whether the frames have the velocities
+        - is_recording: whether the positions are also stored in the trajectory (if False the memory doesn't grow with
+          the steps, so the run can be as long as wanted)
+        - start_step: time steps already done (as in `run_simulation`). The first frame is the one of this step
+
+        Uses from ConfigSimulation:
+        time_step: [s] the time step to advance each particle.
+        adaptability: how the steps are done (as in `run_simulation`)
+        checkpoint: where and how often the space is saved while running (as in `run_simulation`)
+        recording: which steps are stored in the trajectory if `is_recording` (as in `run_simulation`)
+        The config is compiled once into a frozen snapshot (as in `run_simulation`)
+        """
+        number_of_time_steps = number_of_time_steps if number_of_time_steps is not None else self._config.number_of_time_steps
+        output_interval = max(int(output_interval), 1)
+        if is_recording and self._config.could_crass:
+            raise Exception("Too many time steps could crash")
+
+        recording_policy = self._get_recording_policy(number_of_time_steps, start_step)
+        checkpointer = Checkpointer.from_config(self._config.checkpoint)
+        trajectory = self.trajectory
+        was_recording = trajectory.is_recording
+        trajectory.is_recording = is_recording
+        try:
+            with self._running_config() as run_config:
+                yield self.get_frame(start_step, include_velocities)
+                for step in range(start_step + 1, number_of_time_steps + 1):
+                    with recording_policy.recording_step(trajectory, step):
+                        self._iterate_configured_time_step(run_config.time_step)
+                    if checkpointer is not None:
+                        checkpointer.update(self, step)
+                    if step % output_interval == 0 or step == number_of_time_steps:
+                        yield self.get_frame(step, include_velocities)
+        finally:
+            trajectory.is_recording = was_recording
+
+    # --- CHECKPOINT METHODS ---
+
+    def save_checkpoint(self, path: str, step: int = 0) -> None:
+        """Save the space in the checkpoint file `path` (see `checkpoint` module), between two steps.
+        It can be restarted with `load_checkpoint` and `run_simulation(start_step=step)`, as if it had never stopped.
+
+        Possitional-Keyword arguments:
+        - path: file of the checkpoint (`.npz`), overwritten if it exists
+        - step: time steps done in the run
+        """
+        state, trajectory = self.state, self.trajectory
+        arrays = {f"state.{name}": getattr(state, name) for name in ParticleState.ROW_ARRAYS_NAMES}
+        arrays["trajectory.positions"] = trajectory.positions[:len(trajectory)]
+        arrays["trajectory.lengths"] = trajectory.lengths
+        built_positions = self._neighbour_list.get_built_positions()
+        if built_positions is not None:
+            arrays["neighbour_list.pairs_1"] = self._neighbour_list.pairs_1
+            arrays["neighbour_list.pairs_2"] = self._neighbour_list.pairs_2
+            arrays["neighbour_list.built_positions"] = built_positions
+        kept_accelerations = self._integrator.get_kept_accelerations(state) if self._integrator is not None else None
+        if kept_accelerations is not None:
+            arrays["integrator.kept_accelerations"] = kept_accelerations
+        manifest = {
+            "step": step,
+            "life_time": self._life_time,
+            "config": self._config.as_dictionary,
+            "single_forces": [get_force_identifier(force) for force in self._single_forces_array],
+            "couple_forces": [get_force_identifier(force) for force in self._couple_forces_array],
+            "adaptability": [particle.adaptability.checkpoint_state for particle in self],
+            "integrator": self.integrator.checkpoint_state,
+            "trajectory_is_recording": trajectory.is_recording,
+            "recording_steps_relation": self._recording_policy.steps_relation if self._recording_policy is not None else None,
+            "neighbour_list": {"cutoff": self._neighbour_list.cutoff, "skin": self._neighbour_list.skin},
+        }
+        write_checkpoint(path, arrays, manifest)
+
+    @classmethod
+    def load_checkpoint(cls, path: str, 
+                        simulation_config: ConfigSimulation = CONFIGURATION.simulation,
+                        single_forces_array: tuple[Callable[[Particle], np.ndarray], ...] | None = None,
+                        couple_forces_array: tuple[Callable[[Particle, Particle], np.ndarray], ...] | None = None,
+                        ) -> tuple["ParticleSpace", int]:
+        """Return the space saved with `save_checkpoint` and the step of the run it was saved at.
+        The `simulation_config` is updated with the saved one (the space uses it).
+
+        Possitional-Keyword arguments:
+        - path: file of the checkpoint
+        - simulation_config: config updated with the saved one and used by the space
+        - single_forces_array, couple_forces_array: forces of the space instead of the saved ones (needed if they can't
+          be imported by their name, see `checkpoint.get_force_identifier`)
+        """
+        arrays, manifest = read_checkpoint(path)
+        simulation_config.update(manifest["config"])
+        if single_forces_array is None:
+            single_forces_array = tuple(resolve_force(identifier) for identifier in manifest["single_forces"])
+        if couple_forces_array is None:
+            couple_forces_array = tuple(resolve_force(identifier) for identifier in manifest["couple_forces"])
+
+        masses = arrays["state.masses"]
+        space = cls(*(Particle(float(mass)) for mass in masses), single_forces_array=single_forces_array,
+                    simulation_config=simulation_config, couple_forces_array=couple_forces_array)
+        state = ParticleState(len(masses))
+        for name in ParticleState.ROW_ARRAYS_NAMES:
+            np.copyto(getattr(state, name), arrays[f"state.{name}"])
+        trajectory = TrajectoryBuffer.from_arrays(arrays["trajectory.positions"], arrays["trajectory.lengths"])
+        trajectory.is_recording = bool(manifest["trajectory_is_recording"])
+        for index, (particle, adaptability_state) in enumerate(zip(space, manifest["adaptability"])):
+            particle._bind_state(state, trajectory, index)
+            particle.adaptability.restore_checkpoint_state(adaptability_state)
+        space._state, space._trajectory = state, trajectory
+        space._life_time = float(manifest["life_time"])
+        if manifest["recording_steps_relation"] is not None:
+            space._recording_policy = RecordingPolicy(simulation_config.recording, simulation_config.number_of_time_steps,
+                                                      simulation_config.time_step, manifest["recording_steps_relation"])
+
+        if "neighbour_list.built_positions" in arrays:
+            space._neighbour_list.restore(arrays["neighbour_list.pairs_1"], arrays["neighbour_list.pairs_2"],
+                                          manifest["neighbour_list"]["cutoff"], manifest["neighbour_list"]["skin"],
+                                          arrays["neighbour_list.built_positions"])
+        if "integrator.kept_accelerations" in arrays:
+            space.integrator._keep_accelerations(state, arrays["integrator.kept_accelerations"])
+        space.integrator.restore_checkpoint_state(manifest["integrator"])
+        return space, int(manifest["step"])
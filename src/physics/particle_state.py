@@ -0,0 +1,152 @@
+"""`particle_state` module include the `ParticleState` class"""
+
+import numpy as np
+from collections.abc import Callable
+from typing import Any
+
+# My modules
+from physics.pair_geometry import PairGeometry
+
+
+class ParticleState:
+    """
+    Structure-of-arrays storage of the cinematic state of a group of particles.
+
+    Each particle owns a row `i` of every array, so a `Particle` bound to a state is just a view of its row
+    and a whole `ParticleSpace` can be advanced with a few vectorized operations.
+
+    Arrays:
+        - masses: [kg] (N,)
+        - positions, velocities, accelerations, acceleration_fields: (N, 3)
+        - last_velocities, last_accelerations: (N, 3) values of the previous step
+        - life_times: [s] (N,)
+    """
+    # Name of the arrays that define a row (particle) of the state
+    ROW_ARRAYS_NAMES: tuple[str, ...] = ("masses", "positions", "velocities", "accelerations", "acceleration_fields",
+                                         "last_velocities", "last_accelerations", "life_times")
+
+    def __init__(self, number_of_particles: int = 0) -> None:
+        """Init a 'ParticleState' object with all its values set to zero
+
+        Possitional-Keyword arguments:
+        number_of_particles: how many rows (particles) the state has
+        """
+        self.masses: np.ndarray = np.zeros(number_of_particles)
+        self.positions: np.ndarray = np.zeros((number_of_particles, 3))
+        self.velocities: np.ndarray = np.zeros((number_of_particles, 3))
+        self.accelerations: np.ndarray = np.zeros((number_of_particles, 3))
+        self.acceleration_fields: np.ndarray = np.zeros((number_of_particles, 3))
+        self.last_velocities: np.ndarray = np.zeros((number_of_particles, 3))
+        self.last_accelerations: np.ndarray = np.zeros((number_of_particles, 3))
+        self.life_times: np.ndarray = np.zeros(number_of_particles)
+
+        self._buffer: np.ndarray = np.zeros((number_of_particles, 3)) # Scratch array for not allocating in each step
+        self._geometry: PairGeometry | None = None # Built when needed (only for the Python loop over the pairs)
+
+    # --- INITIALASING METHODS ---
+
+    @classmethod
+    def from_particles(cls, particles: Any) -> "ParticleState":
+        """Return a new state with a row copied from each of the given particles (in order)."""
+        particles = list(particles)
+        state = cls(len(particles))
+        for index, particle in enumerate(particles):
+            state.copy_row_from(index, particle._state, particle._index)
+        return state
+
+    # --- PROPERTIES ---
+
+    @property
+    def geometry(self) -> PairGeometry:
+        """The cache of the geometry of all the pairs of rows (see `pair_geometry`). Built the first time it is used."""
+        if self._geometry is None:
+            self._geometry = PairGeometry(self)
+        return self._geometry
+
+    # --- RETURNING METHODS ---
+
+    def __len__(self) -> int:
+        return len(self.masses)
+
+    def __repr__(self) -> str:
+        class_name = self.__class__.__name__
+        return f"{class_name}(number_of_particles = {len(self)})"
+
+    def get_row(self, index: int) -> dict[str, Any]:
+        """Return a dictionary with the values (views) of every array for the given row."""
+        return {name: getattr(self, name)[index] for name in self.ROW_ARRAYS_NAMES}
+
+    # --- OPERATING METHODS ---
+
+    def copy_row_from(self, index: int, other_state: "ParticleState", other_index: int) -> None:
+        """Copy the row `other_index` of `other_state` into the row `index` of this state."""
+        for name in self.ROW_ARRAYS_NAMES:
+            getattr(self, name)[index] = getattr(other_state, name)[other_index]
+
+    def reset_accelerations(self) -> None:
+        """Reset the accelerations, making them equal to the acceleration fields."""
+        np.copyto(self.accelerations, self.acceleration_fields)
+
+    def shift_cinematic_properties(self) -> None:
+        """Shift velocities, accelerations to `last` ones and reset accelerations. Without allocating new arrays."""
+        np.copyto(self.last_velocities, self.velocities)
+        # velocities are preserved (conservation of momentum)
+        np.copyto(self.last_accelerations, self.accelerations)
+        self.reset_accelerations()
+
+    def apply_batched_single_forces(self, batched_forces: list[Callable[..., np.ndarray]], rows: np.ndarray | slice | None = None) -> None:
+        """Add the acceleration of the batched single forces `(positions, velocities, masses) -> forces` (see `batched_forms`)
+        to the given rows (all of them if None), with one call of each force for all the rows."""
+        rows = slice(None) if rows is None else rows
+        positions, velocities, masses = self.positions[rows], self.velocities[rows], self.masses[rows]
+        accelerations = self.accelerations[rows]
+        for batched_force in batched_forces:
+            accelerations += batched_force(positions, velocities, masses) / masses[:, np.newaxis]
+        self.accelerations[rows] = accelerations
+
+    def advance_time_step(self, time_step: float = 1.0) -> None:
+        """Advance all the rows by one time step: accelerate, translate (with the averaged velocity) and shift properties.
+        It is the vectorized version of `Particle.advance_time_step` cinematic part and it doesn't allocate new arrays.
+
+        Keyword arguments:
+        time_step: [s] for how much time do the acceleration occurs.
+        """
+        buffer = self._buffer
+        # accelerate
+        np.multiply(self.accelerations, time_step, out=buffer)
+        self.velocities += buffer
+        # translate with the velocity to apply: (velocity + last_velocity) / 2
+        np.add(self.velocities, self.last_velocities, out=buffer)
+        buffer *= time_step / 2
+        self.positions += buffer
+
+        self.shift_cinematic_properties()
+        self.life_times += time_step
+
+    def advance_rows_time_steps(self, rows: np.ndarray, time_steps: np.ndarray) -> None:
+        """Advance only the given rows, each one by its own time step (same operations as `advance_time_step`).
+        Used by the block time steps.
+
+        Arguments:
+        rows: indices of the rows to advance
+        time_steps: [s] (len(rows),) time step of each row
+        """
+        row_time_steps = time_steps[:, np.newaxis]
+        accelerations = self.accelerations[rows]
+        # accelerate
+        velocities = self.velocities[rows] + accelerations * row_time_steps
+        # translate with the velocity to apply: (velocity + last_velocity) / 2
+        self.positions[rows] += (velocities + self.last_velocities[rows]) * (row_time_steps / 2)
+        self.velocities[rows] = velocities
+        # shift
+        self.last_velocities[rows] = velocities
+        self.last_accelerations[rows] = accelerations
+        self.accelerations[rows] = self.acceleration_fields[rows]
+        self.life_times[rows] += time_steps
+
+    def predict_rows_positions(self, rows: np.ndarray, elapsed_times: np.ndarray, start_positions: np.ndarray) -> None:
+        """Set the positions of the given rows to where they are after `elapsed_times` of their current step
+        (from `start_positions`, with the velocity and acceleration of the step). Used by the block time steps."""
+        row_elapsed_times = elapsed_times[:, np.newaxis]
+        velocities = self.velocities[rows] + self.accelerations[rows] * row_elapsed_times
+        self.positions[rows] = start_positions + (velocities + self.last_velocities[rows]) * (row_elapsed_times / 2)
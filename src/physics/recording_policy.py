@@ -0,0 +1,84 @@
+"""`recording_policy` module include the `RecordingPolicy` class: which steps of a run are stored in the trajectory
+
+Storing the positions of every step makes the memory grow with the length of the run, so long runs were refused
+(`ConfigSimulation.could_crass`). The recording policy of the config (`ConfigSimulation.recording`) stores only one
+step of each `steps_relation`: the steps in between are advanced with the trajectory not recording.
+- "every_step", "steps_interval", "time_interval" and "number_of_frames" have a fixed `steps_relation`
+- "memory_budget" starts storing every step and, each time the trajectory fills the budget, drops one of each two
+  stored steps (`TrajectoryBuffer.decimate`) and doubles `steps_relation`, so the memory is bounded for any run length
+
+The stored steps are the multiples of `steps_relation` (counting the steps of the run from 1), so the sampling is the
+same as decimating afterwards a run that stored every step (as the plotting does with `plotting_relative_time_step`).
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+# Relative imports
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from settings.config_subclasses import ConfigRecording
+
+
+class RecordingPolicy:
+    """
+    Decides which steps of a run are stored in the trajectory (see module documentation).
+
+    Class workings:
+        - Each step of the run is advanced inside `recording_step(trajectory, step)`, that makes the trajectory record
+          only in the stored steps (and never if it wasn't recording already)
+        - With "memory_budget" the trajectory capacity is bounded to the budget inside the steps of the run (its
+          `max_capacity` is restored after each one) and its sampling coarsened after a stored step fills it
+    """
+    def __init__(self, config: ConfigRecording, number_of_time_steps: int, time_step: float,
+                 steps_relation: int | None = None) -> None:
+        """Init a 'RecordingPolicy' object for a run
+
+        Possitional-Keyword arguments:
+        - config: the recording config (`ConfigSimulation.recording`)
+        - number_of_time_steps: steps of the run
+        - time_step: [s] the time step of the run
+        - steps_relation: steps between two stored ones instead of the one of the config (e.g. of a continued run)
+        """
+        self.config: ConfigRecording = config
+        self.steps_relation: int = steps_relation if steps_relation is not None \
+            else config.get_steps_relation(number_of_time_steps, time_step)
+        self.is_budgeted: bool = config.policy == "memory_budget"
+        if self.is_budgeted and config.memory_budget <= 0:
+            raise ValueError(f"Invalid memory budget: {config.memory_budget} MB must be positive")
+
+    def __repr__(self) -> str:
+        class_name = self.__class__.__name__
+        return f"{class_name}(policy = {self.config.policy!r}, steps_relation = {self.steps_relation})"
+
+    def is_stored(self, step: int) -> bool:
+        """Return whether the step `step` of the run (counting from 1) is stored."""
+        return step % self.steps_relation == 0
+
+    def get_max_frames(self, trajectory: Any) -> int:
+        """Return how many stored steps of the trajectory fit in the memory budget (at least 2)."""
+        frame_size = trajectory.positions[0].nbytes
+        return max(int(self.config.memory_budget * 1e6 // frame_size), 2) if frame_size > 0 else 2
+
+    @contextmanager
+    def recording_step(self, trajectory: Any, step: int) -> Iterator[None]:
+        """Context of the step `step` of the run: the trajectory only records if the step is stored (and its capacity
+        doesn't grow over the budget)."""
+        was_recording, max_capacity = trajectory.is_recording, trajectory.max_capacity
+        is_stored = was_recording and self.is_stored(step)
+        trajectory.is_recording = is_stored
+        if self.is_budgeted: # Room for this step if a longer trajectory is continued (it is decimated after it)
+            trajectory.max_capacity = max(self.get_max_frames(trajectory), len(trajectory) + 1)
+        try:
+            yield
+        finally:
+            trajectory.is_recording, trajectory.max_capacity = was_recording, max_capacity
+        if is_stored and self.is_budgeted:
+            self._keep_budget(trajectory)
+
+    def _keep_budget(self, trajectory: Any) -> None:
+        """Coarsen the sampling if the trajectory has filled the budget."""
+        if len(trajectory) >= self.get_max_frames(trajectory):
+            trajectory.decimate()
+            self.steps_relation *= 2
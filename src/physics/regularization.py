@@ -0,0 +1,190 @@
+"""`regularization` module include the two-body regularization of the close encounters of a space
+
+In a close pass of two particles their mutual force is huge and changes very fast, so the adaptability divides the step
+of the whole space (down to `min_time_step`, where the acceleration is clipped). With the regularization, the isolated
+pairs closer than `regularization.encounter_distance` are detected at the start of each step and:
+- Their mutual inverse-square forces are removed from the forces of the space, so the space (and its adaptability) only
+  sees the forces of the other particles on them (the perturbation). The step of the space only moves the center of
+  mass of each pair and kicks its relative velocity (the relative position and velocity are held apart meanwhile)
+- Their relative motion under the mutual forces (a Kepler problem) is advanced in two half steps, before and after the
+  step of the space (Strang splitting), with a time-transformed leapfrog: the logarithmic Hamiltonian leapfrog
+  (Mikkola & Tanikawa 1999, Preto & Tremaine 1999). Its substeps are short in time close to the pericenter and long far
+  from it, and it follows the exact Kepler orbit (only its phase has error), so a close pass takes a few substeps
+
+Only the couple forces with an attractive inverse-square law (see `dynamics.force_laws`) are regularized. The others
+(softened, range limited...) are still applied between the particles of the pair as forces of the space.
+
+Classes:
+- EncounterPairs: the pairs regularized in a step
+
+Functions:
+- find_encounter_pairs: return the isolated close pairs of particles to regularize
+- advance_kepler_pair: advance the relative motion of a pair with the logarithmic Hamiltonian leapfrog
+"""
+
+import numpy as np
+import math
+from dataclasses import dataclass
+
+# My modules
+from physics.dynamics.force_laws import InverseSquareLaw
+from physics.engines.cell_list import find_pairs_within
+
+
+MAX_ALL_PAIRS_PARTICLES = 256 # Up to this number of particles the close pairs are found checking all the pairs (faster than the cell list)
+
+@dataclass
+class EncounterPairs:
+    """The pairs of particles (rows `pairs_1[k]`, `pairs_2[k]`) regularized in a step, with the gravitational parameters
+    `μ` of their relative motion under the `laws`: `relative acceleration = -μ * distance_vector / distance**3`"""
+    pairs_1: np.ndarray
+    pairs_2: np.ndarray
+    parameters: np.ndarray
+    laws: list[InverseSquareLaw]
+    relative_positions: np.ndarray | None = None # Held during the step of the space
+    relative_velocities: np.ndarray | None = None # Held apart during the step of the space (rows order)
+
+    def __len__(self) -> int:
+        return len(self.pairs_1)
+
+    @property
+    def rows(self) -> np.ndarray:
+        """Rows of all the particles of the pairs"""
+        return np.concatenate((self.pairs_1, self.pairs_2))
+
+    def remove_accelerations(self, state, targets: np.ndarray | None = None) -> None:
+        """Subtract from the accelerations of the state the ones of the laws between the particles of each pair
+        (only from the `targets` rows if given)."""
+        pairs_1, pairs_2 = self.pairs_1, self.pairs_2
+        masses_1, masses_2 = state.masses[pairs_1], state.masses[pairs_2]
+        distance_vectors = state.positions[pairs_2] - state.positions[pairs_1]
+        distances = np.linalg.norm(distance_vectors, axis=-1)
+        forces = np.zeros_like(distance_vectors)
+        for law in self.laws:
+            forces += law.get_forces(distance_vectors, distances, masses_1, masses_2)
+        is_target_1 = np.ones(len(self), bool) if targets is None else np.isin(pairs_1, targets)
+        is_target_2 = np.ones(len(self), bool) if targets is None else np.isin(pairs_2, targets)
+        state.accelerations[pairs_1[is_target_1]] -= forces[is_target_1] / masses_1[is_target_1, np.newaxis]
+        state.accelerations[pairs_2[is_target_2]] += forces[is_target_2] / masses_2[is_target_2, np.newaxis]
+
+    def hold_relative_motion(self, state) -> None:
+        """Hold the relative position of each pair and make both particles move with the velocity of its center of mass,
+        holding their relative velocities. The velocities of the previous step are moved the same (they are the start ones)."""
+        rows = self.rows
+        self.relative_positions = state.positions[self.pairs_2] - state.positions[self.pairs_1]
+        masses_1, masses_2 = state.masses[self.pairs_1, np.newaxis], state.masses[self.pairs_2, np.newaxis]
+        center_velocities = (masses_1 * state.velocities[self.pairs_1] + masses_2 * state.velocities[self.pairs_2]) \
+            / (masses_1 + masses_2)
+        self.relative_velocities = state.velocities[rows] - np.concatenate((center_velocities, center_velocities))
+        state.velocities[rows] -= self.relative_velocities
+        state.last_velocities[rows] -= self.relative_velocities
+
+    def release_relative_motion(self, state) -> None:
+        """Set back the relative positions held by `hold_relative_motion` (keeping the displacement of the centers of mass)
+        and add back the relative velocities (kicked by the forces of the other particles meanwhile)."""
+        if self.relative_velocities is None or self.relative_positions is None:
+            return
+        masses_1, masses_2 = state.masses[self.pairs_1, np.newaxis], state.masses[self.pairs_2, np.newaxis]
+        position_changes = self.relative_positions - (state.positions[self.pairs_2] - state.positions[self.pairs_1])
+        state.positions[self.pairs_1] -= masses_2 / (masses_1 + masses_2) * position_changes
+        state.positions[self.pairs_2] += masses_1 / (masses_1 + masses_2) * position_changes
+        rows = self.rows
+        state.velocities[rows] += self.relative_velocities
+        state.last_velocities[rows] += self.relative_velocities
+        self.relative_positions, self.relative_velocities = None, None
+
+    def advance(self, state, time_step: float, substeps_per_orbit: int = 64) -> None:
+        """Advance the relative motion of each pair by `time_step` under the laws (see `advance_kepler_pair`),
+        keeping its center of mass. The velocities of the previous step are moved the same (they are the start ones)."""
+        for index1, index2, parameter in zip(self.pairs_1.tolist(), self.pairs_2.tolist(), self.parameters.tolist()):
+            mass1, mass2 = state.masses[index1], state.masses[index2]
+            relative_position = state.positions[index2] - state.positions[index1]
+            relative_velocity = state.velocities[index2] - state.velocities[index1]
+            new_position, new_velocity = advance_kepler_pair(relative_position, relative_velocity, parameter,
+                                                             time_step, substeps_per_orbit)
+            position_change, velocity_change = new_position - relative_position, new_velocity - relative_velocity
+            total_mass = mass1 + mass2
+            state.positions[index1] -= mass2 / total_mass * position_change
+            state.positions[index2] += mass1 / total_mass * position_change
+            for velocities in (state.velocities, state.last_velocities):
+                velocities[index1] -= mass2 / total_mass * velocity_change
+                velocities[index2] += mass1 / total_mass * velocity_change
+
+
+def get_pairs_parameters(masses: np.ndarray, pairs_1: np.ndarray, pairs_2: np.ndarray,
+                         laws: list[InverseSquareLaw]) -> np.ndarray:
+    """Return the gravitational parameter `μ` of the relative motion of each pair under the laws (positive if attractive)."""
+    parameters = np.zeros(len(pairs_1))
+    for law in laws:
+        charges = law.get_charges(masses)
+        parameters += law.constant * charges[pairs_1] * charges[pairs_2] * (1 / masses[pairs_1] + 1 / masses[pairs_2])
+    return parameters
+
+def find_encounter_pairs(positions: np.ndarray, masses: np.ndarray, laws: list[InverseSquareLaw],
+                         encounter_distance: float) -> EncounterPairs | None:
+    """Return the pairs of particles closer than `encounter_distance` that are isolated (none of them is that close to
+    any other particle) and attract each other with the laws. None if there is none.
+
+    Arguments:
+    positions: [m] (N, 3) array of the positions of the particles
+    masses: [kg] (N,) array of the masses of the particles
+    laws: the inverse-square laws of the couple forces of the space
+    encounter_distance: [m] max distance of the pairs
+    """
+    if not laws:
+        return None
+    if len(positions) <= MAX_ALL_PAIRS_PARTICLES:
+        pairs_1, pairs_2 = np.triu_indices(len(positions), k=1)
+        is_close = np.linalg.norm(positions[pairs_2] - positions[pairs_1], axis=-1) < encounter_distance
+        pairs_1, pairs_2 = pairs_1[is_close], pairs_2[is_close]
+    else:
+        pairs_1, pairs_2 = find_pairs_within(positions, encounter_distance)
+    if len(pairs_1) == 0:
+        return None
+    pairs_per_particle = np.bincount(np.concatenate((pairs_1, pairs_2)), minlength=len(positions))
+    is_isolated = (pairs_per_particle[pairs_1] == 1) & (pairs_per_particle[pairs_2] == 1)
+    pairs_1, pairs_2 = pairs_1[is_isolated], pairs_2[is_isolated]
+    parameters = get_pairs_parameters(masses, pairs_1, pairs_2, laws)
+    is_attractive = parameters > 0
+    if not np.any(is_attractive):
+        return None
+    return EncounterPairs(pairs_1[is_attractive], pairs_2[is_attractive], parameters[is_attractive], list(laws))
+
+
+def advance_kepler_pair(relative_position: np.ndarray, relative_velocity: np.ndarray, parameter: float,
+                        time_step: float, substeps_per_orbit: int = 64) -> tuple[np.ndarray, np.ndarray]:
+    """Return the relative position and velocity of a pair advanced by `time_step` under the relative acceleration
+    `-parameter * position / |position|**3`, with the logarithmic Hamiltonian leapfrog.
+
+    Each substep is a drift-kick-drift in a fictitious time `s` (`dt = ds / (T + B)` for the drifts and `dt = ds r / μ`
+    for the kick, being T the kinetic energy and B the binding energy). The fictitious step is the one of
+    `substeps_per_orbit` substeps per orbit (per the time to cover the distance if it isn't bound), and the last
+    substeps are shortened to end just in `time_step`.
+
+    Possitional-Keyword arguments:
+    - relative_position: [m] (3,) position of the second particle from the first one
+    - relative_velocity: [m/s] (3,) velocity of the second particle from the first one
+    - parameter: [m3/s2] μ, positive
+    - time_step: [s] time to advance
+    - substeps_per_orbit: number of substeps of a whole orbit
+    """
+    position = np.array(relative_position, dtype=float)
+    velocity = np.array(relative_velocity, dtype=float)
+    binding_energy = parameter / float(np.linalg.norm(position)) - 0.5 * float(velocity @ velocity)
+    length_scale = parameter / (2 * binding_energy) if binding_energy > 0 else float(np.linalg.norm(position)) # Semi-major axis if bound
+    fictitious_step = 2 * math.pi * math.sqrt(parameter * length_scale) / max(int(substeps_per_orbit), 1)
+
+    elapsed_time = 0.
+    tolerance = 1e-13 * abs(time_step)
+    while abs(time_step - elapsed_time) > tolerance:
+        remaining_time = time_step - elapsed_time
+        step = math.copysign(min(fictitious_step, abs(remaining_time) * parameter / float(np.linalg.norm(position))),
+                             remaining_time)
+        first_drift_time = 0.5 * step / (0.5 * float(velocity @ velocity) + binding_energy)
+        position += velocity * first_drift_time
+        velocity -= step * position / float(position @ position) # Kick of `ds r / μ` with the acceleration `-μ r / r³`
+        second_drift_time = 0.5 * step / (0.5 * float(velocity @ velocity) + binding_energy)
+        position += velocity * second_drift_time
+        elapsed_time += first_drift_time + second_drift_time
+    position += velocity * (time_step - elapsed_time) # Round-off of the time
+    return position, velocity
@@ -0,0 +1,24 @@
+"""`simulation_frame` module include the `SimulationFrame` class"""
+
+import numpy as np
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class SimulationFrame:
+    """
+    Lightweight snapshot of a space yielded by `ParticleSpace.iter_simulation` after some steps.
+
+    The arrays are read-only views of the state of the space (no copies), so they are only valid until the next frame
+    is requested: a consumer that keeps them must copy them (`frame.positions.copy()`).
+
+    Attributes:
+        - step: number of time steps done when the frame was taken (0 is the initial state)
+        - time: [s] life time of the space
+        - positions: [m] (N, 3) read-only view of the positions of the particles
+        - velocities: [m/s] (N, 3) read-only view of the velocities of the particles (None if not requested)
+    """
+    step: int
+    time: float
+    positions: np.ndarray
+    velocities: np.ndarray | None = None
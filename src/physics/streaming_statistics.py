@@ -0,0 +1,274 @@
+"""`streaming_statistics` module include the online estimators used by the `AdaptabilityManager`
+
+The statistics of a history of values are updated with each new value in constant time and memory,
+instead of computing them again over the whole history in each check.
+
+Classes:
+- RunningMoments: Welford mean and variance (values can be removed too, for sliding windows)
+- P2Quantile: P² quantile estimator (Jain & Chlamtac, 1985): five markers, no stored values
+- ValueStatistics: mean, deviation and quantiles of a history of values, of all of them or of a sliding window
+"""
+
+import math
+import bisect
+from collections import deque
+from typing import Any
+
+
+class RunningMoments:
+    """Welford online mean and (population) variance of a group of values."""
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.mean: float = 0.
+        self._squared_deviations_sum: float = 0.
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __repr__(self) -> str:
+        class_name = self.__class__.__name__
+        return f"{class_name}(count = {self.count}, mean = {self.mean}, std = {self.std})"
+
+    @property
+    def variance(self) -> float:
+        """Population variance (as `np.var`)"""
+        return max(self._squared_deviations_sum / self.count, 0.) if self.count > 0 else 0.
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation (as `np.std`)"""
+        return math.sqrt(self.variance)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._squared_deviations_sum += delta * (value - self.mean)
+
+    def remove(self, value: float) -> None:
+        """Remove a value that was added before (inverse of `add`)."""
+        if self.count <= 1:
+            self.__init__()
+            return
+        self.count -= 1
+        delta = value - self.mean
+        self.mean -= delta / self.count
+        self._squared_deviations_sum -= delta * (value - self.mean)
+
+    @property
+    def as_dictionary(self) -> dict[str, Any]:
+        """The values that define the moments (for saving them, see `from_dictionary`)"""
+        return {"count": self.count, "mean": self.mean, "squared_deviations_sum": self._squared_deviations_sum}
+
+    @classmethod
+    def from_dictionary(cls, dictionary: dict[str, Any]) -> "RunningMoments":
+        """Return the moments saved with `as_dictionary`."""
+        moments = cls()
+        moments.count = int(dictionary["count"])
+        moments.mean = float(dictionary["mean"])
+        moments._squared_deviations_sum = float(dictionary["squared_deviations_sum"])
+        return moments
+
+
+class P2Quantile:
+    """P² online estimator of the quantile `probability` of a group of values.
+
+    It keeps five markers (min, p/2, p, (1+p)/2 and max quantiles) whose heights are adjusted with a parabolic
+    interpolation as values are added. Until five values are added the quantile is exact.
+    """
+    def __init__(self, probability: float) -> None:
+        self.probability: float = min(max(float(probability), 0.), 1.)
+        self.count: int = 0
+        self._heights: list[float] = [] # Sorted first values until there are 5, then the markers heights
+        self._positions: list[float] = [1., 2., 3., 4., 5.]
+        p = self.probability
+        self._desired_positions: list[float] = [1., 1. + 2*p, 1. + 4*p, 3. + 2*p, 5.]
+        self._desired_increments: tuple[float, ...] = (0., p/2, p, (1. + p)/2, 1.)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __repr__(self) -> str:
+        class_name = self.__class__.__name__
+        return f"{class_name}(probability = {self.probability}, count = {self.count}, value = {self.value})"
+
+    @property
+    def value(self) -> float:
+        """The estimated quantile (exact `method="higher"` quantile while there are less than 5 values)"""
+        if self.count == 0:
+            return math.nan
+        if self.count < 5:
+            return self._heights[math.ceil(self.probability * (self.count - 1))]
+        if self.probability == 0.:
+            return self._heights[0]
+        if self.probability == 1.:
+            return self._heights[4]
+        return self._heights[2]
+
+    @property
+    def as_dictionary(self) -> dict[str, Any]:
+        """The values that define the estimator (for saving it, see `from_dictionary`)"""
+        return {"probability": self.probability, "count": self.count, "heights": list(self._heights),
+                "positions": list(self._positions), "desired_positions": list(self._desired_positions)}
+
+    @classmethod
+    def from_dictionary(cls, dictionary: dict[str, Any]) -> "P2Quantile":
+        """Return the estimator saved with `as_dictionary`."""
+        quantile = cls(dictionary["probability"])
+        quantile.count = int(dictionary["count"])
+        quantile._heights = [float(height) for height in dictionary["heights"]]
+        quantile._positions = [float(position) for position in dictionary["positions"]]
+        quantile._desired_positions = [float(position) for position in dictionary["desired_positions"]]
+        return quantile
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        heights = self._heights
+        if self.count <= 5:
+            bisect.insort(heights, value)
+            return
+
+        positions = self._positions
+        # Cell of the new value, extending the extreme markers if needed
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = bisect.bisect_right(heights, value) - 1
+        for i in range(cell + 1, 5):
+            positions[i] += 1.
+        for i in range(5):
+            self._desired_positions[i] += self._desired_increments[i]
+
+        # Adjust the heights of the middle markers that are out of their desired position
+        for i in (1, 2, 3):
+            difference = self._desired_positions[i] - positions[i]
+            if (difference >= 1. and positions[i + 1] - positions[i] > 1.) \
+                    or (difference <= -1. and positions[i - 1] - positions[i] < -1.):
+                step = 1 if difference > 0 else -1
+                height = self._get_parabolic_height(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (positions[i + step] - positions[i])
+                heights[i] = height
+                positions[i] += step
+
+    def _get_parabolic_height(self, i: int, step: int) -> float:
+        """Piecewise-parabolic prediction of the height of the marker `i` moved by `step`."""
+        heights, positions = self._heights, self._positions
+        return heights[i] + step / (positions[i + 1] - positions[i - 1]) * (
+            (positions[i] - positions[i - 1] + step) * (heights[i + 1] - heights[i]) / (positions[i + 1] - positions[i])
+            + (positions[i + 1] - positions[i] - step) * (heights[i] - heights[i - 1]) / (positions[i] - positions[i - 1]))
+
+
+class ValueStatistics:
+    """
+    Statistics of a history of values updated with each value in constant time (O(window) with a sliding window).
+
+    Class workings:
+        - `mean`, `std`: of all the values (or the window)
+        - `delayed_mean`: mean without the last `delay` values
+        - `get_quantile`: the quantiles must be tracked (`track_quantiles`) before adding the values
+          - without window they are P² estimations (it starts estimating when it is tracked)
+          - with window they are exact (the window is kept sorted)
+    """
+    def __init__(self, window: int = 0, delay: int = 2) -> None:
+        """Init an empty 'ValueStatistics' object
+
+        Possitional-Keyword arguments:
+        - window: how many of the last values are used (0 means all of them). At least `delay + 1`
+        - delay: how many of the last values are not used for `delayed_mean`
+        """
+        self.delay: int = max(int(delay), 0)
+        self.window: int = max(int(window), self.delay + 1) if window and window > 0 else 0
+        self.moments: RunningMoments = RunningMoments()
+        self.delayed_moments: RunningMoments = RunningMoments()
+        self._last_values: deque[float] = deque() # Values not added yet to `delayed_moments`
+        self._quantiles: dict[float, P2Quantile] = {}
+        self._window_values: deque[float] = deque() # Only used with window
+        self._sorted_window_values: list[float] = []
+
+    def __len__(self) -> int:
+        """Number of values used (all of them or the window)"""
+        return self.moments.count
+
+    def __repr__(self) -> str:
+        class_name = self.__class__.__name__
+        return f"{class_name}(count = {len(self)}, window = {self.window}, mean = {self.mean}, std = {self.std})"
+
+    @property
+    def mean(self) -> float:
+        return self.moments.mean
+
+    @property
+    def std(self) -> float:
+        return self.moments.std
+
+    @property
+    def delayed_mean(self) -> float:
+        """Mean of the values without the last `delay` ones (NaN if there are not enough values)"""
+        return self.delayed_moments.mean if self.delayed_moments.count > 0 else math.nan
+
+    @property
+    def as_dictionary(self) -> dict[str, Any]:
+        """The values that define the statistics (for saving them, see `from_dictionary`)"""
+        return {"window": self.window, "delay": self.delay,
+                "moments": self.moments.as_dictionary, "delayed_moments": self.delayed_moments.as_dictionary,
+                "last_values": list(self._last_values),
+                "quantiles": [quantile.as_dictionary for quantile in self._quantiles.values()],
+                "window_values": list(self._window_values)}
+
+    @classmethod
+    def from_dictionary(cls, dictionary: dict[str, Any]) -> "ValueStatistics":
+        """Return the statistics saved with `as_dictionary`."""
+        statistics = cls(dictionary["window"], dictionary["delay"])
+        statistics.moments = RunningMoments.from_dictionary(dictionary["moments"])
+        statistics.delayed_moments = RunningMoments.from_dictionary(dictionary["delayed_moments"])
+        statistics._last_values = deque(float(value) for value in dictionary["last_values"])
+        for quantile_dictionary in dictionary["quantiles"]:
+            quantile = P2Quantile.from_dictionary(quantile_dictionary)
+            statistics._quantiles[quantile.probability] = quantile
+        statistics._window_values = deque(float(value) for value in dictionary["window_values"])
+        statistics._sorted_window_values = sorted(statistics._window_values)
+        return statistics
+
+    def track_quantiles(self, *probabilities: float) -> None:
+        """Start estimating the given quantiles (they are always exact with window)."""
+        if self.window:
+            return
+        for probability in probabilities:
+            if probability not in self._quantiles:
+                self._quantiles[probability] = P2Quantile(probability)
+
+    def get_quantile(self, probability: float, method: str = "higher") -> float:
+        """Return the quantile of the values. The method ("higher" or "lower" as in `np.quantile`) is only used with window."""
+        if self.window:
+            sorted_values = self._sorted_window_values
+            if not sorted_values:
+                return math.nan
+            index = probability * (len(sorted_values) - 1)
+            index = math.ceil(index) if method == "higher" else math.floor(index)
+            return sorted_values[min(max(index, 0), len(sorted_values) - 1)]
+        if probability not in self._quantiles:
+            raise KeyError(f"The quantile {probability} is not tracked (`track_quantiles`)")
+        return self._quantiles[probability].value
+
+    def add(self, value: float) -> None:
+        value = float(value)
+        self.moments.add(value)
+        self._last_values.append(value)
+        if len(self._last_values) > self.delay:
+            self.delayed_moments.add(self._last_values.popleft())
+        for quantile in self._quantiles.values():
+            quantile.add(value)
+
+        if self.window:
+            self._window_values.append(value)
+            bisect.insort(self._sorted_window_values, value)
+            if len(self._window_values) > self.window:
+                old_value = self._window_values.popleft()
+                del self._sorted_window_values[bisect.bisect_left(self._sorted_window_values, old_value)]
+                self.moments.remove(old_value)
+                self.delayed_moments.remove(old_value) # The oldest value is always already delayed
@@ -0,0 +1,139 @@
+"""`trajectory_buffer` module include the `TrajectoryBuffer` class"""
+
+import numpy as np
+from typing import Any
+
+
+class TrajectoryBuffer:
+    """
+    Preallocated (T, N, 3) storage of the position history of a group of particles.
+
+    Each particle owns a row `i` (the column `[:, i]` of the array) and its own length (stored positions).
+    When a row gets full the capacity is doubled, so storing a position is amortized O(1)
+    (instead of copying the whole history each step).
+    The histories are returned as read-only views of the stored positions (no copies).
+    While `is_recording` is False nothing is stored (e.g. when the positions are streamed instead, or in the steps that
+    the recording policy skips), so the memory is bounded. The capacity doesn't grow over `max_capacity` (if given, an
+    error is raised instead).
+
+    Arrays:
+        - positions: [m] (capacity, N, 3) the stored positions (NaN where nothing has been stored)
+        - lengths: (N,) number of stored positions of each row
+    """
+    MIN_CAPACITY: int = 64 # Stored positions per row of a new buffer
+
+    def __init__(self, number_of_particles: int = 0, capacity: int = MIN_CAPACITY) -> None:
+        """Init an empty 'TrajectoryBuffer' object
+
+        Possitional-Keyword arguments:
+        number_of_particles: how many rows (particles) the buffer has
+        capacity: how many positions per row fit before growing
+        """
+        self.positions: np.ndarray = np.full((max(capacity, 1), number_of_particles, 3), np.nan)
+        self.lengths: np.ndarray = np.zeros(number_of_particles, int)
+        self._rows: np.ndarray = np.arange(number_of_particles)
+        self.is_recording: bool = True
+        self.max_capacity: int | None = None
+
+    # --- INITIALASING METHODS ---
+
+    @classmethod
+    def from_particles(cls, particles: Any) -> "TrajectoryBuffer":
+        """Return a new buffer with a row copied from the history of each of the given particles (in order)."""
+        particles = list(particles)
+        histories = [particle.position_history for particle in particles]
+        max_length = max((len(history) for history in histories), default=0)
+        buffer = cls(len(particles), max(cls.MIN_CAPACITY, 2 * max_length))
+        for index, history in enumerate(histories):
+            buffer.positions[:len(history), index] = history
+            buffer.lengths[index] = len(history)
+        return buffer
+
+    @classmethod
+    def from_arrays(cls, positions: np.ndarray, lengths: np.ndarray) -> "TrajectoryBuffer":
+        """Return a new buffer with the given (T, N, 3) stored positions and (N,) lengths (e.g. the ones of a checkpoint)."""
+        buffer = cls(len(lengths), max(cls.MIN_CAPACITY, 2 * len(positions)))
+        buffer.positions[:len(positions)] = positions
+        buffer.lengths[:] = lengths
+        return buffer
+
+    # --- RETURNING METHODS ---
+
+    def __len__(self) -> int:
+        """Number of stored steps (the length of the longest row)"""
+        return int(self.lengths.max(initial=0))
+
+    def __repr__(self) -> str:
+        class_name = self.__class__.__name__
+        return f"{class_name}(number_of_particles = {len(self.lengths)}, length = {len(self)}, capacity = {self.capacity})"
+
+    @property
+    def capacity(self) -> int:
+        """How many positions fit in each row before growing"""
+        return self.positions.shape[0]
+
+    def get_history(self, index: int, steps_relation: int = 1) -> np.ndarray:
+        """Return a read-only (length, 3) view of the stored positions of the row `index` (one every `steps_relation`)."""
+        return _read_only(self.positions[:self.lengths[index]:steps_relation, index])
+
+    def get_array(self, steps_relation: int = 1) -> np.ndarray:
+        """Return a read-only (T, N, 3) view of all the stored positions (one step every `steps_relation`).
+        The rows shorter than the longest one are filled with NaN."""
+        return _read_only(self.positions[:len(self):steps_relation])
+
+    # --- OPERATING METHODS ---
+
+    def _grow(self, min_capacity: int) -> None:
+        """Reallocate the positions array with (at least) double capacity, but not over `max_capacity` (if it must grow
+        over it an error is raised). The views already returned keep the old one."""
+        new_capacity = max(2 * self.capacity, min_capacity)
+        if self.max_capacity is not None:
+            if min_capacity > self.max_capacity:
+                raise RuntimeError(f"The trajectory is full: {min_capacity} positions per row don't fit in its max "
+                                   f"capacity of {self.max_capacity}")
+            new_capacity = min(new_capacity, self.max_capacity)
+        new_positions = np.full((new_capacity,) + self.positions.shape[1:], np.nan)
+        new_positions[:self.capacity] = self.positions
+        self.positions = new_positions
+
+    def store_position(self, index: int, position: np.ndarray) -> None:
+        """Store a position at the end of the row `index`."""
+        if not self.is_recording:
+            return
+        length = self.lengths[index]
+        if length >= self.capacity:
+            self._grow(length + 1)
+        self.positions[length, index] = position
+        self.lengths[index] = length + 1
+
+    def store_positions(self, positions: np.ndarray) -> None:
+        """Store a (N, 3) array of positions at the end of every row."""
+        if not self.is_recording:
+            return
+        max_length = len(self)
+        if max_length >= self.capacity:
+            self._grow(max_length + 1)
+        self.positions[self.lengths, self._rows] = positions
+        self.lengths += 1
+
+    def decimate(self) -> None:
+        """Keep only one of each two stored positions of each row (the 2nd, 4th...), halving the lengths, without
+        reallocating. Used for coarsening the sampling of a run (see `recording_policy`)."""
+        new_lengths = self.lengths // 2
+        new_length = int(new_lengths.max(initial=0))
+        self.positions[:new_length] = self.positions[1:2 * new_length:2]
+        self.positions[new_length:] = np.nan
+        self.lengths[:] = new_lengths
+
+    def replace_last_positions(self, rows: np.ndarray, positions: np.ndarray) -> None:
+        """Replace the last stored position of each row of `rows` with the (len(rows), 3) `positions`."""
+        if not self.is_recording:
+            return
+        self.positions[self.lengths[rows] - 1, rows] = positions
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    """Return a non writeable view of the array."""
+    view = array.view()
+    view.flags.writeable = False
+    return view
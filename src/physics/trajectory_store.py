@@ -0,0 +1,197 @@
+"""`trajectory_store` module include the on-disk storage of the trajectory of a run
+
+The `TrajectoryBuffer` keeps the positions in RAM, so the length of a run is bounded by the memory. A store keeps them
+in a directory instead, so a run can be bigger than the RAM and it can be plotted again without simulating it again:
+- header.json: number of particles and frames, dtype and the simulation config of the run
+- masses.npy: [kg] (N,) masses of the particles
+- positions.dat: [m] (T, N, 3) raw array of the positions of each frame (memory-mapped)
+- times.dat: [s] (T,) raw array of the time of each frame (memory-mapped)
+
+The writer grows the raw files by chunks of frames (and updates the header with each chunk, so an interrupted run can
+be read up to its last chunk). The reader maps them read-only: its arrays are lazy views that only read from disk the
+frames that are used (e.g. one every `steps_relation` for plotting).
+
+Classes:
+- TrajectoryWriter: streams the frames of a run to a store
+- TrajectoryReader: lazy read-only views of a store
+
+Functions:
+- store_simulation: run a space (with `iter_simulation`) streaming its frames to a store
+"""
+
+import numpy as np
+import json
+import os
+from typing import Any
+
+# My modules
+from physics.checkpoint import _get_json_value
+
+
+STORE_FORMAT_VERSION = 1
+CHUNK_SIZE = 1024 # Frames that the raw files grow each time
+HEADER_FILE_NAME = "header.json"
+MASSES_FILE_NAME = "masses.npy"
+POSITIONS_FILE_NAME = "positions.dat"
+TIMES_FILE_NAME = "times.dat"
+
+
+class TrajectoryWriter:
+    """
+    Streams frames (positions and time) to a store directory (see module documentation), growing its memory-mapped
+    files by chunks of `chunk_size` frames. It must be closed (or used as a context manager) to write the last chunk.
+    """
+    def __init__(self, path: str, masses: np.ndarray, config: dict[str, Any] | None = None,
+                 chunk_size: int = CHUNK_SIZE, dtype: str = "float64") -> None:
+        """Init a 'TrajectoryWriter' object, creating the store (the files of a previous store in `path` are replaced)
+
+        Possitional-Keyword arguments:
+        - path: directory of the store
+        - masses: [kg] (N,) masses of the particles
+        - config: the simulation config of the run (e.g. `ConfigSimulation.as_dictionary`), saved in the header
+        - chunk_size: frames that the files grow each time
+        - dtype: of the stored positions ("float32" halves the size, enough for plotting)
+        """
+        self.path: str = path
+        self.masses: np.ndarray = np.array(masses, dtype=float)
+        self.config: dict[str, Any] = config if config is not None else {}
+        self.chunk_size: int = max(int(chunk_size), 1)
+        self.dtype: np.dtype = np.dtype(dtype)
+        self.number_of_frames: int = 0
+        self._positions: np.memmap | None = None
+        self._times: np.memmap | None = None
+
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, MASSES_FILE_NAME), self.masses)
+        for file_name in (POSITIONS_FILE_NAME, TIMES_FILE_NAME):
+            open(os.path.join(path, file_name), "wb").close()
+        self._write_header()
+
+    def __repr__(self) -> str:
+        class_name = self.__class__.__name__
+        return f"{class_name}(path = {self.path!r}, number_of_particles = {self.number_of_particles}, number_of_frames = {self.number_of_frames})"
+
+    def __enter__(self) -> "TrajectoryWriter":
+        return self
+
+    def __exit__(self, *exception_info: Any) -> None:
+        self.close()
+
+    @property
+    def number_of_particles(self) -> int:
+        return len(self.masses)
+
+    @property
+    def capacity(self) -> int:
+        """How many frames fit in the files before growing"""
+        return len(self._times) if self._times is not None else 0
+
+    def write_frame(self, positions: np.ndarray, time: float) -> None:
+        """Append a frame: the [m] (N, 3) positions of the particles at the [s] `time`."""
+        if self.number_of_frames >= self.capacity:
+            self._grow()
+        self._positions[self.number_of_frames] = positions # type: ignore
+        self._times[self.number_of_frames] = time # type: ignore
+        self.number_of_frames += 1
+
+    def flush(self) -> None:
+        """Write the frames in memory to the files and update the header."""
+        for array in (self._positions, self._times):
+            if array is not None:
+                array.flush()
+        self._write_header()
+
+    def close(self) -> None:
+        """Flush the frames and cut the files to the written frames."""
+        self.flush()
+        self._positions, self._times = None, None
+        self._resize_files(self.number_of_frames)
+
+    def _grow(self) -> None:
+        """Extend the files by a chunk of frames and map them again."""
+        self.flush()
+        capacity = self.capacity + self.chunk_size
+        self._positions, self._times = None, None
+        self._resize_files(capacity)
+        self._positions = np.memmap(os.path.join(self.path, POSITIONS_FILE_NAME), self.dtype, "r+",
+                                    shape=(capacity, self.number_of_particles, 3))
+        self._times = np.memmap(os.path.join(self.path, TIMES_FILE_NAME), np.float64, "r+", shape=(capacity,))
+
+    def _resize_files(self, number_of_frames: int) -> None:
+        """Set the size of the raw files to the given frames."""
+        frame_size = self.number_of_particles * 3 * self.dtype.itemsize
+        for file_name, size in ((POSITIONS_FILE_NAME, number_of_frames * frame_size), (TIMES_FILE_NAME, number_of_frames * 8)):
+            with open(os.path.join(self.path, file_name), "r+b") as file:
+                file.truncate(size)
+
+    def _write_header(self) -> None:
+        header = {"format_version": STORE_FORMAT_VERSION, "number_of_particles": self.number_of_particles,
+                  "number_of_frames": self.number_of_frames, "dtype": self.dtype.str, "config": self.config}
+        temporary_path = os.path.join(self.path, f"{HEADER_FILE_NAME}.tmp")
+        with open(temporary_path, "w") as file:
+            json.dump(header, file, default=_get_json_value)
+        os.replace(temporary_path, os.path.join(self.path, HEADER_FILE_NAME))
+
+
+class TrajectoryReader:
+    """
+    Read-only access to a store written by `TrajectoryWriter`. The arrays are memory-mapped: nothing is read from disk
+    until the frames are used.
+
+    Arrays:
+        - positions: [m] (T, N, 3) positions of each frame
+        - times: [s] (T,) time of each frame
+        - masses: [kg] (N,)
+    """
+    def __init__(self, path: str) -> None:
+        """Init a 'TrajectoryReader' object
+
+        Possitional-Keyword arguments:
+        - path: directory of the store
+        """
+        self.path: str = path
+        with open(os.path.join(path, HEADER_FILE_NAME)) as file:
+            header = json.load(file)
+        if header.get("format_version") != STORE_FORMAT_VERSION:
+            raise ValueError(f"Invalid trajectory store: {path!r} has format version {header.get('format_version')!r} "
+                             f"instead of {STORE_FORMAT_VERSION}")
+        self.config: dict[str, Any] = header["config"]
+        self.masses: np.ndarray = np.load(os.path.join(path, MASSES_FILE_NAME))
+        number_of_frames, number_of_particles = header["number_of_frames"], header["number_of_particles"]
+        if number_of_frames == 0: # An empty file can't be mapped
+            self.positions: np.ndarray = np.empty((0, number_of_particles, 3), header["dtype"])
+            self.times: np.ndarray = np.empty(0)
+        else:
+            self.positions = np.memmap(os.path.join(path, POSITIONS_FILE_NAME), np.dtype(header["dtype"]), "r",
+                                       shape=(number_of_frames, number_of_particles, 3))
+            self.times = np.memmap(os.path.join(path, TIMES_FILE_NAME), np.float64, "r", shape=(number_of_frames,))
+
+    def __len__(self) -> int:
+        """Number of stored frames"""
+        return len(self.times)
+
+    def __repr__(self) -> str:
+        class_name = self.__class__.__name__
+        return f"{class_name}(path = {self.path!r}, number_of_particles = {len(self.masses)}, number_of_frames = {len(self)})"
+
+    def get_array(self, steps_relation: int = 1) -> np.ndarray:
+        """Return a lazy (T, N, 3) view of the positions of one frame every `steps_relation` (as `TrajectoryBuffer.get_array`)."""
+        return self.positions[::max(int(steps_relation), 1)]
+
+
+def store_simulation(space: Any, path: str, number_of_time_steps: int | None = None, output_interval: int = 1,
+                     chunk_size: int = CHUNK_SIZE, dtype: str = "float64") -> TrajectoryReader:
+    """Run the space with `iter_simulation` (without recording in RAM) streaming a frame each `output_interval` steps to
+    the store `path`, and return its reader.
+
+    Possitional-Keyword arguments:
+    - space: the `ParticleSpace` to run
+    - path: directory of the store
+    - number_of_time_steps: steps to advance (by default the ones of the config)
+    - output_interval: steps between two stored frames
+    - chunk_size, dtype: of the store (see `TrajectoryWriter`)
+    """
+    with TrajectoryWriter(path, space.state.masses, space.config.as_dictionary, chunk_size, dtype) as writer:
+        for frame in space.iter_simulation(number_of_time_steps, output_interval):
+            writer.write_frame(frame.positions, frame.time)
+    return TrajectoryReader(path)
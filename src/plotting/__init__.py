@@ -2,6 +2,8 @@
 
 The package includes:
 - 'Dot' class: contains all the information I need a Particle to have for the plotting of the simulation.
+- 'projection' module: rotation of the positions into the 2D plot.
+- 'rendering' module: offscreen (headless) parallel rendering of the animations to PNG sequences, GIF or MP4.
 - 'space_plotting' module: contains the functions for running the simulation from an ParticleSpace object.
 """
 
@@ -0,0 +1,21 @@
+"""`projection` module include the functions for projecting the 3D positions of the particles in the 2D plot
+
+The positions are rotated with the `CONFIGURATION.plotting` rotation and their first two coordinates are plotted.
+"""
+import numpy as np
+
+# My modules
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import utils
+from settings import CONFIGURATION
+
+
+def get_rotation_matrix() -> np.ndarray:
+    """Return the matrix of the plotting rotation (`CONFIGURATION.plotting.rotation` and `rotation_sequence`)."""
+    rotation_array = np.array(CONFIGURATION.plotting.rotation)*np.pi/180
+    return utils.arrays_utils.rotation_matrix_sequenced(*rotation_array, sequence=CONFIGURATION.plotting.rotation_sequence)
+
+def get_projected_positions(positions: np.ndarray, rotation_matrix: np.ndarray) -> np.ndarray:
+    """Return the (..., 2) plotted coordinates of the (..., 3) positions rotated with the `rotation_matrix`."""
+    return (positions @ rotation_matrix.T)[..., :2] # Same as rotation_matrix @ array only taking its last axis
@@ -0,0 +1,189 @@
+"""`rendering` module include the offscreen (headless) rendering of the animations to files
+
+The frames are drawn with the Agg canvas of a `matplotlib.figure.Figure` (no window and no `pyplot`, so it runs on
+servers without display). The frames are split in contiguous blocks rendered in parallel over a `ProcessPoolExecutor`
+(each worker has its own figure and writes the PNG files of its block), and they are stitched at the end:
+- ".png": the frames are kept as a sequence of images `<stem>_000000.png`, `<stem>_000001.png`...
+- ".gif": stitched with Pillow
+- ".mp4": stitched with the `ffmpeg` program (it must be installed)
+
+The limits of the axes, the colours and the sizes of the dots are computed once before splitting the frames, so every
+block is drawn the same way (the same as the animation of `space_plotting`).
+
+Functions:
+- export_position_array: render the animation of the (T, N, 3) positions of the particles to a file
+- export_animation_by_space: render the animation of the trajectory of a space
+- export_animation_by_store: render the animation of a run stored with `physics.trajectory_store`
+"""
+
+import numpy as np
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from collections.abc import Iterator
+from typing import Any
+
+# My modules
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from settings import CONFIGURATION
+from plotting.dot import PlottingDot
+from plotting.projection import get_rotation_matrix, get_projected_positions
+
+
+FRAME_FILE_NAME = "frame_{index:06d}.png" # Name of the rendered frames (and input pattern of ffmpeg)
+FIGURE_SIZE = (6.4, 4.8) # [inch] Default size of the matplotlib figures
+DPI = 100
+EXPORT_SUFFIXES = (".png", ".gif", ".mp4")
+
+
+def export_position_array(stacked_position_history_array: np.ndarray,
+                          masses: list[float],
+                          path: str,
+                          max_workers: int | None = None,
+                          dpi: int = DPI,
+                          figure_size: tuple[float, float] = FIGURE_SIZE) -> list[str]:
+    """Render the animation of the positions of multiple particles to the file `path` (see module documentation) and
+    return the written files (the image sequence for ".png", otherwise only `path`).
+
+    Possitional-Keyword arguments:
+    - stacked_position_history_array: [m] (T, N, 3) positions of the N particles in each of the T frames
+    - masses: [kg] masses of the particles (for the size of their dots)
+    - path: output file. Its suffix (".png", ".gif" or ".mp4") chooses the format
+    - max_workers: processes rendering the blocks of frames (by default the number of CPUs)
+    - dpi, figure_size: [-], [inch] of each frame
+    """
+    stem, suffix = os.path.splitext(path)
+    suffix = suffix.lower()
+    if suffix not in EXPORT_SUFFIXES:
+        raise ValueError(f"Invalid export file: {path!r} must end with one of {EXPORT_SUFFIXES}")
+    if suffix == ".mp4" and shutil.which("ffmpeg") is None:
+        raise RuntimeError("Exporting to MP4 needs the `ffmpeg` program: install it or export to GIF or PNG")
+
+    projected_positions = get_projected_positions(np.asarray(stacked_position_history_array), get_rotation_matrix())
+    number_of_frames, number_of_particles = projected_positions.shape[:2]
+    if number_of_frames == 0:
+        raise ValueError("There are no frames to export")
+    limits = (float(np.min(projected_positions[..., 0])), float(np.max(projected_positions[..., 0])),
+              float(np.min(projected_positions[..., 1])), float(np.max(projected_positions[..., 1])))
+    style = {"colours_list": PlottingDot.get_colours_list(number_of_particles),
+             "size_list": PlottingDot.get_plotting_size_list_from_masses(masses),
+             "limits": limits, "dpi": dpi, "figure_size": figure_size}
+
+    output_directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(output_directory, exist_ok=True)
+    # The frames are rendered in a temporary directory (in the output one, so the PNG ones are moved without copying)
+    with tempfile.TemporaryDirectory(prefix="frames_", dir=output_directory if suffix == ".png" else None) as directory:
+        frame_paths = _render_frames(projected_positions, style, directory, max_workers)
+        if suffix == ".png":
+            file_paths = [f"{stem}_{index:06d}.png" for index in range(len(frame_paths))]
+            for frame_path, file_path in zip(frame_paths, file_paths):
+                os.replace(frame_path, file_path)
+            return file_paths
+        if suffix == ".gif":
+            _stitch_gif(frame_paths, path)
+        else:
+            _stitch_mp4(directory, path)
+    return [path]
+
+def export_animation_by_space(particle_space: Any, path: str, steps_relation: int | None = None, **kwargs: Any) -> list[str]:
+    """Render the animation of the trajectory of a space to the file `path` (see `export_position_array`).
+
+    Possitional-Keyword arguments:
+    - particle_space: [ParticleSpace] space that contains the simulated particles
+    - path: output file
+    - steps_relation: stored steps between two frames (by default the ones of `plotting_relative_time_step`)
+    - kwargs: of `export_position_array` (max_workers, dpi, figure_size)
+    """
+    if steps_relation is None:
+        steps_relation = CONFIGURATION.plotting.plotting_relative_time_step(len(particle_space.trajectory))
+    stacked_position_history_array = particle_space.get_reduced_trajectory_array(steps_relation)
+    return export_position_array(stacked_position_history_array, particle_space.get_particle_property_list("mass"), path, **kwargs)
+
+def export_animation_by_store(store_path: str, path: str, steps_relation: int | None = None, **kwargs: Any) -> list[str]:
+    """Render the animation of a run stored with `physics.trajectory_store` to the file `path` (without simulating it
+    again). Only the rendered frames are read from disk.
+
+    Possitional-Keyword arguments:
+    - store_path: directory of the store
+    - path: output file
+    - steps_relation: stored frames between two rendered ones (by default the ones of `plotting_relative_time_step`)
+    - kwargs: of `export_position_array` (max_workers, dpi, figure_size)
+    """
+    from physics.trajectory_store import TrajectoryReader
+    reader = TrajectoryReader(store_path)
+    if steps_relation is None:
+        steps_relation = CONFIGURATION.plotting.plotting_relative_time_step(len(reader))
+    return export_position_array(reader.get_array(steps_relation), list(reader.masses), path, **kwargs)
+
+
+# --- RENDERING ---
+
+def _render_frames(projected_positions: np.ndarray, style: dict[str, Any], directory: str,
+                   max_workers: int | None = None) -> list[str]:
+    """Render the (T, N, 2) projected positions to a PNG file per frame in `directory`, splitting the frames in
+    contiguous blocks over a pool of processes, and return the files in order."""
+    number_of_frames = len(projected_positions)
+    max_workers = min(max_workers or os.cpu_count() or 1, number_of_frames)
+    blocks = np.array_split(np.arange(number_of_frames), max_workers)
+    blocks_arguments = [(projected_positions[block], int(block[0]), style, directory) for block in blocks if len(block)]
+    if max_workers == 1:
+        blocks_frame_paths = [_render_frames_block(*arguments) for arguments in blocks_arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            blocks_frame_paths = list(executor.map(_render_frames_block, *zip(*blocks_arguments)))
+    return [frame_path for frame_paths in blocks_frame_paths for frame_path in frame_paths]
+
+def _render_frames_block(projected_positions: np.ndarray, first_index: int, style: dict[str, Any], directory: str) -> list[str]:
+    """Render a block of frames (the first one being the frame `first_index`) with its own Agg figure. Runs in a worker."""
+    figure = Figure(figsize=style["figure_size"], dpi=style["dpi"])
+    FigureCanvasAgg(figure)
+    axis = figure.subplots()
+    x_min, x_max, y_min, y_max = style["limits"]
+    axis.set_xlim(x_min, x_max)
+    axis.set_ylim(y_min, y_max)
+    scatter = axis.scatter(projected_positions[0, :, 0], projected_positions[0, :, 1],
+                           c=style["colours_list"],
+                           s=style["size_list"])
+    frame_paths = []
+    for offset, positions in enumerate(projected_positions):
+        scatter.set_offsets(positions)
+        frame_path = os.path.join(directory, FRAME_FILE_NAME.format(index=first_index + offset))
+        figure.savefig(frame_path)
+        frame_paths.append(frame_path)
+    return frame_paths
+
+
+# --- STITCHING ---
+
+def _stitch_gif(frame_paths: list[str], path: str) -> None:
+    """Join the PNG frames in the GIF file `path` (at `refresh_rate` frames per second, looping if `do_repeat`).
+    The frames are streamed: each file is opened, loaded and closed before the next one (so no limit of open files)."""
+    from PIL import Image
+    options: dict[str, Any] = {"save_all": True, "append_images": _iterate_loaded_images(frame_paths[1:]),
+                               "duration": 1000 / CONFIGURATION.plotting.refresh_rate}
+    if CONFIGURATION.plotting.do_repeat:
+        options["loop"] = 0
+    with Image.open(frame_paths[0]) as first_image:
+        first_image.save(path, **options)
+
+def _iterate_loaded_images(frame_paths: list[str]) -> Iterator[Any]:
+    """Yield the image of each file in memory, closing its file before opening the next one."""
+    from PIL import Image
+    for frame_path in frame_paths:
+        with Image.open(frame_path) as image:
+            image.load()
+            yield image.copy()
+
+def _stitch_mp4(directory: str, path: str) -> None:
+    """Join the PNG frames of `directory` in the MP4 file `path` with ffmpeg (at `refresh_rate` frames per second)."""
+    command = ["ffmpeg", "-y", "-loglevel", "error",
+               "-framerate", str(CONFIGURATION.plotting.refresh_rate),
+               "-i", os.path.join(directory, FRAME_FILE_NAME.replace("{index:06d}", "%06d")),
+               "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", # H.264 needs even sizes
+               "-pix_fmt", "yuv420p", path]
+    subprocess.run(command, check=True)
@@ -1,8 +1,7 @@
 import numpy as np
-from icecream import ic
 import math
-#from typing import Callable, Any
-from dataclasses import dataclass
+from typing import Any
+from dataclasses import dataclass, fields
 
 # My modules
 from .nestedhash import NestedHash
@@ -21,6 +20,8 @@ class ConfigAdapt(NestedHash):
         self.max_relative_log_diff = float()
         self.min_time_step = float()
         self.quantile_ignored_extremes = float()
+        self.history_window = int()
+        self.block_time_steps = bool()
 
     @property
     def max_absolute_value(self) -> float:# should generally have this name, but because it is for velocity, it is more clear as it
@@ -30,11 +31,102 @@ class ConfigAdapt(NestedHash):
     def max_absolute_value(self, value: float) -> None:
         self.max_velocity_diff = value
 
+    @property
+    def frozen(self) -> "FrozenConfigAdapt":
+        return FrozenConfigAdapt.from_config(self)
+
+class ConfigBarnesHut(NestedHash):
+    """Configuration for the accuracy of the Barnes–Hut tree engine"""
+    def __init__(self) -> None:
+        self.theta = float()
+        self.leaf_size = int()
+
+class ConfigParticleMesh(NestedHash):
+    """Configuration for the grid of the particle-mesh (FFT) engine"""
+    def __init__(self) -> None:
+        self.grid_size = int()
+        self.assignment = str()
+        self.softening = float()
+        self.is_periodic = bool()
+        self.box_size = float()
+        self.short_range_correction = bool()
+        self.short_range_scale = float()
+
+class ConfigForceEngine(NestedHash):
+    """Configuration for the engine that applies the couple forces in the simulation"""
+    def __init__(self) -> None:
+        self.name = str()
+        self.tile_size = int()
+        self.number_of_threads = int()
+        self.number_of_processes = int()
+        self.neighbour_skin = float()
+        self.geometry_cache_size = int()
+        self.barnes_hut = ConfigBarnesHut()
+        self.particle_mesh = ConfigParticleMesh()
+
+    @property
+    def frozen(self) -> "FrozenConfigForceEngine":
+        return FrozenConfigForceEngine.from_config(self)
+
+class ConfigRegularization(NestedHash):
+    """Configuration for the regularization of the close encounters of pairs of particles"""
+    def __init__(self) -> None:
+        self.is_enabled = bool()
+        self.encounter_distance = float()
+        self.substeps_per_orbit = int()
+
+    @property
+    def frozen(self) -> "FrozenConfigRegularization":
+        return FrozenConfigRegularization.from_config(self)
+
+class ConfigCheckpoint(NestedHash):
+    """Configuration for the periodic checkpoints of a running simulation"""
+    def __init__(self) -> None:
+        self.path = str()
+        self.every_steps = int()
+        self.every_seconds = float()
+
+class ConfigRecording(NestedHash):
+    """Configuration for which steps of a run are stored in the trajectory"""
+    def __init__(self) -> None:
+        self.policy = str()
+        self.steps_interval = int()
+        self.time_interval = float()
+        self.number_of_frames = int()
+        self.memory_budget = float()
+
+    def get_steps_relation(self, number_of_time_steps: int, time_step: float) -> int:
+        """Steps between two recorded steps of a run of `number_of_time_steps` steps of `time_step` (the first one with
+        "memory_budget", which is coarsened while running)"""
+        if self.policy == "steps_interval":
+            steps_relation = self.steps_interval
+        elif self.policy == "time_interval":
+            steps_relation = int(round(self.time_interval / time_step))
+        elif self.policy == "number_of_frames":
+            steps_relation = int(math.ceil(number_of_time_steps / self.number_of_frames)) if self.number_of_frames > 0 else 1
+        elif self.policy in ("every_step", "memory_budget"):
+            steps_relation = 1
+        else:
+            raise ValueError(f"Invalid recording policy: {self.policy!r}")
+        return max(steps_relation, 1)
+
+class ConfigIntegrator(NestedHash):
+    """Configuration for the scheme that advances the particles in each step of the simulation"""
+    def __init__(self) -> None:
+        self.name = str()
+        self.tolerance = float()
+
 class ConfigSimulation(NestedHash):
     """Configuration for the setting of the simulation"""
     def __init__(self) -> None:
         self.simulation_time = float()
         self.adaptability = ConfigAdapt()
+        self.force_engine = ConfigForceEngine()
+        self.integrator = ConfigIntegrator()
+        self.regularization = ConfigRegularization()
+        self.checkpoint = ConfigCheckpoint()
+        self.recording = ConfigRecording()
+        self.backend = str()
         self._time_step = float() # private because updates `adaptability`
 
     @property
@@ -60,7 +152,6 @@ class ConfigSimulation(NestedHash):
     
     @min_relative_time_step_reduction.setter
     def min_relative_time_step_reduction(self, value: float) -> None:
-        ic(self.time_step, value)
         if value == 0.:
             value = 1.
         self.adaptability.min_time_step = self.time_step / value
@@ -72,9 +163,19 @@ class ConfigSimulation(NestedHash):
     
     @property
     def could_crass(self) -> bool:
-        could_crass = int(self.simulation_time / self.time_step) > 100_000 # type: ignore
+        """Whether the run would store too many positions (more than 100,000 per particle) with the recording policy.
+        Never with "memory_budget" (its sampling is coarsened to fit)"""
+        if self.recording.policy == "memory_budget":
+            return False
+        number_of_time_steps = self.number_of_time_steps
+        could_crass = number_of_time_steps // self.recording.get_steps_relation(number_of_time_steps, self.time_step) > 100_000
         return could_crass
 
+    @property
+    def frozen(self) -> "FrozenConfigSimulation":
+        """Immutable snapshot of the values read by the steps of a run (see `FrozenConfigSimulation`)"""
+        return FrozenConfigSimulation.from_config(self)
+
 class ConfigPlotting(NestedHash):
     """Configuration for the setting of the plotting of the simulation results"""
     def __init__(self) -> None:
@@ -106,3 +207,62 @@ class ConfigSizes(NestedHash):
         return (self.max - self.min)/self.difference # type: ignore
 
 
+# --- Frozen Config classes: immutable snapshots for the hot loop ---
+
+class FrozenConfig:
+    """
+    Base of the immutable snapshots of the configs: slotted frozen dataclasses with plain values, compiled once at the
+    start of a run (`ConfigSimulation.frozen`) so the steps don't read the (mutable, nested) `NestedHash` configs.
+    Assigning to a snapshot raises an error (`dataclasses.FrozenInstanceError` for its fields).
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_config(cls, config: NestedHash) -> Any:
+        """Return the snapshot of the current values of the config (the nested configs are frozen too)."""
+        values = {}
+        for field in fields(cls): # type: ignore
+            value = getattr(config, field.name)
+            values[field.name] = value.frozen if isinstance(value, NestedHash) else value
+        return cls(**values)
+
+@dataclass(frozen=True, slots=True)
+class FrozenConfigAdapt(FrozenConfig):
+    """Immutable snapshot of a `ConfigAdapt`"""
+    is_adaptive: bool
+    max_quantile: float
+    max_deviation: float
+    max_velocity_diff: float
+    max_relative_log_diff: float
+    min_time_step: float
+    quantile_ignored_extremes: float
+    history_window: int
+    block_time_steps: bool
+    max_absolute_value: float # Same as `max_velocity_diff` (a plain value instead of a property)
+
+@dataclass(frozen=True, slots=True)
+class FrozenConfigForceEngine(FrozenConfig):
+    """Immutable snapshot of the values of a `ConfigForceEngine` read by the steps (the engines keep their own config)"""
+    name: str
+    tile_size: int
+    neighbour_skin: float
+    geometry_cache_size: int
+
+@dataclass(frozen=True, slots=True)
+class FrozenConfigRegularization(FrozenConfig):
+    """Immutable snapshot of a `ConfigRegularization`"""
+    is_enabled: bool
+    encounter_distance: float
+    substeps_per_orbit: int
+
+@dataclass(frozen=True, slots=True)
+class FrozenConfigSimulation(FrozenConfig):
+    """Immutable snapshot of the values of a `ConfigSimulation` read by the steps of a run.
+    The ones read only once when the run starts (integrator, checkpoint, recording) are taken from the config."""
+    simulation_time: float
+    time_step: float
+    number_of_time_steps: int
+    backend: str
+    adaptability: FrozenConfigAdapt
+    force_engine: FrozenConfigForceEngine
+    regularization: FrozenConfigRegularization
@@ -3,14 +3,15 @@
 from typing import Any
 from copy import deepcopy
 
-from icecream import ic
-
 
 class NestedHash():
     """
     A class to transform a dictionary (including nested dictionaries) into an object where keys are accessible as attributes
     Nested dictionaries are managed recursevely (as NestedHash functions).
+    Each assignment to an atribute of any NestedHash increases `modification_count`, so the values computed from them
+    can be cached until one changes (e.g. the frozen config snapshots).
     """
+    modification_count: int = 0 # Atribute assignments of all the instances
     def __init__(self, 
                  dictionary: dict[str, Any] | None = None, 
                  overwritter_dict: dict[str, Any] | None = None) -> None:
@@ -67,6 +68,7 @@ class NestedHash():
         return NotImplemented
     
     def __setattr__(self, key: str, new_value: Any) -> None:
+        NestedHash.modification_count += 1
         cls = self.__class__
         if isinstance(new_value, dict):
             return super().__setattr__(key, cls(new_value))
@@ -1,6 +1,4 @@
-import yaml
 from typing import Any
-from icecream import ic
 import numpy as np
 
 # My modules
@@ -10,7 +8,6 @@ from .nestedhash import NestedHash
 # relative imports
 import os, sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from constants import USER_SETTING_DICT
 
 
 # --- Default values ---
@@ -40,6 +37,93 @@ class Config(NestedHash):
             # Overwrite min_relative_time_step_reduction
         self.simulation.adaptability.quantile_ignored_extremes = 10.
             # greater if particles get toguether frequently
+        self.simulation.adaptability.history_window = 0
+            # How many of the last values are used for the thresholds statistics (0 means all the history)
+            # With 0 the quantiles are estimated (P2) and with a window they are exact
+        self.simulation.adaptability.block_time_steps = False
+            # If True, each particle takes its own power-of-two fraction of the time step (down to min_time_step)
+            # instead of all of them taking the smallest one. Better for spaces with few close particles
+
+        self.simulation.force_engine = configs.ConfigForceEngine()
+        self.simulation.force_engine.name = "pairwise"
+            # How the couple forces are applied: "pairwise" (vectorized all-pairs), "direct" (Python loop over pairs)
+            # "threaded" (the pairwise one with its tiles computed in several threads, same result)
+            # "shared_memory" (the Python loop of the forces without batched form split in worker processes)
+            # "barnes_hut" (octree approximation, for big spaces) or "particle_mesh" (FFT grid, for dense uniform spaces)
+        self.simulation.force_engine.tile_size = 512
+            # Max number of particles per side of the pairs tiles (bounds the memory of the vectorized engines)
+        self.simulation.force_engine.number_of_threads = 0
+            # Threads of the "threaded" engine (0 means one per core). The result doesn't depend on it
+        self.simulation.force_engine.number_of_processes = 0
+            # Worker processes of the "shared_memory" engine (0 means one per core)
+        self.simulation.force_engine.neighbour_skin = 0.2
+            # Skin of the neighbour list of the range limited forces, relative to the largest range
+            # greater means less rebuilds of the list but more pairs in it
+        self.simulation.force_engine.geometry_cache_size = 1024
+            # Max number of particles for computing the geometry of all the pairs once per evaluation (N x N arrays),
+            # shared by the couple forces applied with the Python loop. 0 disables it
+        self.simulation.force_engine.barnes_hut = configs.ConfigBarnesHut()
+        self.simulation.force_engine.barnes_hut.theta = 0.5
+            # Opening angle: lower is more accurate and slower (0 is the exact sum)
+        self.simulation.force_engine.barnes_hut.leaf_size = 8
+            # Max number of particles in a leaf of the tree (summed directly)
+        self.simulation.force_engine.particle_mesh = configs.ConfigParticleMesh()
+        self.simulation.force_engine.particle_mesh.grid_size = 64
+            # Cells per axis of the grid (the FFTs are faster with powers of 2)
+        self.simulation.force_engine.particle_mesh.assignment = "cic"
+            # How particles are spread on the grid: "cic" (8 cells) or "tsc" (27 cells, smoother)
+        self.simulation.force_engine.particle_mesh.softening = 0.
+            # [m] Softening length of the force (0 means only the grid smoothing)
+        self.simulation.force_engine.particle_mesh.is_periodic = False
+            # If True the space is a periodic box [0, box_size)^3, if False it is isolated
+        self.simulation.force_engine.particle_mesh.box_size = 0.
+            # [m] Side of the periodic box (only used if is_periodic)
+        self.simulation.force_engine.particle_mesh.short_range_correction = False
+            # If True the close pairs are summed directly (P3M), resolving the force below the cell size
+        self.simulation.force_engine.particle_mesh.short_range_scale = 1.25
+            # [cells] Scale of the split between the mesh (long range) and direct (short range) parts
+
+        self.simulation.integrator = configs.ConfigIntegrator()
+        self.simulation.integrator.name = "averaged_euler"
+            # How the particles are advanced in each step: "averaged_euler" (the original scheme, 1st order),
+            # "leapfrog" or "velocity_verlet" (2nd order symplectic, 1 force evaluation per step), "yoshida4" (4th order
+            # symplectic, 3 evaluations) or "rk45" (Runge-Kutta with error controlled substeps, 6 evaluations per substep)
+            # The symplectic ones allow much bigger time steps for orbits. The block time steps use the original scheme
+        self.simulation.integrator.tolerance = 1e-10
+            # Relative error allowed in each substep of "rk45" (to the largest position and velocity of the space)
+        self.simulation.regularization = configs.ConfigRegularization()
+        self.simulation.regularization.is_enabled = False
+            # If True the isolated close pairs are advanced as two-body problems (time-transformed leapfrog) and their
+            # mutual inverse-square forces are removed from the space, so a close pass doesn't divide the step of all
+        self.simulation.regularization.encounter_distance = 0.
+            # [m] The pairs closer than it (and isolated: no other particle that close) are regularized in a step
+        self.simulation.regularization.substeps_per_orbit = 64
+            # Substeps of the relative motion of a regularized pair in each orbit (more is a more accurate phase)
+        self.simulation.checkpoint = configs.ConfigCheckpoint()
+        self.simulation.checkpoint.path = ""
+            # File (.npz) where the running simulation is saved periodically, for restarting it later with
+            # `ParticleSpace.load_checkpoint`. Empty means no checkpoints
+        self.simulation.checkpoint.every_steps = 0
+            # Time steps between two checkpoints (0 means it doesn't depend on the steps)
+        self.simulation.checkpoint.every_seconds = 0.
+            # [s] Wall time between two checkpoints (0 means it doesn't depend on the time)
+        self.simulation.recording = configs.ConfigRecording()
+        self.simulation.recording.policy = "every_step"
+            # Which steps are stored in the trajectory: "every_step", "steps_interval" (one each `steps_interval`),
+            # "time_interval" (one each `time_interval`), "number_of_frames" (about `number_of_frames` in the whole run,
+            # e.g. plotting_time * refresh_rate for storing only the plotted ones) or "memory_budget" (each step until
+            # the trajectory fills `memory_budget`, then one of each two stored ones is dropped and the interval doubled)
+            # The runs that would store more than 100,000 steps are refused, but not with "memory_budget"
+        self.simulation.recording.steps_interval = 1
+        self.simulation.recording.time_interval = 0.
+            # [s] Rounded to a whole number of time steps
+        self.simulation.recording.number_of_frames = 0
+        self.simulation.recording.memory_budget = 0.
+            # [MB] Max memory of the stored positions
+        self.simulation.backend = "numpy"
+            # How the inner loops are run: "numpy" (vectorized), "numba" (fused compiled loops, falls back to "numpy" if
+            # Numba is not installed) or "auto" ("numba" if it is installed). Compiled for the inverse-square couple forces
+            # of the pairwise engine and for the steps of the integrators
 
         self.plotting = configs.ConfigPlotting()
         self.plotting.plotting_time = 10.0
@@ -4,18 +4,23 @@ from matplotlib.animation import FuncAnimation
 from matplotlib.lines import Line2D # For type hinting in the update function
 import matplotlib.colors as mcolors
 import itertools
-from icecream import ic
+import threading
+import queue
 
 # My modules
 
 import constants
-import utils
 from physics import ParticleSpace
+from physics.trajectory_store import TrajectoryReader
 from settings import CONFIGURATION
 from plotting.dot import PlottingDot
+from plotting.projection import get_rotation_matrix
 
 # ---
 
+LIVE_QUEUE_SIZE = 8 # Frames waiting to be plotted in the live mode (the oldest ones are dropped if the plotting falls behind)
+LIVE_LIMITS_MARGIN = 0.1 # Relative margin added when the axis limits grow in the live mode
+
 
 def print_animated_simulation_by_space(particle_space: ParticleSpace) -> None:
     """Open a window to show the simulation animation of multiple particles.
@@ -23,12 +28,30 @@ def print_animated_simulation_by_space(particle_space: ParticleSpace) -> None:
     Arguments:
     particle_space: [ParticleSpace] space that contains the simulated particles
     """
-    position_history_array = particle_space.get_reduced_position_history_array(CONFIGURATION.plotting.plotting_relative_time_step(CONFIGURATION.simulation.number_of_time_steps))  # constants.PLOTTING_RELATIVE_TIME_STEP
-    stacked_position_history_array = utils.arrays_utils.stack_positions(*position_history_array)
+    # (T, N, 3) view of the space trajectory, no need to stack the particles histories
+    stacked_position_history_array = particle_space.get_reduced_trajectory_array(CONFIGURATION.plotting.plotting_relative_time_step(len(particle_space.trajectory)))  # Stored steps (they may be decimated by the recording policy)
+    print_animated_position_array(stacked_position_history_array, particle_space.get_particle_property_list("mass"))
 
-    rotation_array = np.array(CONFIGURATION.plotting.rotation)*np.pi/180
-    rotation_matrix = utils.arrays_utils.rotation_matrix_sequenced(*rotation_array, sequence=CONFIGURATION.plotting.rotation_sequence)
-    ic(rotation_matrix)
+def print_animated_simulation_by_store(path: str) -> None:
+    """Open a window to show the animation of a run stored with `physics.trajectory_store` (without simulating it again).
+    Only the plotted frames (one every `plotting_relative_time_step`) are read from disk.
+    
+    Arguments:
+    path: directory of the store
+    """
+    reader = TrajectoryReader(path)
+    # Lazy (T, N, 3) view of the stored positions: only these frames are read when rotating them
+    stacked_position_history_array = reader.get_array(CONFIGURATION.plotting.plotting_relative_time_step(len(reader)))
+    print_animated_position_array(stacked_position_history_array, list(reader.masses))
+
+def print_animated_position_array(stacked_position_history_array: np.ndarray, masses: list[float]) -> None:
+    """Open a window to show the animation of the positions of multiple particles.
+    
+    Arguments:
+    stacked_position_history_array: [m] (T, N, 3) positions of the N particles in each of the T frames
+    masses: [kg] masses of the particles (for the size of their dots)
+    """
+    rotation_matrix = get_rotation_matrix()
     
     rotated_stacked_position_history_array = stacked_position_history_array @ rotation_matrix.T # Same as rotation_matrix @ array only taking its last axis
     
@@ -36,14 +59,14 @@ def print_animated_simulation_by_space(particle_space: ParticleSpace) -> None:
     y = rotated_stacked_position_history_array[:,:,1]
 
     number_of_frames = stacked_position_history_array.shape[0]
-    number_of_particles = len(particle_space)
+    number_of_particles = stacked_position_history_array.shape[1]
 
     fig, axis = plt.subplots()
     axis.set_xlim(np.min(x), np.max(x))
     axis.set_ylim(np.min(y), np.max(y))
 
     colours_list = PlottingDot.get_colours_list(number_of_particles)
-    size_list = PlottingDot.get_plotting_size_list_from_masses(particle_space.get_particle_property_list("mass"))
+    size_list = PlottingDot.get_plotting_size_list_from_masses(masses)
 
 
     # Initialize the scatter plot. Using scatter is better for individual point properties.
@@ -67,6 +90,114 @@ def print_animated_simulation_by_space(particle_space: ParticleSpace) -> None:
 
     plt.show()
 
+def print_live_simulation_by_space(particle_space: ParticleSpace, 
+                                   output_interval: int | None = None, 
+                                   is_recording: bool = False,
+                                   queue_size: int = LIVE_QUEUE_SIZE) -> None:
+    """Open a window to show the simulation animation of multiple particles while the space is simulated (live mode).
+    
+    The space runs in a worker thread (`iter_simulation`) that puts the frames in a bounded queue, and the animation
+    plots the newest one in each refresh. The simulation never waits for the plotting: if the queue is full its oldest
+    frame is dropped. The axis limits grow when the particles go out of them. Closing the window stops the simulation.
+    
+    Arguments:
+    particle_space: [ParticleSpace] space to simulate
+    output_interval: steps between two frames (by default the ones of `plotting_relative_time_step`)
+    is_recording: whether the positions are also stored in the space trajectory
+    queue_size: max frames waiting to be plotted
+    """
+    if output_interval is None:
+        output_interval = CONFIGURATION.plotting.plotting_relative_time_step(CONFIGURATION.simulation.number_of_time_steps)
+    frames_queue: queue.Queue = queue.Queue(maxsize=max(int(queue_size), 1))
+    stop_event = threading.Event()
+    worker_errors: list[BaseException] = []
+
+    def put_dropping_oldest(item) -> None:
+        """Put an item in the queue without waiting, dropping the oldest one if it is full."""
+        while True:
+            try:
+                frames_queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    frames_queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def run_simulation() -> None:
+        """Worker thread: advance the space and put a copy of each frame in the queue (None at the end)."""
+        try:
+            for frame in particle_space.iter_simulation(output_interval=output_interval, is_recording=is_recording):
+                if stop_event.is_set():
+                    break
+                put_dropping_oldest((frame.step, frame.positions.copy()))
+        except BaseException as error:
+            worker_errors.append(error)
+        finally:
+            put_dropping_oldest(None)
+
+    rotation_matrix = get_rotation_matrix()
+    number_of_particles = len(particle_space)
+    fig, axis = plt.subplots()
+    colours_list = PlottingDot.get_colours_list(number_of_particles)
+    size_list = PlottingDot.get_plotting_size_list_from_masses(particle_space.get_particle_property_list("mass"))
+    scatter = axis.scatter(np.zeros(number_of_particles), np.zeros(number_of_particles), 
+                           c=colours_list, 
+                           s=size_list)
+    limits = np.array([[np.inf, -np.inf], [np.inf, -np.inf]]) # x and y (min, max) shown
+
+    def grow_limits(x: np.ndarray, y: np.ndarray) -> None:
+        """Grow the axis limits (with a margin) if the points are out of them."""
+        for limit, values in zip(limits, (x, y)):
+            low, high = float(np.min(values)), float(np.max(values))
+            if low >= limit[0] and high <= limit[1]:
+                continue
+            low, high = min(low, limit[0]), max(high, limit[1])
+            margin = LIVE_LIMITS_MARGIN * (high - low) if high > low else 1.
+            limit[:] = low - margin, high + margin
+        axis.set_xlim(*limits[0])
+        axis.set_ylim(*limits[1])
+
+    def update_plot_data(_):
+        """Plot the newest frame of the queue (the older ones are skipped)."""
+        newest_frame = None
+        is_finished = False
+        while True:
+            try:
+                item = frames_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                is_finished = True
+                break
+            newest_frame = item
+        if newest_frame is not None:
+            step, positions = newest_frame
+            rotated_positions = positions @ rotation_matrix.T
+            x, y = rotated_positions[:, 0], rotated_positions[:, 1]
+            grow_limits(x, y)
+            scatter.set_offsets(np.c_[x, y])
+            axis.set_title(f"Step {step}")
+        if is_finished:
+            animation.event_source.stop()
+        return (scatter,)
+
+    worker = threading.Thread(target=run_simulation, name="live_simulation", daemon=True)
+    fig.canvas.mpl_connect("close_event", lambda _: stop_event.set())
+    animation = FuncAnimation(fig=fig, 
+                              func=update_plot_data, 
+                              frames=itertools.count(), 
+                              interval=1/CONFIGURATION.plotting.refresh_rate*1000, #type: ignore
+                              blit=False, # The axis limits change
+                              cache_frame_data=False,
+                              )
+    worker.start()
+    plt.show()
+    stop_event.set()
+    worker.join()
+    if worker_errors:
+        raise worker_errors[0]
+
 
 
 # --- deprecated functions ---
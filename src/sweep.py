@@ -0,0 +1,137 @@
+"""This module runs parameter sweeps: the same `utils.init_space` preset simulated with different settings overrides
+
+Each run has its own `Config` (the defaults, the user settings, the preset custom settings and the overrides),
+so the runs don't share the global `CONFIGURATION` and can be fanned out in parallel over a `ProcessPoolExecutor`.
+
+Functions:
+- expand_settings_grid: return the list of overrides of a grid (the lists in the nested dictionary are its axes)
+- flatten_settings: return a nested settings dictionary with dotted keys (one level)
+- run_preset: run one preset with its overrides in an isolated config and return its result row
+- run_sweep: run a preset with every overrides of a grid in a pool of processes and return the result table
+"""
+
+# General modules
+import numpy as np
+import os
+import itertools
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor
+from collections.abc import Callable, Sequence
+from typing import Any
+
+# My modules
+import utils
+import physics
+from settings import Config
+import constants
+
+
+def expand_settings_grid(settings_grid: dict[str, Any] | Sequence[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Return the list of settings overrides of a grid.
+
+    The grid has the same shape as the `custom_settings` of the presets, but each `list` value is an axis of the grid
+    (the tuples are values, as `rotation`). The overrides are all the combinations of the axes values.
+    If a list of overrides is given, it is returned as it is.
+
+    Example: {"simulation": {"time_step": [0.1, 0.01], "adaptability": {"is_adaptive": [True, False]}}} gives 4 overrides
+    """
+    if not isinstance(settings_grid, dict):
+        return list(settings_grid)
+    axes = [(key, value) for key, value in flatten_settings(settings_grid).items() if isinstance(value, list)]
+    fixed_settings = {key: value for key, value in flatten_settings(settings_grid).items() if not isinstance(value, list)}
+    overrides_list: list[dict[str, Any]] = []
+    for values in itertools.product(*(axis_values for _, axis_values in axes)):
+        flat_overrides = fixed_settings | {key: value for (key, _), value in zip(axes, values)}
+        overrides_list.append(_nest_settings(flat_overrides))
+    return overrides_list
+
+def flatten_settings(settings: dict[str, Any], prefix: str = "") -> dict[str, Any]:
+    """Return the nested settings dictionary as a one level dictionary with dotted keys ("simulation.time_step")."""
+    flat_settings: dict[str, Any] = {}
+    for key, value in settings.items():
+        dotted_key = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat_settings |= flatten_settings(value, f"{dotted_key}.")
+        else:
+            flat_settings[dotted_key] = value
+    return flat_settings
+
+def _nest_settings(flat_settings: dict[str, Any]) -> dict[str, Any]:
+    """Inverse of `flatten_settings`."""
+    settings: dict[str, Any] = {}
+    for dotted_key, value in flat_settings.items():
+        *parent_keys, key = dotted_key.split(".")
+        nested_settings = settings
+        for parent_key in parent_keys:
+            nested_settings = nested_settings.setdefault(parent_key, {})
+        nested_settings[key] = value
+    return settings
+
+
+def run_preset(init_space: Callable[[], tuple[physics.ParticleSpace, dict]], overrides: dict[str, Any] | None = None,
+               steps_relation: int = 1) -> dict[str, Any]:
+    """Run the preset with its own config: the defaults updated with the user settings, the preset custom settings
+    and the `overrides` (in this order). The global `CONFIGURATION` is not used.
+
+    Possitional-Keyword arguments:
+    - init_space: the preset (a function of `utils.init_space`, it must be importable by the workers)
+    - overrides: settings with the same shape as the preset `custom_settings`
+    - steps_relation: only one of each `steps_relation` stored positions is returned (smaller results)
+
+    Returns:
+    The result row: the flat overrides, the run time [s], the number of time steps, the life time [s]
+    and the (T, N, 3) trajectory
+    """
+    overrides = overrides if overrides is not None else {}
+    config = Config()
+    config.update(constants.USER_SETTING_DICT)
+    space, custom_settings = init_space()
+    config.update(custom_settings)
+    config.update(overrides)
+    space.config = config.simulation
+
+    start_time = perf_counter()
+    space.run_simulation()
+    run_time = perf_counter() - start_time
+    return flatten_settings(overrides) | {
+        "run_time": run_time,
+        "number_of_time_steps": config.simulation.number_of_time_steps,
+        "life_time": space.life_time,
+        "trajectory": np.array(space.get_reduced_trajectory_array(steps_relation)),
+    }
+
+def run_sweep(init_space: Callable[[], tuple[physics.ParticleSpace, dict]],
+              settings_grid: dict[str, Any] | Sequence[dict[str, Any]],
+              max_workers: int | None = None, steps_relation: int = 1) -> list[dict[str, Any]]:
+    """Run the preset with every settings overrides of the grid (see `expand_settings_grid`), each run in a process
+    of a pool with its own config (see `run_preset`).
+
+    Possitional-Keyword arguments:
+    - init_space: the preset (a function of `utils.init_space`)
+    - settings_grid: the grid of settings overrides, or the list of them
+    - max_workers: processes of the pool (by default one per core, and not more than runs)
+    - steps_relation: only one of each `steps_relation` stored positions is returned (smaller results)
+
+    Returns:
+    The result table: a row (dictionary) per run, in the order of the grid, with its index and the columns of `run_preset`
+    """
+    overrides_list = expand_settings_grid(settings_grid)
+    if not overrides_list:
+        return []
+    max_workers = min(max_workers or os.cpu_count() or 1, len(overrides_list))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        rows = list(executor.map(run_preset, itertools.repeat(init_space), overrides_list, itertools.repeat(steps_relation)))
+    return [{"index": index} | row for index, row in enumerate(rows)]
+
+
+# Running the file
+if __name__=="__main__":
+    settings_grid = {
+        "simulation": {
+            "time_step": [0.01, 0.005, 0.0025],
+            "integrator": {"name": ["averaged_euler", "leapfrog", "yoshida4"]},
+        },
+    }
+    result_table = run_sweep(utils.init_space.axis_orbits, settings_grid)
+    for row in result_table:
+        print({key: value for key, value in row.items() if key != "trajectory"}, row["trajectory"].shape)
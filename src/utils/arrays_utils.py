@@ -7,7 +7,6 @@ import numpy as np
 from functools import wraps
 from typing import Callable, Any, ParamSpec
 P = ParamSpec('P')  # For type hinting *args, **kwargs
-from icecream import ic
 
 
 import sys, os
@@ -65,6 +64,7 @@ def rotation_matrix_sequenced(angle_1: float = 0., angle_2: float = 0., angle_3:
 
 
 if __name__ == "__main__":
+    from icecream import ic
     a = np.array([1, 2, 3])
     rot1 = rotation_matrix(0.5, 1, 2)
     rot2 = rotation_matrix_sequenced(0.5, 1, 2)
@@ -3,6 +3,7 @@
 Functions:
 """
 
+from __future__ import annotations # The `physics` annotations are read when used, so `physics` can import `utils` first
 import numpy as np
 
 # Relative imports
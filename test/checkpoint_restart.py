@@ -0,0 +1,69 @@
+# General modules
+import numpy as np
+import os
+import tempfile
+
+# My modules
+import sys; sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+import utils # Before `physics` (it imports `physics` itself)
+import physics
+from settings import CONFIGURATION
+
+
+DEFAULT_SIMULATION_SETTINGS = CONFIGURATION.simulation.as_dictionary # Restored before each case (they don't leak)
+NUMBER_OF_TIME_STEPS = 60
+CHECKPOINT_STEP = 25
+CASES = [ # Preset and the simulation settings changed in it
+    ("three_elliptical_orbits", {"integrator": {"name": "leapfrog"}}),
+    ("three_elliptical_orbits", {"time_step": 0.05, "integrator": {"name": "rk45", "tolerance": 1e-13}}),
+    ("axis_orbits", {"adaptability": {"is_adaptive": True, "max_quantile": 3., "block_time_steps": True}}),
+    ("two_particles_from_repose_adaptative", {}),
+    ("three_elliptical_orbits", {"regularization": {"is_enabled": True, "encounter_distance": 0.3}}),
+]
+
+
+def get_space(preset: str, simulation_settings: dict) -> physics.ParticleSpace:
+    """Return the space of the preset with the config of a run of `NUMBER_OF_TIME_STEPS` steps."""
+    CONFIGURATION.simulation.update(DEFAULT_SIMULATION_SETTINGS)
+    space, custom_settings = getattr(utils.init_space, preset)()
+    CONFIGURATION.update(custom_settings)
+    CONFIGURATION.simulation.update(simulation_settings)
+    CONFIGURATION.simulation.simulation_time = NUMBER_OF_TIME_STEPS * CONFIGURATION.simulation.time_step
+    return space
+
+def are_equal_spaces(space: physics.ParticleSpace, other_space: physics.ParticleSpace) -> bool:
+    """Return whether the state, the stored trajectory and the life time of both spaces are bit-identical."""
+    trajectory, other_trajectory = space.trajectory, other_space.trajectory
+    return (all(np.array_equal(getattr(space.state, name), getattr(other_space.state, name))
+                for name in physics.ParticleState.ROW_ARRAYS_NAMES)
+            and np.array_equal(trajectory.positions[:len(trajectory)], other_trajectory.positions[:len(other_trajectory)], equal_nan=True)
+            and np.array_equal(trajectory.lengths, other_trajectory.lengths)
+            and space.life_time == other_space.life_time)
+
+
+# Running the file
+if __name__=="__main__":
+    path = os.path.join(tempfile.mkdtemp(), "checkpoint.npz")
+    for preset, simulation_settings in CASES:
+        # --- RUN WITHOUT STOPPING ---
+        space = get_space(preset, simulation_settings)
+        space.run_simulation()
+
+        # --- RUN STOPPED AT THE CHECKPOINT AND RESTARTED ---
+        stopped_space = get_space(preset, simulation_settings)
+        CONFIGURATION.simulation.simulation_time = CHECKPOINT_STEP * CONFIGURATION.simulation.time_step
+        stopped_space.run_simulation()
+        CONFIGURATION.simulation.simulation_time = NUMBER_OF_TIME_STEPS * CONFIGURATION.simulation.time_step
+        stopped_space.save_checkpoint(path, CHECKPOINT_STEP)
+        restarted_space, step = physics.ParticleSpace.load_checkpoint(path)
+        restarted_space.run_simulation(start_step=step)
+
+        is_equal = are_equal_spaces(space, restarted_space)
+        is_equal_integrator = space.integrator.checkpoint_state == restarted_space.integrator.checkpoint_state
+        print(f"{preset} {simulation_settings}: restarted at step {step}, bit-identical {is_equal}, "
+              f"same integrator state {is_equal_integrator}")
+        assert step == CHECKPOINT_STEP
+        assert is_equal, f"the restarted run of {preset} must be bit-identical to the one without stopping"
+        assert is_equal_integrator, f"the restarted integrator of {preset} must end in the same state"
+
+    print("The restarted runs are bit-identical")
@@ -0,0 +1,69 @@
+# General modules
+import numpy as np
+import os
+
+# My modules
+import sys; sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+import utils # Before `physics` (it imports `physics` itself)
+import physics
+from physics.dynamics.forces import gravitational_force
+from settings.config_subclasses import ConfigForceEngine
+
+
+NUMBER_OF_PARTICLES = 200
+NUMBER_OF_TARGETS = 37
+TILE_SIZE = 16 # Small, so there are many tiles (and threads working at once)
+RELATIVE_TOLERANCE = 1e-12
+
+
+def get_random_space(number_of_particles: int, seed: int = 0) -> physics.ParticleSpace:
+    """Return a space of particles with random masses, positions and velocities attracted by gravity."""
+    generator = np.random.default_rng(seed)
+    particles = (physics.Particle(float(mass), position, velocity) for mass, position, velocity in zip(
+        generator.uniform(1e20, 1e24, number_of_particles),
+        generator.uniform(-1e9, 1e9, (number_of_particles, 3)),
+        generator.uniform(-1e3, 1e3, (number_of_particles, 3))))
+    return physics.ParticleSpace(*particles, couple_forces_array=(gravitational_force,))
+
+def get_engine_accelerations(space: physics.ParticleSpace, engine_name: str, targets: np.ndarray | None = None) -> np.ndarray:
+    """Return the accelerations of the couple forces of the space applied with the engine `engine_name`."""
+    engine_config = ConfigForceEngine()
+    engine_config.update({"name": engine_name, "tile_size": TILE_SIZE, "number_of_threads": 4})
+    engine = physics.engines.get_couple_forces_engine(engine_config)
+    state = space.state
+    state.reset_accelerations()
+    try:
+        engine.apply_couple_forces(space, space._couple_forces_array, targets)
+    finally:
+        engine.close()
+    return state.accelerations.copy()
+
+def get_max_relative_difference(accelerations: np.ndarray, reference_accelerations: np.ndarray) -> float:
+    return float(np.max(np.abs(accelerations - reference_accelerations)) / np.max(np.abs(reference_accelerations)))
+
+
+# Running the file
+if __name__=="__main__":
+    space = get_random_space(NUMBER_OF_PARTICLES)
+    targets = np.sort(np.random.default_rng(1).choice(NUMBER_OF_PARTICLES, NUMBER_OF_TARGETS, replace=False))
+    reference_accelerations = get_engine_accelerations(space, "direct")
+
+    # --- ALL THE PARTICLES ---
+    for engine_name in ("pairwise", "threaded"):
+        accelerations = get_engine_accelerations(space, engine_name)
+        difference = get_max_relative_difference(accelerations, reference_accelerations)
+        print(f"{engine_name} vs direct: max relative difference {difference:.3e}")
+        assert difference < RELATIVE_TOLERANCE, engine_name
+    assert np.array_equal(get_engine_accelerations(space, "threaded"), get_engine_accelerations(space, "pairwise")), \
+        "threaded must be equal to pairwise (same order of the tiles)"
+
+    # --- TARGETED PARTICLES ---
+    others = np.setdiff1d(np.arange(NUMBER_OF_PARTICLES), targets)
+    for engine_name in ("direct", "pairwise", "threaded"):
+        accelerations = get_engine_accelerations(space, engine_name, targets)
+        difference = get_max_relative_difference(accelerations[targets], reference_accelerations[targets])
+        print(f"{engine_name} targeted vs direct: max relative difference {difference:.3e}")
+        assert difference < RELATIVE_TOLERANCE, f"{engine_name} targeted"
+        assert not np.any(accelerations[others]), f"{engine_name} targeted must not accelerate the other particles"
+
+    print("All the engines are equivalent")
@@ -0,0 +1,70 @@
+# General modules
+import numpy as np
+import os
+
+# My modules
+import sys; sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+import utils # Before `physics` (it imports `physics` itself)
+import physics
+from settings import CONFIGURATION
+
+
+NUMBER_OF_TIME_STEPS = 2000
+MEMORY_BUDGET_FRAMES = 100 # Stored steps that fit in the budget of the first run
+
+
+def get_space() -> physics.ParticleSpace:
+    """Return the `three_elliptical_orbits` space configured for runs of `NUMBER_OF_TIME_STEPS` steps."""
+    space, custom_settings = utils.init_space.three_elliptical_orbits()
+    CONFIGURATION.update(custom_settings)
+    CONFIGURATION.simulation.simulation_time = NUMBER_OF_TIME_STEPS * CONFIGURATION.simulation.time_step
+    return space
+
+
+# Running the file
+if __name__=="__main__":
+    space = get_space()
+    frame_size = space.trajectory.positions[0].nbytes
+
+    # --- BUDGETED RUN ---
+    CONFIGURATION.simulation.recording.update({"policy": "memory_budget", "memory_budget": MEMORY_BUDGET_FRAMES * frame_size / 1e6})
+    space.run_simulation()
+    trajectory = space.trajectory
+    print(f"Budgeted run: {len(trajectory)} stored steps, capacity {trajectory.capacity}")
+    assert len(trajectory) <= MEMORY_BUDGET_FRAMES and trajectory.capacity <= MEMORY_BUDGET_FRAMES, "the budget must be kept"
+    assert trajectory.max_capacity is None, "the budget must only bound the capacity inside its run"
+
+    # --- RECORDING RUN AFTER IT ---
+    # Every step is stored: the capacity must keep doubling (not growing one step at a time)
+    CONFIGURATION.simulation.recording.policy = "every_step"
+    reallocations = 0
+    positions = trajectory.positions
+    for frame in space.iter_simulation(is_recording=True):
+        if trajectory.positions is not positions:
+            positions = trajectory.positions
+            reallocations += 1
+    max_reallocations = int(np.ceil(np.log2(len(trajectory) / MEMORY_BUDGET_FRAMES))) + 1
+    print(f"Recording run: {len(trajectory)} stored steps, capacity {trajectory.capacity}, {reallocations} reallocations")
+    assert len(trajectory) >= NUMBER_OF_TIME_STEPS, "every step must be stored"
+    assert reallocations <= max_reallocations, f"the capacity must double (at most {max_reallocations} reallocations)"
+
+    # --- BUDGETED RUN OF A LONGER TRAJECTORY ---
+    # The trajectory is over the budget when it starts: it is decimated until it fits
+    CONFIGURATION.simulation.recording.policy = "memory_budget"
+    space.run_simulation()
+    print(f"Budgeted run after it: {len(trajectory)} stored steps")
+    assert len(trajectory) <= MEMORY_BUDGET_FRAMES, "the budget must be kept"
+
+    # --- FULL BUFFER ---
+    buffer = physics.TrajectoryBuffer(2, capacity=4)
+    buffer.max_capacity = 6
+    for _ in range(6):
+        buffer.store_positions(np.zeros((2, 3)))
+    try:
+        buffer.store_positions(np.zeros((2, 3)))
+    except RuntimeError as error:
+        print(f"Full buffer: {error}")
+    else:
+        raise AssertionError("a buffer must not grow over its max capacity")
+
+    print("The memory budget is kept only in its runs")
@@ -0,0 +1,57 @@
+# General modules
+import numpy as np
+import os
+import warnings
+
+# My modules
+import sys; sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+import utils # Before `physics` (it imports `physics` itself)
+import physics
+from settings import CONFIGURATION
+
+
+FREE_FALL_TIME = 96213. # [s] Until the two particles of `two_particles_from_repose` collide
+TIME_STEP = 100.
+
+
+def get_collision_space(simulation_time: float, initial_position: np.ndarray | None = None) -> physics.ParticleSpace:
+    """Return the head-on collision of `two_particles_from_repose`, configured to be advanced with the RK45 integrator."""
+    space, custom_settings = utils.init_space.two_particles_from_repose(initial_position)
+    CONFIGURATION.update(custom_settings)
+    CONFIGURATION.simulation.update({"simulation_time": simulation_time, "time_step": TIME_STEP,
+                                     "integrator": {"name": "rk45"}})
+    CONFIGURATION.simulation.min_relative_time_step_reduction = 1e2
+    return space
+
+
+# Running the file
+if __name__=="__main__":
+    # --- HEAD-ON COLLISION ---
+    # The error can't be met at the collision: the substeps stop at the min time step (with a warning) instead of stalling
+    space = get_collision_space(1.2 * FREE_FALL_TIME)
+    with warnings.catch_warnings(record=True) as caught_warnings:
+        warnings.simplefilter("always", RuntimeWarning)
+        space.run_simulation()
+    integrator = space.integrator
+    number_of_time_steps = CONFIGURATION.simulation.number_of_time_steps
+    tried_substeps = integrator.number_of_substeps + integrator.number_of_rejections
+    max_tried_substeps = number_of_time_steps * (CONFIGURATION.simulation.min_relative_time_step_reduction + 10)
+    print(f"{number_of_time_steps} time steps: {integrator.number_of_substeps} substeps and "
+          f"{integrator.number_of_rejections} rejections (at most {max_tried_substeps:g} tries)")
+    assert space.life_time >= 1.2 * FREE_FALL_TIME - TIME_STEP, "the run must reach its end"
+    assert tried_substeps <= max_tried_substeps, "the substeps must not be smaller than the min time step"
+    assert any("min time step" in str(warning.message) for warning in caught_warnings), "the min time step must be warned"
+    assert np.all(np.isfinite(space.state.positions)), "the positions must be finite"
+
+    # --- NON-FINITE ERROR ---
+    # A particle at a NaN position: the error isn't finite, so the run fails instead of looping
+    space = get_collision_space(10 * TIME_STEP, np.array([0., 0., np.nan]))
+    try:
+        with np.errstate(all="ignore"):
+            space.run_simulation()
+    except RuntimeError as error:
+        print(f"Non-finite error raised: {error}")
+    else:
+        raise AssertionError("a non-finite error must raise a RuntimeError")
+
+    print("The RK45 integrator goes through the collision")